@@ -0,0 +1,310 @@
+"""
+Event-Sourced Behavior Store
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Append-only event log with compacted snapshots
+
+Behavior changes are recorded as small JSON events appended to a log
+instead of re-pickling the whole behavior pattern on every outcome:
+
+    base_path/
+    ├── snapshot.json   # {"seq": N, "state": {...}}, replaced atomically
+    └── events.log      # one event per line: seq, crc32, event
+
+Every append is flushed to the OS immediately; fsync is batched (every
+`fsync_every` events or `fsync_interval` seconds), so a process crash loses
+nothing and a machine crash loses at most one batch. Cold start loads the
+snapshot and replays only the events after it. A torn final line from a
+partial write fails its checksum, is counted in `stats`, and is truncated
+away before new events are appended.
+
+`SQLiteBehaviorRepository` is the multi-user form of the same model: events
+and snapshots keyed by user id in one SQLite database (WAL mode), an LRU of
+hot profiles in memory, and appends written back in batches.
+
+    snapshots(user_id PRIMARY KEY, seq, state)
+    events(user_id, seq, event, PRIMARY KEY (user_id, seq))
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+
+class BehaviorStore:
+    """Append-only event log plus periodic snapshots"""
+    
+    def __init__(self, base_path: Path, snapshot_every: int = 500,
+                 fsync_every: int = 16, fsync_interval: float = 1.0):
+        self.base_path = Path(base_path)
+        self.snapshot_path = self.base_path / 'snapshot.json'
+        self.log_path = self.base_path / 'events.log'
+        self.snapshot_every = snapshot_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.stats = {'appended': 0, 'replayed': 0, 'snapshots': 0, 'fsyncs': 0, 'discarded_lines': 0}
+        
+        self.seq = 0
+        self.events_since_snapshot = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._log = None
+        
+        self.base_path.mkdir(parents=True, exist_ok=True)
+    
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return (snapshot state or None, events recorded after it)
+        
+        Also positions the log for appending, dropping any torn tail.
+        """
+        state = None
+        snapshot_seq = 0
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            state, snapshot_seq = snapshot['state'], snapshot['seq']
+        
+        events = []
+        good_offset = 0
+        self.seq = snapshot_seq
+        if self.log_path.exists():
+            with open(self.log_path, 'rb') as f:
+                for line in f:
+                    # Lines are written whole, newline included; one without it is torn
+                    record = self._decode(line) if line.endswith(b'\n') else None
+                    if record is None:
+                        # Everything after the first bad record is unreliable
+                        self.stats['discarded_lines'] += 1 + sum(1 for _ in f)
+                        break
+                    good_offset += len(line)
+                    # Events at or below the snapshot were compacted into it
+                    if record['seq'] > snapshot_seq:
+                        events.append(record['event'])
+                        self.seq = record['seq']
+            
+            if good_offset < self.log_path.stat().st_size:
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(good_offset)
+                    os.fsync(f.fileno())
+        
+        self.events_since_snapshot = len(events)
+        self.stats['replayed'] += len(events)
+        return state, events
+    
+    def append(self, event: Dict[str, Any]) -> int:
+        """Append one event; returns its sequence number"""
+        self.seq += 1
+        payload = json.dumps(event, sort_keys=True, default=str)
+        line = json.dumps({'seq': self.seq, 'crc': zlib.crc32(payload.encode('utf-8')), 'event': payload})
+        
+        log = self._open_log()
+        log.write(line.encode('utf-8') + b'\n')
+        log.flush()
+        
+        self._unsynced += 1
+        self.events_since_snapshot += 1
+        self.stats['appended'] += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self.sync()
+        return self.seq
+    
+    def needs_snapshot(self) -> bool:
+        return self.events_since_snapshot >= self.snapshot_every
+    
+    def write_snapshot(self, state: Dict[str, Any]):
+        """Atomically persist `state` as of the latest event, then compact the log"""
+        self.sync()
+        tmp_path = self.snapshot_path.with_name(f".snapshot.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'seq': self.seq, 'state': state}, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        
+        # Safe to drop: a crash before this point replays nothing past the snapshot seq
+        self._close_log()
+        with open(self.log_path, 'wb') as f:
+            os.fsync(f.fileno())
+        
+        self.events_since_snapshot = 0
+        self.stats['snapshots'] += 1
+    
+    def sync(self):
+        """fsync any appended events"""
+        if self._log is not None and self._unsynced:
+            os.fsync(self._log.fileno())
+            self.stats['fsyncs'] += 1
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+    
+    def close(self):
+        self.sync()
+        self._close_log()
+    
+    def _open_log(self):
+        if self._log is None:
+            self._log = open(self.log_path, 'ab')
+        return self._log
+    
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+    
+    @staticmethod
+    def _decode(line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            record = json.loads(line)
+            payload = record['event']
+            if zlib.crc32(payload.encode('utf-8')) != record['crc']:
+                return None
+            return {'seq': record['seq'], 'event': json.loads(payload)}
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+class SQLiteBehaviorRepository:
+    """Per-user behavior profiles: SQLite (WAL) event store with an in-memory LRU
+    
+    Profiles are any object with `apply_event(event)` and `to_dict()`;
+    `create(user_id)` builds a new one and `restore(state)` rebuilds one
+    from a snapshot. Only users that are actually requested are loaded.
+    
+    Several processes may share the database: event sequence numbers are
+    assigned at flush time under SQLite's write lock. When another writer
+    recorded events for the same user, the cached profile is dropped (and
+    reloaded with them on next use) and its pending snapshot is skipped.
+    """
+    
+    def __init__(self, db_path: Path, create: Callable[[str], Any], restore: Callable[[Dict[str, Any]], Any],
+                 max_cached: int = 256, flush_every: int = 64, flush_interval: float = 1.0,
+                 snapshot_every: int = 500):
+        self.db_path = Path(db_path)
+        self.create = create
+        self.restore = restore
+        self.max_cached = max_cached
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0, 'flushes': 0, 'snapshots': 0, 'conflicts': 0}
+        
+        # user_id -> [profile, last seq, events since snapshot]
+        self.cache: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._pending: List[Tuple[str, int, str]] = []
+        self._pending_snapshots: Dict[str, Tuple[int, str]] = {}
+        self._last_flush = time.monotonic()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.db_path, isolation_level=None)  # Transactions are explicit
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS snapshots (user_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, state TEXT NOT NULL)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS events (user_id TEXT NOT NULL, seq INTEGER NOT NULL, '
+                        'event TEXT NOT NULL, PRIMARY KEY (user_id, seq)) WITHOUT ROWID')
+    
+    def get(self, user_id: str) -> Any:
+        """Profile for a user, loaded from its last snapshot plus later events"""
+        entry = self.cache.get(user_id)
+        if entry is not None:
+            self.cache.move_to_end(user_id)
+            self.stats['hits'] += 1
+            return entry[0]
+        
+        # Unflushed writes for this user must be visible to the load
+        if any(pending_user == user_id for pending_user, _, _ in self._pending) or user_id in self._pending_snapshots:
+            self.flush()
+        
+        row = self.db.execute('SELECT seq, state FROM snapshots WHERE user_id = ?', (user_id,)).fetchone()
+        if row is None:
+            profile, seq = self.create(user_id), 0
+        else:
+            profile, seq = self.restore(json.loads(row[1])), row[0]
+        
+        replayed = 0
+        for event_seq, event in self.db.execute(
+                'SELECT seq, event FROM events WHERE user_id = ? AND seq > ? ORDER BY seq', (user_id, seq)):
+            profile.apply_event(json.loads(event))
+            seq = event_seq
+            replayed += 1
+        
+        self.cache[user_id] = [profile, seq, replayed]
+        self.stats['loads'] += 1
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+            self.stats['evictions'] += 1
+        return profile
+    
+    def record(self, user_id: str, event: Dict[str, Any]):
+        """Apply an event to the user's profile and queue it for write-back"""
+        self.get(user_id)
+        entry = self.cache[user_id]
+        entry[0].apply_event(event)
+        entry[1] += 1
+        entry[2] += 1
+        self._pending.append((user_id, entry[1], json.dumps(event, sort_keys=True, default=str)))
+        
+        if entry[2] >= self.snapshot_every:
+            self._pending_snapshots[user_id] = (entry[1], json.dumps(entry[0].to_dict(), default=str))
+            entry[2] = 0
+        
+        if len(self._pending) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        """Write queued events and snapshots in one transaction
+        
+        Queued events carry this process's view of each user's sequence;
+        they are renumbered after the last sequence actually stored, read
+        under the write lock (BEGIN IMMEDIATE), so concurrent writers never
+        collide on the primary key.
+        """
+        if self._pending or self._pending_snapshots:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                offsets: Dict[str, int] = {}
+                rows = []
+                for user_id, seq, event in self._pending:
+                    if user_id not in offsets:
+                        offsets[user_id] = self._stored_seq(user_id) - (seq - 1)
+                    rows.append((user_id, seq + offsets[user_id], event))
+                self.db.executemany('INSERT INTO events (user_id, seq, event) VALUES (?, ?, ?)', rows)
+                
+                for user_id, (seq, state) in self._pending_snapshots.items():
+                    if offsets.get(user_id, 0):
+                        continue  # The state lacks another writer's events
+                    self.db.execute('INSERT OR REPLACE INTO snapshots (user_id, seq, state) VALUES (?, ?, ?)',
+                                    (user_id, seq, state))
+                    self.db.execute('DELETE FROM events WHERE user_id = ? AND seq <= ?', (user_id, seq))
+                    self.stats['snapshots'] += 1
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+            
+            for user_id, offset in offsets.items():
+                if offset:
+                    self.cache.pop(user_id, None)
+                    self.stats['conflicts'] += 1
+            self._pending = []
+            self._pending_snapshots = {}
+            self.stats['flushes'] += 1
+        self._last_flush = time.monotonic()
+    
+    def _stored_seq(self, user_id: str) -> int:
+        """Last sequence number stored for a user (events or snapshot)"""
+        row = self.db.execute(
+            'SELECT MAX(seq) FROM (SELECT seq FROM events WHERE user_id = ? '
+            'UNION ALL SELECT seq FROM snapshots WHERE user_id = ?)', (user_id, user_id)
+        ).fetchone()
+        return row[0] or 0
+    
+    def close(self):
+        self.flush()
+        self.db.close()
+
@@ -0,0 +1,149 @@
+"""
+ADAPTIVE AGENT CONCURRENCY BENCHMARK
+Version: 3.1 Personal Edition
+Purpose: Show AdaptiveAgent throughput scaling with concurrency on one event loop
+
+Requests normally all select the same modules. With --roles 2 they
+alternate between roles whose module sets differ, so concurrent requests
+pin different selections; the `loads` column shows whether they still share
+loaded modules instead of evicting and reloading each other's.
+
+Usage:
+    python benchmarks/bench_concurrency.py --requests 400 --latency-ms 20
+    python benchmarks/bench_concurrency.py --requests 400 --roles 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the modular system to path
+sys.path.append(str(Path(__file__).parent.parent))
+from dynamic_modular_implementation import (
+    AdaptiveAgent, AgentType, ModuleInterface, ModuleMetadata, ModuleRegistry
+)
+
+
+class SleepModule:
+    """Mock module whose processing time is pure I/O wait"""
+    
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+    
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency_seconds)
+        return {'processed': True, 'quality_score': 0.9}
+    
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return True
+    
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return True
+
+
+class BenchmarkAgent(AdaptiveAgent):
+    """AdaptiveAgent wired to mock modules with fixed latency"""
+    
+    def __init__(self, registry: ModuleRegistry, latency_seconds: float, max_in_flight: int):
+        super().__init__(registry, {'agent_type': AgentType.ORCHESTRATOR}, max_in_flight=max_in_flight)
+        self.latency_seconds = latency_seconds
+        self.loads = 0
+    
+    async def _instantiate_module(self, metadata: ModuleMetadata) -> ModuleInterface:
+        self.loads += 1
+        return SleepModule(self.latency_seconds)
+
+
+ROLES = ['EXPERT', 'ADMIN', 'NOVICE']
+
+
+def build_registry(workdir: Path, module_count: int, roles: int = 1) -> ModuleRegistry:
+    """Build an in-memory registry of modules backed by real files
+    
+    Module 0 is shared by every role; the others each belong to one of the
+    first `roles` roles, so each role selects a different module set.
+    """
+    registry = ModuleRegistry(workdir / 'module_registry.yaml')
+    
+    for i in range(module_count):
+        file_path = workdir / f'module_{i}.md'
+        file_path.write_text(f'# Module {i}\n')
+        registry.modules[f'module_{i}'] = ModuleMetadata(
+            id=f'module_{i}',
+            name=f'Module {i}',
+            version='1.0.0',
+            description='Benchmark module',
+            file_path=file_path,
+            sha256_hash=hashlib.sha256(file_path.read_bytes()).hexdigest(),
+            size_bytes=file_path.stat().st_size,
+            token_estimate=100,
+            supported_agent_types=[AgentType.ORCHESTRATOR],
+            required_context=[],
+            optional_context=[],
+            orchestration_modes=['STANDARD'],
+            user_roles=ROLES[:roles] if i == 0 else [ROLES[i % roles]],
+            effectiveness_score=0.9
+        )
+    
+    return registry
+
+
+async def run_level(registry: ModuleRegistry, concurrency: int, requests: int,
+                    latency_seconds: float, roles: int = 1) -> Dict[str, float]:
+    """Drive `requests` requests through one agent capped at `concurrency` in flight"""
+    agent = BenchmarkAgent(registry, latency_seconds, max_in_flight=concurrency)
+    
+    async def one_request(i: int):
+        await agent.process_request({
+            'user_role': ROLES[i % roles],
+            'orchestration_mode': 'STANDARD',
+            'session_id': f'session_{i % 32}'
+        })
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'concurrency': concurrency,
+        'elapsed_seconds': elapsed,
+        'throughput_rps': requests / elapsed,
+        'module_set_version': agent.module_set_version,
+        'loads': agent.loads
+    }
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = build_registry(Path(tmp), args.modules, args.roles)
+        
+        results = []
+        for concurrency in args.concurrency:
+            results.append(await run_level(
+                registry, concurrency, args.requests, args.latency_ms / 1000, args.roles
+            ))
+    
+    baseline = results[0]['throughput_rps']
+    print(f"{'in-flight':>10} {'elapsed (s)':>12} {'req/s':>10} {'speedup':>8} {'loads':>7}")
+    for result in results:
+        print(f"{result['concurrency']:>10} {result['elapsed_seconds']:>12.3f} "
+              f"{result['throughput_rps']:>10.1f} {result['throughput_rps'] / baseline:>7.1f}x "
+              f"{result['loads']:>7}")
+    
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--modules', type=int, default=3)
+    parser.add_argument('--roles', type=int, choices=range(1, len(ROLES) + 1), default=1,
+                        help="roles to alternate between (each selects different modules)")
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,303 @@
+"""
+MODULAR AGENT HOT-PATH BENCHMARKS
+Version: 3.1 Personal Edition
+Purpose: Measure per-call cost of the request hot paths as registries and corpora grow
+
+Covers ModuleRegistry.select_modules, ModuleRegistry._resolve_dependencies,
+ModuleRegistry.log_performance, ModuleChain.execute and
+ContextualIntelligence.analyze_request. Registries are synthetic (100 to
+100k modules) with a dependency DAG that leans on a small core, sibling
+conflicts within module families, and mixed agent types, modes and roles.
+Request corpora are generated from templates, all-unique or with repeats.
+
+Results are written as JSON; comparing against a saved baseline flags any
+benchmark whose median per-call time grew by more than the threshold and
+exits non-zero.
+
+Usage:
+    python benchmarks/bench_hot_paths.py --sizes 100 1000 10000 --save results.json
+    python benchmarks/bench_hot_paths.py --baseline results.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add the modular system to path
+sys.path.append(str(Path(__file__).parent.parent))
+from dynamic_modular_implementation import (
+    AgentType, ChainStep, ModuleChain, ModuleMetadata, ModuleRegistry
+)
+from personal_ai_architect import ContextualIntelligence
+
+
+AGENT_TYPES = list(AgentType)
+MODES = ['EXPLORATORY', 'STANDARD', 'CRITICAL', 'RECOVERY']
+ROLES = ['NOVICE', 'EXPERT', 'ADMIN']
+FEATURES = ['enhanced_security', 'code_generation', 'web_search', 'vector_search', 'tool_calling']
+FEATURE_SHARE = 0.3  # Chance a module provides each feature
+FAMILY_SIZE = 10
+
+REQUEST_TEMPLATES = [
+    "I need a simple {thing} agent",
+    "Build a multi-agent {framework} system with {feature} for production",
+    "Quick prototype for {thing} with {feature}",
+    "I want to explore cutting-edge {feature} architectures for {thing}",
+    "Optimize the {framework} pipeline for {thing}, it is urgent",
+    "Help me understand how {feature} works in {framework}"
+]
+FILLERS = {
+    'thing': ['research', 'document analysis', 'customer support', 'code review', 'data pipeline', 'scheduling'],
+    'framework': ['LangGraph', 'CrewAI', 'AutoGen', 'LlamaIndex', 'custom'],
+    'feature': ['vector search', 'tool calling', 'hierarchical planning', 'state management', 'API integration']
+}
+
+
+def build_synthetic_registry(workdir: Path, module_count: int, seed: int = 0) -> ModuleRegistry:
+    """Registry of `module_count` modules with dependency and conflict graphs
+    
+    Each module depends on a few earlier modules, half of the time on one of
+    the core modules (the first 1%), so dependency chains stay acyclic and
+    fan in the way shared foundations do. Modules come in families of
+    FAMILY_SIZE alternatives, some of which conflict with a sibling. Each
+    module provides each of FEATURES with probability FEATURE_SHARE.
+    """
+    rng = random.Random(seed)
+    # Separate stream, so adding features left every other attribute unchanged
+    feature_rng = random.Random(f'{seed}:features')
+    registry = ModuleRegistry(workdir / 'module_registry.yaml')
+    core_count = max(1, module_count // 100)
+    
+    for i in range(module_count):
+        dependencies = set()
+        for _ in range(min(i, rng.choice([0, 1, 1, 2, 2, 3]))):
+            upper = core_count if rng.random() < 0.5 else i
+            dependencies.add(f'module_{rng.randrange(min(upper, i))}')
+        
+        family_start = i - i % FAMILY_SIZE
+        conflicts = []
+        if i > family_start and rng.random() < 0.05:
+            conflicts.append(f'module_{rng.randrange(family_start, i)}')
+        
+        registry.modules[f'module_{i}'] = ModuleMetadata(
+            id=f'module_{i}',
+            name=f'Module {i}',
+            version='1.0.0',
+            description='Synthetic benchmark module',
+            file_path=workdir / f'module_{i}.md',
+            sha256_hash=f'{i:064x}',
+            size_bytes=rng.randint(500, 20000),
+            token_estimate=rng.randint(100, 5000),
+            supported_agent_types=rng.sample(AGENT_TYPES, rng.randint(1, 3)),
+            required_context=[feature for feature in FEATURES if feature_rng.random() < FEATURE_SHARE],
+            optional_context=[],
+            orchestration_modes=rng.sample(MODES, rng.randint(1, len(MODES))),
+            user_roles=rng.sample(ROLES, rng.randint(1, len(ROLES))),
+            dependencies=sorted(dependencies),
+            conflicts=conflicts,
+            effectiveness_score=rng.uniform(0.4, 1.0),
+            error_rate=min(rng.expovariate(30), 1.0)
+        )
+    
+    return registry
+
+
+def request_contexts(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{
+        'agent_type': rng.choice(AGENT_TYPES),
+        'orchestration_mode': rng.choice(MODES),
+        'user_role': rng.choice(ROLES)
+    } for _ in range(count)]
+
+
+def request_corpus(size: int, repeat_ratio: float = 0.0, seed: int = 0) -> List[str]:
+    """Template requests; `repeat_ratio` of them resubmit an earlier request"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        if corpus and rng.random() < repeat_ratio:
+            corpus.append(rng.choice(corpus))
+            continue
+        template = rng.choice(REQUEST_TEMPLATES)
+        request = template.format(**{key: rng.choice(values) for key, values in FILLERS.items()})
+        corpus.append(f"{request} (ticket {i})")
+    return corpus
+
+
+class InstantModule:
+    """Mock module that returns immediately"""
+    
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {'processed': True, 'quality_score': 0.9}
+    
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return True
+    
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return True
+
+
+def measure(fn: Callable[[], Any], calls: int, repeat: int) -> Dict[str, float]:
+    """Per-call time of `fn` (which makes `calls` calls), in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    return {'median_us': statistics.median(samples), 'min_us': min(samples), 'calls': calls, 'repeat': repeat}
+
+
+def bench_registry(size: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = build_synthetic_registry(Path(tmp), size, seed)
+        calls = max(5, min(200, 200_000 // size))
+        contexts = request_contexts(calls, seed)
+        
+        results[f'select_modules[modules={size}]'] = measure(
+            lambda: [registry.select_modules(context) for context in contexts], calls, repeat)
+        
+        budgeted = [dict(context, context_budget=16000) for context in contexts]
+        results[f'select_modules_budget[modules={size}]'] = measure(
+            lambda: [registry.select_modules(context) for context in budgeted], calls, repeat)
+        
+        # Dependency resolution over all modules in priority order
+        candidates = sorted(registry.modules.values(), key=lambda m: m.effectiveness_score, reverse=True)
+        results[f'resolve_dependencies[modules={size}]'] = measure(
+            lambda: registry._resolve_dependencies(candidates, {}), 1, repeat)
+        
+        module_ids = [f'module_{i % size}' for i in range(10_000)]
+        metrics = {'effectiveness_score': 0.8, 'latency_ms': 12.0, 'error_occurred': False}
+        results[f'log_performance[modules={size}]'] = measure(
+            lambda: [registry.log_performance(module_id, metrics) for module_id in module_ids],
+            len(module_ids), repeat)
+    return results
+
+
+def bench_chain(steps: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = build_synthetic_registry(Path(tmp), max(steps, 1))
+        chain = ModuleChain(registry)
+        for i in range(steps):
+            chain.add_step(ChainStep(module_id=f'module_{i}', module=InstantModule(),
+                                     context_mapping={}, output_mapping={}))
+        runs = 200
+        
+        async def run():
+            for _ in range(runs):
+                chain.context_history.clear()
+                await chain.execute({'request': 'benchmark'})
+        
+        return {f'chain_execute[steps={steps}]': measure(lambda: asyncio.run(run()), runs, repeat)}
+
+
+def bench_analysis(corpus_size: int, repeat_ratio: float, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    corpus = request_corpus(corpus_size, repeat_ratio, seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Behavior logs and examples are written under ./data
+        try:
+            intelligence = ContextualIntelligence()
+            
+            def run():
+                ContextualIntelligence._analysis_cache.clear()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for request in corpus:
+                        intelligence.analyze_request(request, {})
+            
+            result = measure(run, len(corpus), repeat)
+            result['cache_hit_rate'] = ContextualIntelligence.analysis_cache_info()['hit_rate']
+            intelligence.behavior_store.close()
+        finally:
+            os.chdir(cwd)
+    return {f'analyze_request[corpus={corpus_size},repeats={repeat_ratio:g}]': result}
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for size in args.sizes:
+        results.update(bench_registry(size, args.repeat, args.seed))
+    for steps in args.chain_steps:
+        results.update(bench_chain(steps, args.repeat))
+    for corpus_size in args.corpus_sizes:
+        for repeat_ratio in args.repeat_ratios:
+            results.update(bench_analysis(corpus_size, repeat_ratio, args.repeat, args.seed))
+    
+    return {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Benchmarks present in both runs, with the relative change in median time"""
+    rows = []
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        change = result['median_us'] / previous['median_us'] - 1 if previous['median_us'] else 0.0
+        rows.append({'name': name, 'baseline_us': previous['median_us'], 'current_us': result['median_us'],
+                     'change': change, 'regression': change > threshold})
+    return rows
+
+
+def main(args: argparse.Namespace) -> int:
+    report = run_suite(args)
+    
+    print(f"{'benchmark':<56} {'median (us)':>12} {'min (us)':>10}")
+    for name, result in report['results'].items():
+        print(f"{name:<56} {result['median_us']:>12.2f} {result['min_us']:>10.2f}")
+    
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    
+    if not args.baseline:
+        return 0
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.threshold)
+    print(f"\nAgainst {args.baseline} (threshold +{args.threshold:.0%}):")
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:<56} {row['baseline_us']:>10.2f} -> {row['current_us']:>10.2f} "
+              f"{row['change']:>+8.1%} {flag}")
+    
+    regressions = [row for row in rows if row['regression']]
+    print(f"\n{len(regressions)} regression(s) in {len(rows)} compared benchmarks")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="synthetic registry sizes (up to 100000)")
+    parser.add_argument('--chain-steps', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--corpus-sizes', type=int, nargs='+', default=[1000])
+    parser.add_argument('--repeat-ratios', type=float, nargs='+', default=[0.0, 0.8],
+                        help="fraction of resubmitted requests in each corpus")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark (median reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', type=Path, help="write results JSON here")
+    parser.add_argument('--baseline', type=Path, help="results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="relative slowdown flagged as a regression")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,270 @@
+"""
+ADAPTIVE AGENT LOAD GENERATOR
+Version: 3.1 Personal Edition
+Purpose: Drive AdaptiveAgent with many concurrent virtual users against mock modules
+
+Each virtual user is a session with its own role, mode and feature mix that
+sends requests with exponential think time in between. Modules are mocks
+with log-normal latency and a configurable failure rate (a few slow,
+flakier "hot spot" modules can be mixed in), so everything runs locally.
+
+Every reporting interval prints throughput, p50/p95/p99 latency, errors,
+adaptation counts, traced memory and the size of the agent's growable
+structures (performance log, session overlays). Run it long with
+--max-growth-mb as a soak test: memory that keeps growing after warm-up
+fails the run.
+
+Usage:
+    python benchmarks/load_generator.py --users 50 --duration 30
+    python benchmarks/load_generator.py --users 200 --duration 600 --max-growth-mb 50 --json soak.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Add the modular system to path
+sys.path.append(str(Path(__file__).parent.parent))
+from dynamic_modular_implementation import (
+    AdaptiveAgent, AgentType, ModuleInterface, ModuleMetadata, ModuleRegistry
+)
+from bench_hot_paths import FEATURES, MODES, ROLES, build_synthetic_registry
+
+
+class MockModule:
+    """Module with log-normal latency and random failures"""
+    
+    def __init__(self, median_ms: float, sigma: float, error_rate: float, rng: random.Random):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rng = rng
+    
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(self.median_ms * self.rng.lognormvariate(0.0, self.sigma) / 1000)
+        if self.rng.random() < self.error_rate:
+            raise RuntimeError("mock module failure")
+        return {'processed': True, 'quality_score': min(1.0, self.rng.gauss(0.85, 0.1))}
+    
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return True
+    
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return True
+
+
+class LoadTestAgent(AdaptiveAgent):
+    """AdaptiveAgent whose modules are mocks; a fraction are slow, flaky hot spots"""
+    
+    def __init__(self, registry: ModuleRegistry, args: argparse.Namespace, rng: random.Random):
+        super().__init__(registry, {'agent_type': AgentType.ORCHESTRATOR}, max_in_flight=args.max_in_flight)
+        self.args = args
+        self.rng = rng
+    
+    async def _instantiate_module(self, metadata: ModuleMetadata) -> ModuleInterface:
+        # Hot spots are a fixed property of the module, not of each (re)load
+        hot_spot = random.Random(f'{self.args.seed}:{metadata.id}').random() < self.args.hot_spot_fraction
+        return MockModule(
+            median_ms=self.args.latency_ms * (5 if hot_spot else 1),
+            sigma=self.args.latency_sigma,
+            error_rate=self.args.error_rate * (5 if hot_spot else 1),
+            rng=self.rng
+        )
+
+
+class VirtualUser:
+    """One session with a fixed role and a personal mix of modes and features"""
+    
+    def __init__(self, user_id: int, args: argparse.Namespace, rng: random.Random):
+        self.session_id = f'user_{user_id}'
+        self.role = rng.choices(ROLES, weights=args.role_weights)[0]
+        self.modes = rng.sample(MODES, rng.randint(1, len(MODES)))
+        self.features = rng.sample(FEATURES, rng.randint(1, len(FEATURES)))
+        self.feature_rate = args.feature_rate
+        self.think_seconds = args.think_ms / 1000
+        self.rng = rng
+    
+    def next_request(self) -> Dict[str, Any]:
+        request = {
+            'session_id': self.session_id,
+            'user_role': self.role,
+            'orchestration_mode': self.rng.choice(self.modes)
+        }
+        if self.rng.random() < self.feature_rate:
+            request['features'] = [self.rng.choice(self.features)]
+        return request
+    
+    async def run(self, agent: AdaptiveAgent, stats: 'LoadStats', deadline: float):
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                result = await agent.process_request(self.next_request())
+                stats.record(time.perf_counter() - start, failed=bool(result.get('degraded_mode')))
+            except Exception:
+                stats.record(time.perf_counter() - start, failed=True)
+            if self.think_seconds:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think_seconds))
+
+
+class LoadStats:
+    """Latencies and failures for the current reporting interval"""
+    
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.failures = 0
+        self.total_requests = 0
+    
+    def record(self, latency_seconds: float, failed: bool):
+        self.latencies.append(latency_seconds)
+        self.failures += failed
+        self.total_requests += 1
+    
+    def take_interval(self) -> Dict[str, Any]:
+        latencies, failures = self.latencies, self.failures
+        self.latencies, self.failures = [], 0
+        p50, p95, p99 = (np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else (0.0, 0.0, 0.0))
+        return {'requests': len(latencies), 'failures': failures,
+                'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+
+def structure_sizes(agent: AdaptiveAgent) -> Dict[str, int]:
+    """Lengths of agent and registry structures that grow with traffic"""
+    return {
+        'performance_log': len(agent.registry.performance_log),
+        'session_overlays': len(agent.session_overlays),
+        'draining_modules': len(agent._draining)
+    }
+
+
+async def report_loop(agent: AdaptiveAgent, stats: LoadStats, interval: float, deadline: float,
+                      samples: List[Dict[str, Any]]):
+    started = time.monotonic()
+    last = started
+    previous_adaptations = dict(agent.adaptation_stats)
+    
+    print(f"{'t (s)':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'adapt':>6} {'traced MB':>10} {'perf log':>9} {'sessions':>9}")
+    while True:
+        await asyncio.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+        now = time.monotonic()
+        sample = stats.take_interval()
+        adaptations = {key: value - previous_adaptations.get(key, 0)
+                       for key, value in agent.adaptation_stats.items() if key != 'adaptation_seconds'}
+        previous_adaptations = dict(agent.adaptation_stats)
+        
+        sample.update(
+            elapsed_seconds=now - started,
+            throughput_rps=sample['requests'] / max(now - last, 1e-9),
+            adaptations=adaptations,
+            traced_mb=tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else None,
+            max_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            **structure_sizes(agent)
+        )
+        samples.append(sample)
+        last = now
+        
+        traced = f"{sample['traced_mb']:>10.1f}" if sample['traced_mb'] is not None else f"{'-':>10}"
+        print(f"{sample['elapsed_seconds']:>6.0f} {sample['throughput_rps']:>8.1f} {sample['p50_ms']:>8.1f} "
+              f"{sample['p95_ms']:>8.1f} {sample['p99_ms']:>8.1f} {sample['failures']:>7} "
+              f"{sum(adaptations.values()):>6} {traced} {sample['performance_log']:>9} "
+              f"{sample['session_overlays']:>9}")
+        if now >= deadline:
+            return
+
+
+def memory_growth_mb(samples: List[Dict[str, Any]], warmup_fraction: float = 0.25) -> Optional[float]:
+    """Traced memory growth from the end of warm-up to the last interval"""
+    traced = [sample['traced_mb'] for sample in samples if sample['traced_mb'] is not None]
+    if len(traced) < 2:
+        return None
+    return traced[-1] - traced[min(int(len(traced) * warmup_fraction), len(traced) - 2)]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = build_synthetic_registry(Path(tmp), args.modules, args.seed)
+        agent = LoadTestAgent(registry, args, rng)
+        users = [VirtualUser(i, args, rng) for i in range(args.users)]
+        stats = LoadStats()
+        samples: List[Dict[str, Any]] = []
+        
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(
+            report_loop(agent, stats, args.report_every, deadline, samples),
+            *(user.run(agent, stats, deadline) for user in users)
+        )
+        await agent.drain()
+    
+    growth = memory_growth_mb(samples)
+    summary = {
+        'config': {key: value for key, value in vars(args).items() if key != 'json'},
+        'total_requests': stats.total_requests,
+        'throughput_rps': stats.total_requests / args.duration,
+        'adaptations': agent.adaptation_report(),
+        'memory_growth_mb': growth,
+        'intervals': samples
+    }
+    if tracemalloc.is_tracing():
+        summary['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return summary
+
+
+def main(args: argparse.Namespace) -> int:
+    summary = asyncio.run(run(args))
+    
+    print(f"\n{summary['total_requests']} requests, {summary['throughput_rps']:.1f} req/s overall")
+    adaptations = summary['adaptations']
+    print(f"Adaptations: {adaptations['swaps']} swaps, {adaptations['escalations']} escalations, "
+          f"{adaptations['security_layers']} security layers")
+    
+    growth = summary['memory_growth_mb']
+    if growth is not None:
+        print(f"Traced memory growth after warm-up: {growth:+.1f} MB")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"Wrote {args.json}")
+    
+    if args.max_growth_mb is not None and growth is not None and growth > args.max_growth_mb:
+        print(f"FAIL: memory grew {growth:.1f} MB (limit {args.max_growth_mb} MB)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50, help="concurrent virtual users (sessions)")
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds to run")
+    parser.add_argument('--report-every', type=float, default=5.0, help="seconds per reporting interval")
+    parser.add_argument('--think-ms', type=float, default=50.0, help="mean pause between a user's requests")
+    parser.add_argument('--modules', type=int, default=50, help="synthetic registry size")
+    parser.add_argument('--max-in-flight', type=int, default=64)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help="median mock module latency")
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help="log-normal spread of module latency")
+    parser.add_argument('--error-rate', type=float, default=0.01, help="per-call mock module failure rate")
+    parser.add_argument('--hot-spot-fraction', type=float, default=0.05,
+                        help="fraction of modules 5x slower and 5x flakier")
+    parser.add_argument('--role-weights', type=float, nargs=len(ROLES), default=[1.0] * len(ROLES),
+                        help=f"relative frequency of roles {' '.join(ROLES)}")
+    parser.add_argument('--feature-rate', type=float, default=0.1, help="share of requests asking for features")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-tracemalloc', action='store_true', help="skip memory tracing (lower overhead)")
+    parser.add_argument('--max-growth-mb', type=float, help="fail if traced memory grows more after warm-up")
+    parser.add_argument('--json', type=Path, help="write the summary and per-interval samples here")
+    sys.exit(main(parser.parse_args()))
@@ -18,8 +18,23 @@ import yaml
 import json
 from enum import Enum
 import asyncio
+import itertools
+import operator
+import time
+from collections import OrderedDict, deque
 from contextlib import asynccontextmanager
 
+import numpy as np
+
+from metrics_export import MetricsStore
+from keyword_matcher import KeywordMatcher
+from mode_selection import ModeSelector
+from module_loader import ModuleLoader, PromptModule, PromptVariantsModule
+from predictive_loading import ModuleSequencePredictor
+from prompt_assembly import AssembledPrompt, PromptAssembler, estimate_tokens
+from prompt_management import BufferedUsageLogger, LocalPromptManager, PromptManager
+from token_counting import TokenCounter
+
 
 class ModuleStatus(Enum):
     """Status types for modules"""
@@ -88,11 +103,14 @@ class ModuleMetadata:
 class ModuleRegistry:
     """State-of-the-art module registry with micro-granular control"""
     
-    def __init__(self, registry_path: Path):
+    def __init__(self, registry_path: Path, token_counter: Optional[TokenCounter] = None,
+                 max_performance_log: int = 10000):
         self.registry_path = registry_path
         self.modules: Dict[str, ModuleMetadata] = {}
-        self.performance_log: List[Dict] = []
+        self.performance_log: deque = deque(maxlen=max_performance_log)  # Most recent events only
+        self.token_counter = token_counter
         self._load_registry()
+        self.refresh_token_estimates()
     
     def _load_registry(self):
         """Load module registry from YAML manifest"""
@@ -132,6 +150,8 @@ class ModuleRegistry:
             if metadata.input_schema:
                 self._validate_schema(metadata.input_schema)
             
+            self.refresh_token_estimates([metadata])
+            
             # Register module
             self.modules[metadata.id] = metadata
             self._save_registry()
@@ -177,7 +197,73 @@ class ModuleRegistry:
         )
         
         # Resolve dependencies
-        return self._resolve_dependencies(candidates, context)
+        selected = self._resolve_dependencies(candidates, context)
+        
+        if context.get('context_budget') is not None:
+            selected = self._pack_budget(selected, context['context_budget'])
+        return selected
+    
+    def _pack_budget(self, modules: List[ModuleMetadata], budget: int) -> List[ModuleMetadata]:
+        """Keep modules in priority order while they fit the token budget
+        
+        CRITICAL and security modules, with their dependencies, are always
+        kept, even over budget; the budget is spent on the rest. Any other
+        module is dropped if it does not fit or if one of its dependencies
+        was dropped; later, smaller modules may still fill the remaining room.
+        """
+        protected_ids = set()
+        pending = [module.id for module in modules if self._is_protected(module)]
+        while pending:
+            module_id = pending.pop()
+            if module_id in protected_ids or module_id not in self.modules:
+                continue
+            protected_ids.add(module_id)
+            pending.extend(self.modules[module_id].dependencies)
+        
+        packed = []
+        packed_ids = set()
+        used = sum(module.token_estimate for module in modules if module.id in protected_ids)
+        
+        for module in modules:
+            if module.id not in protected_ids:
+                if any(dep_id in self.modules and dep_id not in packed_ids and dep_id not in protected_ids
+                       for dep_id in module.dependencies):
+                    continue
+                if used + module.token_estimate > budget:
+                    continue
+                used += module.token_estimate
+            packed.append(module)
+            packed_ids.add(module.id)
+        
+        return packed
+    
+    @staticmethod
+    def _is_protected(module: ModuleMetadata) -> bool:
+        """CRITICAL and security modules are never dropped to save tokens"""
+        return (module.status == ModuleStatus.CRITICAL
+                or any('security' in tag for tag in module.compliance_tags))
+    
+    def refresh_token_estimates(self, modules: Optional[List[ModuleMetadata]] = None):
+        """Replace declared token estimates with counts from the token counter
+        
+        Counts are keyed by content hash, so only modules whose content has
+        not been counted before are read and tokenized.
+        """
+        if self.token_counter is None:
+            return
+        
+        pending = []
+        for module in (self.modules.values() if modules is None else modules):
+            cached = self.token_counter.lookup(module.sha256_hash)
+            if cached is not None:
+                module.token_estimate = cached
+            elif module.file_path.exists():
+                pending.append(module)
+        
+        if pending:
+            texts = [(module.file_path.read_text(encoding='utf-8'), module.sha256_hash) for module in pending]
+            for module, count in zip(pending, self.token_counter.count_batch(texts)):
+                module.token_estimate = count
     
     def _resolve_dependencies(self, modules: List[ModuleMetadata], context: Dict) -> List[ModuleMetadata]:
         """Resolve module dependencies and conflicts"""
@@ -302,8 +388,9 @@ class ChainStep:
 class ModuleChain:
     """Chain-of-modules orchestrator with stepwise execution"""
     
-    def __init__(self, registry: ModuleRegistry):
+    def __init__(self, registry: ModuleRegistry, monitor: Optional['PerformanceMonitor'] = None):
         self.registry = registry
+        self.monitor = monitor
         self.steps: List[ChainStep] = []
         self.context_history: List[Dict] = []
     
@@ -347,6 +434,8 @@ class ModuleChain:
                     'error_occurred': False,
                     'step_index': i
                 })
+                if self.monitor is not None:
+                    self.monitor.record_module(step.module_id, latency_ms / 1000, success=True)
                 
                 # Store step context for debugging
                 self.context_history.append({
@@ -365,6 +454,8 @@ class ModuleChain:
                     'error_message': str(e),
                     'step_index': i
                 })
+                if self.monitor is not None:
+                    self.monitor.record_module(step.module_id, None, success=False)
                 
                 # Handle error based on criticality
                 if step.module_id in self._get_critical_modules():
@@ -395,10 +486,29 @@ class ModuleChain:
 
 
 class PerformanceMonitor:
-    """Monitor module and system performance"""
+    """Monitor module and system performance
     
-    def __init__(self):
-        self.metrics_history = []
+    Feeds a bounded `MetricsStore` with per-module, per-orchestration-mode and
+    per-adaptation-type counters and latency histograms, exposed through
+    `snapshot()` and Prometheus/OpenMetrics text. Raw events are kept only in
+    a fixed-size history for debugging.
+    """
+    
+    def __init__(self, bucket_seconds: float = 60.0, retention_buckets: int = 60,
+                 max_history: int = 1000, max_series: int = 10000):
+        self.metrics_history: deque = deque(maxlen=max_history)
+        self.store = MetricsStore(bucket_seconds, retention_buckets, max_series)
+        
+        self.store.describe('agent_requests_total', 'counter', 'Requests processed, by orchestration mode and outcome')
+        self.store.describe('agent_request_latency_seconds', 'histogram', 'End-to-end request latency, by orchestration mode')
+        self.store.describe('agent_module_calls_total', 'counter', 'Module chain steps, by module and outcome')
+        self.store.describe('agent_module_latency_seconds', 'histogram', 'Module step latency, by module')
+        self.store.describe('agent_adaptations_total', 'counter',
+                            'Runtime adaptations triggered, by type and result (applied/skipped/rate_limited)')
+        self.store.describe('agent_failures_total', 'counter', 'Failed requests, by error type')
+        self.store.describe('agent_in_flight_requests', 'gauge', 'Requests currently being processed')
+        self.store.describe('agent_module_set_version', 'gauge', 'Version of the published module set')
+        self.store.describe('agent_draining_modules', 'gauge', 'Retired module versions still held by in-flight requests')
     
     def record_metrics(self, metrics: Dict[str, Any]):
         """Record performance metrics"""
@@ -406,140 +516,674 @@ class PerformanceMonitor:
             'timestamp': datetime.utcnow(),
             **metrics
         })
+        
+        if metrics.get('event_type') == 'failure':
+            self.store.inc('agent_failures_total', {'error_type': metrics.get('error_type', 'unknown')})
+    
+    def record_request(self, mode: Optional[str], latency_seconds: float, success: bool):
+        """Record one completed request"""
+        mode = str(mode or 'unknown')
+        self.store.inc('agent_requests_total', {'mode': mode, 'outcome': 'success' if success else 'error'})
+        self.store.observe('agent_request_latency_seconds', latency_seconds, {'mode': mode})
+    
+    def record_module(self, module_id: str, latency_seconds: Optional[float], success: bool):
+        """Record one module chain step"""
+        self.store.inc('agent_module_calls_total', {'module': module_id, 'outcome': 'success' if success else 'error'})
+        if latency_seconds is not None:
+            self.store.observe('agent_module_latency_seconds', latency_seconds, {'module': module_id})
+    
+    def record_adaptation(self, adaptation_type: str, result: str = 'applied'):
+        """Record one triggered adaptation and whether it took effect"""
+        self.store.inc('agent_adaptations_total', {'type': adaptation_type, 'result': result})
+    
+    def set_gauge(self, name: str, value: float):
+        """Update an unlabelled gauge"""
+        self.store.set_gauge(name, value)
+    
+    def snapshot(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Cumulative metrics, or rollups over the last `window_seconds`"""
+        return self.store.snapshot(window_seconds)
+    
+    def export_prometheus(self, openmetrics: bool = False) -> str:
+        """Prometheus text (or OpenMetrics) exposition"""
+        return self.store.render(openmetrics)
+    
+    def write_textfile(self, path: Path, openmetrics: bool = False):
+        """Write the exposition to a file for textfile-based collection"""
+        self.store.write_textfile(path, openmetrics)
+
+
+# Built-in rules, used when the config does not declare its own `rules` list
+DEFAULT_ADAPTATION_RULES: List[Dict[str, Any]] = [
+    {
+        'name': 'security_escalation',
+        'metric': 'security_risk_score',
+        'operator': '>',
+        'threshold': 0.7,
+        'default': 0.0,
+        'adaptation': {
+            'type': 'add_security_layer',
+            'reason': 'High security risk detected',
+            'priority': 'critical'
+        }
+    },
+    {
+        'name': 'performance_degradation',
+        'metric': 'latency_seconds',
+        'operator': '>',
+        'threshold': 10.0,
+        'default': 0.0,
+        'window': 5,
+        'clear_threshold': 6.0,
+        'cooldown_seconds': 60.0,
+        'adaptation': {
+            'type': 'swap_module',
+            'old_module_id': 'complex_reasoning',
+            'new_module_id': 'fast_reasoning',
+            'reason': 'High latency detected'
+        }
+    },
+    {
+        'name': 'quality_improvement',
+        'metric': 'quality_score',
+        'operator': '<',
+        'threshold': 0.5,
+        'default': 1.0,
+        'window': 5,
+        'clear_threshold': 0.6,
+        'cooldown_seconds': 120.0,
+        'adaptation': {
+            'type': 'escalate_mode',
+            'new_mode': 'CRITICAL',
+            'reason': 'Poor quality detected'
+        }
+    },
+    {
+        'name': 'user_frustration',
+        'metric': 'user_satisfaction',
+        'operator': '<',
+        'threshold': 0.3,
+        'default': 1.0,
+        'adaptation': {
+            'type': 'escalate_mode',
+            'new_mode': 'RECOVERY',
+            'reason': 'User frustration detected'
+        }
+    }
+]
+
+RULE_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+
+@dataclass
+class RuleState:
+    """Live trigger state for one rule: sliding window, latch and cooldown"""
+    window: deque
+    total: float = 0.0
+    latched: bool = False
+    last_fired: float = float('-inf')
+    fired: int = 0
+    suppressed: int = 0
 
 
 class AdaptationRuleEngine:
-    """Rule engine for dynamic adaptations"""
-    
-    def __init__(self):
-        self.rules = [
-            self._security_escalation_rule,
-            self._performance_degradation_rule,
-            self._quality_improvement_rule,
-            self._user_frustration_rule
-        ]
+    """Rule engine for dynamic adaptations
+    
+    Rules are declared in config (`adaptation_rules` in orchestrator.yaml) and
+    compiled into a decision table: one column per rule holding the metric,
+    comparison, threshold and adaptation. The same table evaluates a single
+    metrics dict on the hot path and whole arrays of recorded metrics offline.
+    
+    Live traffic goes through `evaluate_windowed`, which damps noise: a rule
+    compares the mean of its last `window` observations, latches until the
+    mean crosses back past `clear_threshold` (hysteresis), and cannot fire
+    again within `cooldown_seconds`. A request that does not report a rule's
+    metric is not an observation for that rule.
+    
+    Trigger state has the scope of the adaptation: rules that change the
+    shared module set keep one state, while rules whose adaptation applies to
+    a session's overlay (`escalate_mode`) keep a state per session, bounded
+    LRU-style by `max_sessions`, so one session's traffic never escalates
+    another.
+    """
+    
+    SESSION_ADAPTATIONS = frozenset({'escalate_mode'})
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, max_sessions: int = 1024):
+        config = config or {}
+        self.rules = self._compile(config.get('rules', DEFAULT_ADAPTATION_RULES), config)
+        self.rule_states = self._new_states()
+        self.max_sessions = max_sessions
+        self.session_states: "OrderedDict[str, List[RuleState]]" = OrderedDict()
+        self.max_swaps_per_minute: Optional[int] = config.get('max_swaps_per_minute')
+        
+        # Columnar view of the table for batch evaluation
+        self.rule_names = [rule['name'] for rule in self.rules]
+        self.metric_names = sorted({rule['metric'] for rule in self.rules})
+    
+    @staticmethod
+    def _compile(rules: List[Dict[str, Any]], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Validate rule declarations and resolve thresholds"""
+        compiled = []
+        for rule in rules:
+            if rule['operator'] not in RULE_OPERATORS:
+                raise ValueError(f"Unknown operator in rule {rule['name']}: {rule['operator']}")
+            
+            # Legacy `<rule>_threshold` keys still override the declared threshold
+            threshold = config.get(f"{rule['name']}_threshold", rule['threshold'])
+            clear_threshold = rule.get('clear_threshold')
+            compiled.append({
+                'name': rule['name'],
+                'metric': rule['metric'],
+                'compare': RULE_OPERATORS[rule['operator']],
+                'threshold': float(threshold),
+                'default': float(rule.get('default', 0.0)),
+                'window': max(int(rule.get('window', 1)), 1),
+                'clear_threshold': None if clear_threshold is None else float(clear_threshold),
+                'cooldown_seconds': float(rule.get('cooldown_seconds', 0.0)),
+                'per_session': rule['adaptation']['type'] in AdaptationRuleEngine.SESSION_ADAPTATIONS,
+                'adaptation': dict(rule['adaptation'])
+            })
+        return compiled
+    
+    def _new_states(self) -> List[RuleState]:
+        return [RuleState(window=deque(maxlen=rule['window'])) for rule in self.rules]
     
     def evaluate(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Evaluate all rules and return adaptations"""
+        """Evaluate all rules in a single pass and return adaptations"""
         adaptations = []
         for rule in self.rules:
-            adaptation = rule(metrics)
-            if adaptation:
-                adaptations.append(adaptation)
+            if rule['compare'](metrics.get(rule['metric'], rule['default']), rule['threshold']):
+                adaptations.append(dict(rule['adaptation']))
         return adaptations
     
-    def _security_escalation_rule(self, metrics: Dict) -> Optional[Dict]:
-        """Escalate security if suspicious patterns detected"""
-        if metrics.get('security_risk_score', 0) > 0.7:
-            return {
-                'type': 'add_security_layer',
-                'reason': 'High security risk detected',
-                'priority': 'critical'
-            }
-        return None
+    def evaluate_windowed(self, metrics: Dict[str, Any], now: Optional[float] = None,
+                          session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Evaluate rules against sliding windows with hysteresis and cooldowns"""
+        now = time.monotonic() if now is None else now
+        return [dict(self.rules[i]['adaptation']) for i in self._fire(metrics, now, session_id)]
     
-    def _performance_degradation_rule(self, metrics: Dict) -> Optional[Dict]:
-        """Switch to lighter modules if performance degrades"""
-        if metrics.get('latency_seconds', 0) > 10.0:
-            return {
-                'type': 'swap_module',
-                'old_module_id': 'complex_reasoning',
-                'new_module_id': 'fast_reasoning',
-                'reason': 'High latency detected'
-            }
-        return None
+    def _fire(self, metrics: Dict[str, Any], now: float, session_id: Optional[str]) -> List[int]:
+        """Observe one request's metrics; indices of the rules that fire"""
+        session_states = self._session_states(session_id) if session_id is not None else None
+        fired = []
+        
+        for i, rule in enumerate(self.rules):
+            if metrics.get(rule['metric']) is None:
+                continue
+            state = session_states[i] if session_states is not None and rule['per_session'] else self.rule_states[i]
+            if self._observe(rule, state, float(metrics[rule['metric']]), now):
+                fired.append(i)
+        
+        return fired
     
-    def _quality_improvement_rule(self, metrics: Dict) -> Optional[Dict]:
-        """Upgrade modules if quality is poor"""
-        if metrics.get('quality_score', 1.0) < 0.5:
-            return {
-                'type': 'escalate_mode',
-                'new_mode': 'CRITICAL',
-                'reason': 'Poor quality detected'
-            }
-        return None
+    def _session_states(self, session_id: str) -> List[RuleState]:
+        states = self.session_states.pop(session_id, None) or self._new_states()
+        self.session_states[session_id] = states
+        while len(self.session_states) > self.max_sessions:
+            self.session_states.popitem(last=False)
+        return states
+    
+    @staticmethod
+    def _observe(rule: Dict[str, Any], state: RuleState, value: float, now: float) -> bool:
+        """Add one observation to a rule's window; True when the rule fires"""
+        if len(state.window) == state.window.maxlen:
+            state.total -= state.window[0]
+        state.window.append(value)
+        state.total += value
+        
+        if len(state.window) < rule['window']:
+            return False
+        mean = state.total / len(state.window)
+        
+        # A latched rule re-arms only once the mean leaves the hysteresis band
+        if state.latched:
+            if not rule['compare'](mean, rule['clear_threshold']):
+                state.latched = False
+            return False
+        
+        if not rule['compare'](mean, rule['threshold']):
+            return False
+        if now - state.last_fired < rule['cooldown_seconds']:
+            state.suppressed += 1
+            return False
+        
+        state.last_fired = now
+        state.fired += 1
+        state.latched = rule['clear_threshold'] is not None
+        return True
     
-    def _user_frustration_rule(self, metrics: Dict) -> Optional[Dict]:
-        """Detect user frustration patterns"""
-        if metrics.get('user_satisfaction', 1.0) < 0.3:
-            return {
-                'type': 'escalate_mode',
-                'new_mode': 'RECOVERY',
-                'reason': 'User frustration detected'
+    def rule_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-rule firing, suppression and latch state
+        
+        Per-session rules are summed over the sessions still tracked, and
+        report how many of them are latched.
+        """
+        report = {}
+        for i, rule in enumerate(self.rules):
+            states = [self.rule_states[i]]
+            if rule['per_session']:
+                states += [session[i] for session in self.session_states.values()]
+            report[rule['name']] = {
+                'fired': sum(state.fired for state in states),
+                'suppressed': sum(state.suppressed for state in states),
+                'latched': sum(state.latched for state in states) if rule['per_session'] else states[0].latched
             }
-        return None
+        return report
+    
+    def evaluate_batch(self, metrics: Dict[str, Any]) -> np.ndarray:
+        """Raw threshold scan of the table over columns of recorded metrics
+        
+        `metrics` maps metric names to equal-length arrays. Returns a boolean
+        matrix of shape (requests, rules); column order is `rule_names`.
+        Missing metric columns take the rule's default value. Each request is
+        compared on its own, without windows, hysteresis or cooldowns; use
+        `replay` for what live traffic would have triggered.
+        """
+        columns = {name: np.asarray(values, dtype=float) for name, values in metrics.items()}
+        size = len(next(iter(columns.values()))) if columns else 0
+        
+        fired = np.empty((size, len(self.rules)), dtype=bool)
+        for i, rule in enumerate(self.rules):
+            column = columns.get(rule['metric'])
+            if column is None:
+                fired[:, i] = rule['compare'](rule['default'], rule['threshold'])
+            else:
+                fired[:, i] = rule['compare'](column, rule['threshold'])
+        return fired
+    
+    def to_columns(self, records: List[Dict[str, Any]], fill_defaults: bool = True) -> Dict[str, np.ndarray]:
+        """Convert recorded per-request metrics dicts into table columns
+        
+        Unreported metrics take the rule's default, or NaN (not an
+        observation, as on the live path) when `fill_defaults` is False.
+        """
+        defaults = {rule['metric']: rule['default'] if fill_defaults else np.nan for rule in self.rules}
+        return {
+            name: np.fromiter((defaults[name] if record.get(name) is None else record[name] for record in records),
+                              dtype=float, count=len(records))
+            for name in self.metric_names
+        }
+    
+    def replay(self, metrics: Dict[str, Any], timestamps: Optional[List[float]] = None,
+               session_ids: Optional[List[Optional[str]]] = None) -> Dict[str, int]:
+        """Count how often each rule would have fired on live traffic
+        
+        Runs the recorded requests in order through fresh windowed state, so
+        windows, hysteresis, cooldowns and per-session state apply exactly as
+        in `evaluate_windowed`; the engine's own state is left untouched. NaN
+        values are unreported metrics. Without `timestamps`, requests are
+        taken to be one second apart.
+        """
+        columns = {name: np.asarray(values, dtype=float) for name, values in metrics.items()}
+        size = len(next(iter(columns.values()))) if columns else 0
+        
+        simulator = AdaptationRuleEngine(max_sessions=self.max_sessions)
+        simulator.rules = self.rules
+        simulator.rule_states = simulator._new_states()
+        
+        counts = [0] * len(self.rules)
+        for row in range(size):
+            observed = {name: None if np.isnan(column[row]) else column[row] for name, column in columns.items()}
+            for i in simulator._fire(
+                observed,
+                float(timestamps[row]) if timestamps is not None else float(row),
+                session_ids[row] if session_ids is not None else None
+            ):
+                counts[i] += 1
+        return dict(zip(self.rule_names, counts))
+
+
+@dataclass(eq=False)
+class ModuleHandle:
+    """Reference-counted, versioned handle to one loaded module instance
+    
+    Requests acquire the handles of the module set they run against. A swap
+    retires the old handle instead of cleaning it up; cleanup happens once
+    the last in-flight request holding it releases it.
+    """
+    module_id: str
+    module: ModuleInterface
+    generation: int
+    sha256_hash: str = ''
+    refs: int = 0
+    retired: bool = False
+    
+    def acquire(self):
+        self.refs += 1
+    
+    def release(self) -> bool:
+        """Drop a reference; True when a retired handle has fully drained"""
+        self.refs -= 1
+        return self.retired and self.refs == 0
+    
+    def retire(self) -> bool:
+        """Mark for cleanup; True when nothing holds the handle any more"""
+        self.retired = True
+        return self.refs == 0
+
+
+@dataclass(frozen=True)
+class ModuleSet:
+    """Immutable, versioned snapshot of the modules an agent has loaded
+    
+    Swaps never mutate a published set; they publish a new version, so a
+    request that captured an older set keeps executing against it.
+    """
+    version: int
+    handles: Dict[str, ModuleHandle]
+    
+    @property
+    def modules(self) -> Dict[str, ModuleInterface]:
+        return {module_id: handle.module for module_id, handle in self.handles.items()}
+
+
+@dataclass
+class RequestScope:
+    """Per-request view of agent state (context, module set, adaptation overlay)"""
+    request_id: int
+    context: Dict[str, Any]
+    session_id: Optional[str] = None
+    module_set: Optional[ModuleSet] = None  # Pinned (acquired) once modules are resolved
+    module_ids: List[str] = field(default_factory=list)  # Modules this request's chain runs
+    variants: Dict[str, str] = field(default_factory=dict)  # Prompt variant served, per managed module
+    latency_ms: Optional[float] = None  # Measured chain execution time
+    overlay: Dict[str, Any] = field(default_factory=dict)
 
 
 class AdaptiveAgent:
-    """Agent with hot-swapping and live adaptation capabilities"""
+    """Agent with hot-swapping and live adaptation capabilities
     
-    def __init__(self, registry: ModuleRegistry, base_context: Dict[str, Any]):
+    A single agent serves many concurrent requests on one event loop. Shared
+    state is limited to the versioned module set and to per-session adaptation
+    overlays; everything a request changes about its own context lives in its
+    `RequestScope`, so an escalation for one caller never leaks into another.
+    
+    Module instances are held through `ModuleHandle`s. Hot-swaps install the
+    new version for new requests while the old one drains: its `cleanup()`
+    runs in the background after the last request using it completes.
+    """
+    
+    def __init__(self, registry: ModuleRegistry, base_context: Dict[str, Any],
+                 max_in_flight: int = 64, max_sessions: int = 1024,
+                 predictive_loading: bool = False,
+                 module_loader: Optional[ModuleLoader] = None,
+                 adaptation_config: Optional[Dict[str, Any]] = None):
         self.registry = registry
         self.base_context = base_context
-        self.active_modules: Dict[str, ModuleInterface] = {}
+        self.module_loader = module_loader or ModuleLoader()
+        self.prompt_assembler = PromptAssembler(
+            token_counter=registry.token_counter.count if registry.token_counter else estimate_tokens
+        )
         self.performance_monitor = PerformanceMonitor()
-        self.adaptation_rules = AdaptationRuleEngine()
+        self.adaptation_rules = AdaptationRuleEngine(adaptation_config, max_sessions=max_sessions)
+        self._swap_times: deque = deque()
+        self.adaptation_stats = {
+            'swaps': 0,
+            'swaps_rate_limited': 0,
+            'swaps_skipped': 0,
+            'escalations': 0,
+            'security_layers': 0,
+            'adaptation_seconds': 0.0
+        }
+        
+        # Concurrency controls
+        self.max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._swap_lock = asyncio.Lock()
+        self._request_ids = itertools.count(1)
+        self._module_set = ModuleSet(version=0, handles={})
+        self._in_flight_count = 0
+        self._handle_generations = itertools.count(1)
+        self._draining: Dict[ModuleHandle, Optional[asyncio.Task]] = {}
+        
+        # Predictive preloading: hash-verified modules warmed while idle
+        self.predictor: Optional[ModuleSequencePredictor] = None
+        self._warm_modules: Dict[str, Any] = {}  # module_id -> (sha256, module)
+        self._prefetch_task: Optional[asyncio.Task] = None
+        if predictive_loading:
+            self.predictor = ModuleSequencePredictor(max_sessions=max_sessions)
+        
+        # Adaptation overlays, keyed by session id and bounded LRU-style
+        self.max_sessions = max_sessions
+        self.session_overlays: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    @property
+    def active_modules(self) -> Dict[str, ModuleInterface]:
+        """Modules in the currently published module set"""
+        return self._module_set.modules
+    
+    @property
+    def module_set_version(self) -> int:
+        """Version of the currently published module set"""
+        return self._module_set.version
     
     async def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Process request with adaptive module loading"""
-        
-        # Merge request with base context
-        context = {**self.base_context, **request}
-        
+        async with self._in_flight:
+            self._in_flight_count += 1
+            self.performance_monitor.set_gauge('agent_in_flight_requests', self._in_flight_count)
+            try:
+                return await self._process_scoped(self._open_scope(request))
+            finally:
+                self._in_flight_count -= 1
+                self.performance_monitor.set_gauge('agent_in_flight_requests', self._in_flight_count)
+                if self.predictor is not None and self._in_flight_count == 0:
+                    self._schedule_prefetch()
+    
+    async def _process_scoped(self, scope: RequestScope) -> Dict[str, Any]:
+        """Run one request inside its isolated scope"""
+        try:
+            return await self._execute_scoped(scope)
+        finally:
+            if scope.module_set is not None:
+                self._release_module_set(scope.module_set, scope.module_ids)
+    
+    async def _execute_scoped(self, scope: RequestScope) -> Dict[str, Any]:
+        """Select, pin and execute the module chain for one request"""
         # Select optimal modules for this context
-        selected_modules = self.registry.select_modules(context)
+        selected_modules = self.registry.select_modules(scope.context)
+        if self.predictor is not None:
+            self.predictor.observe(
+                (module.id for module in selected_modules),
+                mode=scope.context.get('orchestration_mode'),
+                session_id=scope.session_id
+            )
         
-        # Hot-swap modules if needed
-        await self._update_active_modules(selected_modules)
+        # Hot-swap modules if needed; the request pins the resulting version
+        module_set = await self._update_active_modules(selected_modules)
+        scope.module_set = module_set
+        scope.module_ids = [module.id for module in selected_modules if module.id in module_set.handles]
+        self._pin_module_set(module_set, scope.module_ids)
         
         # Build chain for this request
-        chain = self._build_chain(context, selected_modules)
+        chain = self._build_chain(scope, selected_modules)
         
         # Execute with monitoring
         start_time = datetime.utcnow()
+        mode = scope.context.get('orchestration_mode')
         try:
-            result = await chain.execute(context)
+            result = await chain.execute(scope.context)
+            elapsed = (datetime.utcnow() - start_time).total_seconds()
+            scope.latency_ms = elapsed * 1000
+            self.performance_monitor.record_request(mode, elapsed, success=True)
             
             # Monitor performance and adapt
-            await self._monitor_and_adapt(context, result, start_time)
+            await self._monitor_and_adapt(scope, result, start_time)
             
             return result
             
         except Exception as e:
+            self.performance_monitor.record_request(
+                mode, (datetime.utcnow() - start_time).total_seconds(), success=False
+            )
+            
             # Handle failure and potentially switch modules
-            await self._handle_failure(context, e, start_time)
+            await self._handle_failure(scope, e, start_time)
             raise
     
-    async def _update_active_modules(self, selected_modules: List[ModuleMetadata]):
+    def _open_scope(self, request: Dict[str, Any]) -> RequestScope:
+        """Build the isolated context for a single request"""
+        session_id = request.get('session_id', self.base_context.get('session_id'))
+        overlay = dict(self.session_overlays.get(session_id, {})) if session_id else {}
+        
+        # Explicit request values still win over learned session adaptations
+        context = {**self.base_context, **overlay, **request}
+        
+        return RequestScope(
+            request_id=next(self._request_ids),
+            context=context,
+            session_id=session_id,
+            overlay=overlay
+        )
+    
+    def _publish_module_set(self, handles: Dict[str, ModuleHandle]) -> ModuleSet:
+        """Publish a new module set version (caller holds the swap lock)"""
+        self._module_set = ModuleSet(version=self._module_set.version + 1, handles=handles)
+        self.performance_monitor.set_gauge('agent_module_set_version', self._module_set.version)
+        return self._module_set
+    
+    def _new_handle(self, metadata: ModuleMetadata, module: ModuleInterface) -> ModuleHandle:
+        return ModuleHandle(
+            module_id=metadata.id,
+            module=module,
+            generation=next(self._handle_generations),
+            sha256_hash=metadata.sha256_hash
+        )
+    
+    def _pin_module_set(self, module_set: ModuleSet, module_ids: List[str]):
+        """Hold the handles a request runs for its duration
+        
+        Only the request's own modules: pinning the whole set would keep
+        modules nobody selects any more alive under overlapping traffic.
+        """
+        for module_id in module_ids:
+            module_set.handles[module_id].acquire()
+    
+    def _release_module_set(self, module_set: ModuleSet, module_ids: List[str]):
+        """Release a request's handles, draining any that were retired meanwhile"""
+        for module_id in module_ids:
+            handle = module_set.handles[module_id]
+            if handle.release():
+                self._schedule_cleanup(handle)
+    
+    def _retire_handle(self, handle: ModuleHandle):
+        """Take a handle out of service; clean up now or when it drains"""
+        if handle.retire():
+            self._schedule_cleanup(handle)
+        else:
+            self._draining[handle] = None
+            self.performance_monitor.set_gauge('agent_draining_modules', len(self._draining))
+    
+    def _schedule_cleanup(self, handle: ModuleHandle):
+        """Run cleanup off the request path so releasing never adds latency"""
+        task = asyncio.get_running_loop().create_task(self._unload_module(handle.module_id, handle.module))
+        self._draining[handle] = task
+        task.add_done_callback(lambda done: self._finish_drain(handle, done))
+        self.performance_monitor.set_gauge('agent_draining_modules', len(self._draining))
+    
+    def _discard_module(self, module_id: str, module: ModuleInterface):
+        """Clean up a loaded module that never entered a module set (e.g. warm)"""
+        handle = ModuleHandle(module_id=module_id, module=module,
+                              generation=next(self._handle_generations), retired=True)
+        self._schedule_cleanup(handle)
+    
+    def _finish_drain(self, handle: ModuleHandle, task: asyncio.Task):
+        """Forget a drained handle, surfacing any error its cleanup raised"""
+        self._draining.pop(handle, None)
+        self.performance_monitor.set_gauge('agent_draining_modules', len(self._draining))
+        
+        error = None if task.cancelled() else task.exception()
+        if error is not None:
+            self.registry._log_error(f"Cleanup of module {handle.module_id} "
+                                     f"(generation {handle.generation}) failed: {error!r}")
+            self.performance_monitor.record_metrics({
+                'event_type': 'failure',
+                'error_type': 'cleanup_failure',
+                'error_message': str(error),
+                'module_id': handle.module_id
+            })
+    
+    async def drain(self):
+        """Wait for every retired module to finish draining and cleaning up
+        
+        Stops any background prefetch and cleans up the warm pool as well.
+        """
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+            await asyncio.gather(self._prefetch_task, return_exceptions=True)
+        for module_id in list(self._warm_modules):
+            _, module = self._warm_modules.pop(module_id)
+            self._discard_module(module_id, module)
+        
+        while self._draining:
+            tasks = [task for task in self._draining.values() if task is not None]
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            else:
+                await asyncio.sleep(0.01)
+    
+    async def _update_active_modules(self, selected_modules: List[ModuleMetadata]) -> ModuleSet:
         """Hot-swap modules based on selection"""
-        current_ids = set(self.active_modules.keys())
         required_ids = {module.id for module in selected_modules}
         
-        # Remove unneeded modules
-        for module_id in current_ids - required_ids:
-            await self._unload_module(module_id)
+        # Fast path: nothing to swap, no lock needed
+        current = self._module_set
+        if required_ids == current.handles.keys():
+            return current
         
-        # Load new modules
-        for module in selected_modules:
-            if module.id not in current_ids:
-                await self._load_module(module)
+        async with self._swap_lock:
+            current = self._module_set
+            if required_ids == current.handles.keys():
+                return current
+            
+            # Keep needed modules and those other in-flight requests still hold,
+            # so concurrent requests with different selections never evict
+            # (and reload) each other's modules
+            handles = {
+                module_id: handle for module_id, handle in current.handles.items()
+                if module_id in required_ids or handle.refs > 0
+            }
+            if handles.keys() == current.handles.keys() and required_ids <= handles.keys():
+                return current
+            
+            for module in selected_modules:
+                if module.id not in handles:
+                    warm = self._take_warm_module(module)
+                    impl = warm if warm is not None else await self._load_module(module)
+                    handles[module.id] = self._new_handle(module, impl)
+            
+            # Retire modules nobody needs any more; they drain before cleanup
+            for module_id in current.handles.keys() - handles.keys():
+                self._retire_handle(current.handles[module_id])
+            
+            return self._publish_module_set(handles)
     
-    async def _load_module(self, metadata: ModuleMetadata):
+    async def _load_module(self, metadata: ModuleMetadata) -> ModuleInterface:
         """Dynamically load module with integrity check"""
         try:
-            # Verify integrity
-            actual_hash = self.registry._compute_hash(metadata.file_path)
-            if actual_hash != metadata.sha256_hash:
-                raise ValueError(f"Integrity check failed for {metadata.id}")
-            
-            # Load module implementation
+            # Load module implementation (the loader verifies integrity)
             module_impl = await self._instantiate_module(metadata)
             
             # Validate interface compliance
             if not hasattr(module_impl, 'process'):
                 raise TypeError(f"Module {metadata.id} does not implement ModuleInterface")
             
-            self.active_modules[metadata.id] = module_impl
+            # Count what was actually loaded (managed content may differ from the file)
+            if self.registry.token_counter is not None:
+                managed = self._managed_text(metadata) is not None
+                metadata.token_estimate = self.registry.token_counter.count(
+                    self._module_text(metadata), None if managed else metadata.sha256_hash
+                )
+            
+            return module_impl
             
         except Exception as e:
             self.registry.log_performance(metadata.id, {
@@ -549,41 +1193,79 @@ class AdaptiveAgent:
             })
             raise
     
-    async def _unload_module(self, module_id: str):
-        """Unload module and free resources"""
-        if module_id in self.active_modules:
-            # Perform cleanup if module supports it
-            module = self.active_modules[module_id]
-            if hasattr(module, 'cleanup'):
-                await module.cleanup()
-            
-            del self.active_modules[module_id]
+    def _take_warm_module(self, metadata: ModuleMetadata) -> Optional[ModuleInterface]:
+        """Claim a prefetched module if it was verified against the current hash"""
+        warm = self._warm_modules.pop(metadata.id, None)
+        if warm is None:
+            return None
+        
+        sha256_hash, module = warm
+        if sha256_hash != metadata.sha256_hash:
+            self.predictor.stats.wasted_loads += 1
+            self._discard_module(metadata.id, module)
+            return None
+        
+        self.predictor.stats.warm_hits += 1
+        return module
     
-    async def _instantiate_module(self, metadata: ModuleMetadata) -> ModuleInterface:
-        """Instantiate module from metadata (placeholder implementation)"""
-        # In real implementation, this would dynamically load and instantiate
-        # the module class from the file_path
-        class DummyModule:
-            async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-                return {'processed': True, 'quality_score': 0.8}
+    def _schedule_prefetch(self):
+        """Start a background prefetch unless one is already running"""
+        if self._prefetch_task is None or self._prefetch_task.done():
+            self._prefetch_task = asyncio.get_running_loop().create_task(self._prefetch_predicted())
+    
+    async def _prefetch_predicted(self):
+        """Warm the modules the predictor expects the next request to need"""
+        predicted = self.predictor.predict()
+        
+        # Warm modules that fell out of the prediction were wasted work
+        for module_id in list(self._warm_modules):
+            if module_id not in predicted:
+                _, module = self._warm_modules.pop(module_id)
+                self.predictor.stats.wasted_loads += 1
+                self._discard_module(module_id, module)
+        
+        for module_id in predicted - self._module_set.handles.keys() - self._warm_modules.keys():
+            # Only use idle time; a new request takes priority
+            if self._in_flight_count:
+                break
             
-            def validate_input(self, context: Dict[str, Any]) -> bool:
-                return True
+            metadata = self.registry.modules.get(module_id)
+            if metadata is None:
+                continue
+            try:
+                module = await self._load_module(metadata)
+            except Exception:
+                continue
             
-            def validate_output(self, result: Dict[str, Any]) -> bool:
-                return True
-        
-        return DummyModule()
+            self._warm_modules[module_id] = (metadata.sha256_hash, module)
+            self.predictor.stats.prefetched_loads += 1
     
-    def _build_chain(self, context: Dict, modules: List[ModuleMetadata]) -> ModuleChain:
+    def prefetch_report(self) -> Dict[str, Any]:
+        """Prediction accuracy and wasted prefetch loads"""
+        if self.predictor is None:
+            return {'enabled': False}
+        return {'enabled': True, 'warm_modules': len(self._warm_modules), **self.predictor.stats.report()}
+    
+    async def _unload_module(self, module_id: str, module: ModuleInterface):
+        """Unload module and free resources"""
+        # Perform cleanup if module supports it
+        if hasattr(module, 'cleanup'):
+            await module.cleanup()
+    
+    async def _instantiate_module(self, metadata: ModuleMetadata) -> ModuleInterface:
+        """Instantiate module from metadata via the content-addressed loader"""
+        return self.module_loader.load(metadata)
+    
+    def _build_chain(self, scope: RequestScope, modules: List[ModuleMetadata]) -> ModuleChain:
         """Build execution chain from selected modules"""
-        chain = ModuleChain(self.registry)
+        chain = ModuleChain(self.registry, self.performance_monitor)
+        handles = scope.module_set.handles
         
         for module_meta in modules:
-            if module_meta.id in self.active_modules:
+            if module_meta.id in handles:
                 step = ChainStep(
                     module_id=module_meta.id,
-                    module=self.active_modules[module_meta.id],
+                    module=handles[module_meta.id].module,
                     context_mapping={},  # Could be configured per module
                     output_mapping={}
                 )
@@ -591,53 +1273,145 @@ class AdaptiveAgent:
         
         return chain
     
-    async def _monitor_and_adapt(self, context: Dict, result: Dict, start_time: datetime):
+    def assemble_system_prompt(self, modules: List[ModuleMetadata]) -> AssembledPrompt:
+        """Turn selected modules into a prefix-stable system prompt"""
+        fragments = self.prompt_assembler.fragments_for_modules(
+            modules, self._module_text, lambda metadata: self._managed_text(metadata) is not None
+        )
+        return self.prompt_assembler.assemble(fragments)
+    
+    def _module_text(self, metadata: ModuleMetadata) -> str:
+        """Prompt text for a module (managed content takes precedence)"""
+        managed_content = self._managed_text(metadata)
+        if managed_content is not None:
+            return managed_content
+        return self.module_loader.read_text(metadata)
+    
+    def _managed_text(self, metadata: ModuleMetadata) -> Optional[str]:
+        """Content served in place of the module's file, if any"""
+        return None
+    
+    async def _monitor_and_adapt(self, scope: RequestScope, result: Dict, start_time: datetime):
         """Monitor performance and trigger adaptations"""
         latency = (datetime.utcnow() - start_time).total_seconds()
-        quality_score = result.get('quality_score', 0.0)
         
-        # Check adaptation rules
-        adaptations = self.adaptation_rules.evaluate({
-            'context': context,
+        # Check adaptation rules; modules that report no quality score (prompt
+        # modules, for one) leave the quality rules untouched
+        adaptations = self.adaptation_rules.evaluate_windowed({
+            'context': scope.context,
             'result': result,
             'latency_seconds': latency,
-            'quality_score': quality_score,
-            'active_modules': list(self.active_modules.keys())
-        })
+            'quality_score': result.get('quality_score'),
+            'active_modules': list(scope.module_ids)
+        }, session_id=scope.session_id)
         
         # Apply adaptations
-        for adaptation in adaptations:
-            await self._apply_adaptation(adaptation)
+        await self._apply_adaptations(adaptations, scope)
+    
+    async def _apply_adaptations(self, adaptations: List[Dict[str, Any]], scope: RequestScope):
+        """Apply adaptations, accounting for the time spent adapting"""
+        if not adaptations:
+            return
+        
+        start = time.perf_counter()
+        try:
+            for adaptation in adaptations:
+                result = await self._apply_adaptation(adaptation, scope)
+                self.performance_monitor.record_adaptation(adaptation['type'], result)
+        finally:
+            self.adaptation_stats['adaptation_seconds'] += time.perf_counter() - start
     
-    async def _apply_adaptation(self, adaptation: Dict[str, Any]):
-        """Apply runtime adaptation"""
+    async def _apply_adaptation(self, adaptation: Dict[str, Any], scope: RequestScope) -> str:
+        """Apply runtime adaptation; returns 'applied', 'skipped' or 'rate_limited'"""
         if adaptation['type'] == 'swap_module':
             old_id = adaptation['old_module_id']
-            new_metadata = self.registry.modules[adaptation['new_module_id']]
+            new_metadata = self.registry.modules.get(adaptation['new_module_id'])
             
-            await self._unload_module(old_id)
-            await self._load_module(new_metadata)
+            async with self._swap_lock:
+                current = self._module_set
+                
+                # Swaps that would change nothing never pay unload/load/hash costs
+                if (new_metadata is None or old_id not in current.handles
+                        or new_metadata.id in current.handles):
+                    self.adaptation_stats['swaps_skipped'] += 1
+                    return 'skipped'
+                if not self._take_swap_slot():
+                    self.adaptation_stats['swaps_rate_limited'] += 1
+                    return 'rate_limited'
+                
+                # Install the new version first; the old one drains in the background
+                handles = dict(current.handles)
+                old_handle = handles.pop(old_id)
+                new_module = await self._load_module(new_metadata)
+                handles[new_metadata.id] = self._new_handle(new_metadata, new_module)
+                self._publish_module_set(handles)
+                self._retire_handle(old_handle)
+                self.adaptation_stats['swaps'] += 1
+                return 'applied'
             
         elif adaptation['type'] == 'escalate_mode':
-            self.base_context['orchestration_mode'] = adaptation['new_mode']
+            # Escalations only affect this request's session, never base_context
+            self._set_overlay(scope, 'orchestration_mode', adaptation['new_mode'])
+            self.adaptation_stats['escalations'] += 1
+            return 'applied'
             
         elif adaptation['type'] == 'add_security_layer':
             security_modules = self.registry.select_modules({
-                **self.base_context,
+                **scope.context,
                 'features': ['enhanced_security']
             })
-            for module in security_modules:
-                if module.id not in self.active_modules:
-                    await self._load_module(module)
+            
+            async with self._swap_lock:
+                handles = dict(self._module_set.handles)
+                missing = [module for module in security_modules if module.id not in handles]
+                if missing:
+                    for module in missing:
+                        handles[module.id] = self._new_handle(module, await self._load_module(module))
+                    self._publish_module_set(handles)
+                    self.adaptation_stats['security_layers'] += 1
+                    return 'applied'
+        
+        return 'skipped'
+    
+    def _take_swap_slot(self) -> bool:
+        """Enforce the swaps-per-minute cap (caller holds the swap lock)"""
+        limit = self.adaptation_rules.max_swaps_per_minute
+        if limit is None:
+            return True
+        
+        now = time.monotonic()
+        while self._swap_times and now - self._swap_times[0] >= 60.0:
+            self._swap_times.popleft()
+        if len(self._swap_times) >= limit:
+            return False
+        
+        self._swap_times.append(now)
+        return True
+    
+    def adaptation_report(self) -> Dict[str, Any]:
+        """Swap counts, time spent adapting and per-rule trigger state"""
+        return {**self.adaptation_stats, 'rules': self.adaptation_rules.rule_report()}
     
-    async def _handle_failure(self, context: Dict, error: Exception, start_time: datetime):
+    def _set_overlay(self, scope: RequestScope, key: str, value: Any):
+        """Record an adaptation in the request overlay and its session"""
+        scope.overlay[key] = value
+        if scope.session_id is None:
+            return
+        
+        overlay = self.session_overlays.pop(scope.session_id, {})
+        overlay[key] = value
+        self.session_overlays[scope.session_id] = overlay
+        while len(self.session_overlays) > self.max_sessions:
+            self.session_overlays.popitem(last=False)
+    
+    async def _handle_failure(self, scope: RequestScope, error: Exception, start_time: datetime):
         """Handle processing failure"""
         # Log failure
         self.performance_monitor.record_metrics({
             'event_type': 'failure',
             'error_type': type(error).__name__,
             'error_message': str(error),
-            'context_hash': hash(str(context)),
+            'context_hash': hash(str(scope.context)),
             'latency_seconds': (datetime.utcnow() - start_time).total_seconds()
         })
         
@@ -648,8 +1422,199 @@ class AdaptiveAgent:
             'reason': f'Processing failure: {error}'
         }]
         
-        for adaptation in recovery_adaptations:
-            await self._apply_adaptation(adaptation)
+        await self._apply_adaptations(recovery_adaptations, scope)
+
+
+class ManagedModularAgent(AdaptiveAgent):
+    """Agent with integrated prompt management"""
+    
+    def __init__(self, registry: ModuleRegistry, prompt_manager: PromptManager,
+                 base_context: Dict[str, Any], **kwargs):
+        super().__init__(registry, base_context, **kwargs)
+        self.prompt_manager = prompt_manager
+        self.usage_logger = BufferedUsageLogger(prompt_manager)
+        # Content fetched for managed modules, owned here rather than written
+        # onto the registry's shared metadata
+        self._managed_content: Dict[str, str] = {}  # module_id -> latest content
+        self._managed_arms: Dict[str, Dict[str, str]] = {}  # module_id -> {variant: content}
+    
+    async def _load_module(self, metadata: ModuleMetadata) -> ModuleInterface:
+        """Load module with prompt management integration
+        
+        Managed prompts serve their `latest` version. When the prompt manager
+        has an experiment configured for one, every arm is loaded and each
+        request picks its own through the A/B test.
+        """
+        if metadata.id.startswith('managed_'):
+            arms = await self.prompt_manager.experiment_variants(metadata.id)
+            if len(arms) > 1:
+                self._managed_arms[metadata.id] = {
+                    variant: await self.prompt_manager.get_prompt_version(metadata.id, variant)
+                    for variant in arms
+                }
+            else:
+                self._managed_arms.pop(metadata.id, None)
+            self._managed_content[metadata.id] = await self.prompt_manager.get_prompt_version(metadata.id, 'latest')
+        
+        return await super()._load_module(metadata)
+    
+    async def _instantiate_module(self, metadata: ModuleMetadata) -> ModuleInterface:
+        """Managed modules run the prompt manager's content, not the file on disk"""
+        arms = self._managed_arms.get(metadata.id)
+        if arms:
+            return PromptVariantsModule(
+                metadata.id,
+                {variant: PromptModule(metadata.id, content, variant=variant) for variant, content in arms.items()},
+                self.prompt_manager.ab_test
+            )
+        managed_content = self._managed_text(metadata)
+        if managed_content is not None:
+            return PromptModule(metadata.id, managed_content)
+        return await super()._instantiate_module(metadata)
+    
+    def _managed_text(self, metadata: ModuleMetadata) -> Optional[str]:
+        return self._managed_content.get(metadata.id)
+    
+    async def _execute_scoped(self, scope: RequestScope) -> Dict[str, Any]:
+        """Execute, then log prompt usage for the modules this request ran"""
+        result = await super()._execute_scoped(scope)
+        
+        # Arms this request was allocated, by the modules it ran
+        scope.variants.update(result.get('prompt_variants', {}))
+        
+        # Only the request's own modules: the published set may have moved on,
+        # or hold modules pinned for other in-flight requests (queued, written
+        # in the background). Scores the modules did not report are left out.
+        metrics = {'latency_ms': scope.latency_ms, 'context': self.base_context}
+        for key, source in (('effectiveness_score', 'quality_score'), ('user_satisfaction', 'user_satisfaction')):
+            if result.get(source) is not None:
+                metrics[key] = result[source]
+        
+        for module_id in scope.module_ids:
+            if module_id in scope.variants:
+                self.usage_logger.log(module_id, {**metrics, 'variant': scope.variants[module_id]})
+            else:
+                self.usage_logger.log(module_id, metrics)
+        
+        return result
+    
+    async def drain(self):
+        """Drain retired modules and flush buffered usage events"""
+        await super().drain()
+        await self.usage_logger.flush()
+    
+    async def close(self):
+        """Shut down: drain, then stop the usage logger after a final flush"""
+        await super().drain()
+        await self.usage_logger.close()
+        await self.prompt_manager.close()
+
+
+class ProductionOrchestratorAgent(ManagedModularAgent):
+    """Orchestrator that picks its orchestration mode from orchestration_modes.yaml
+    
+    The mode rules read `task_context` (assessed from the request text) and
+    `past_outcomes` (the session's recent build outcomes); values passed in
+    `user_context` take precedence over both. A mode the session was
+    escalated to by an adaptation (failure recovery, quality rules) wins over
+    the rules; an explicit `orchestration_mode` in `user_context` wins over
+    everything.
+    """
+    
+    TASK_KEYWORDS = {
+        'novel': ['novel', 'experimental', 'prototype*', 'research*', 'from scratch', 'never been'],
+        'complex': ['distributed', 'multi-agent', 'microservice*', 'pipeline*', 'integrat*',
+                    'orchestrat*', 'real-time', 'concurren*', 'scalab*'],
+        'security': ['security', 'secure', 'auth*', 'password*', 'credential*', 'secret*',
+                     'encrypt*', 'payment*', 'pii', 'gdpr', 'hipaa', 'compliance'],
+        'enterprise': ['enterprise', 'production', 'mission-critical', 'sla', 'regulated']
+    }
+    
+    def __init__(self, registry: ModuleRegistry, prompt_manager: PromptManager,
+                 base_context: Dict[str, Any], mode_selector: ModeSelector,
+                 max_outcomes: int = 20, **kwargs):
+        super().__init__(registry, prompt_manager, base_context, **kwargs)
+        self.mode_selector = mode_selector
+        self.task_matcher = KeywordMatcher(self.TASK_KEYWORDS)
+        self.max_outcomes = max_outcomes
+        self.past_outcomes: "OrderedDict[str, deque]" = OrderedDict()
+    
+    async def orchestrate_build(self, user_request: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Main orchestration method with dynamic adaptation"""
+        session_id = user_context.get('session_id', self.base_context.get('session_id'))
+        context = {
+            'user_request': user_request,
+            'user_role': self._infer_user_role(user_context),
+            'past_outcomes': list(self.past_outcomes.get(session_id, ())),
+            **user_context,
+            'task_context': {**self._assess_task(user_request, user_context),
+                             **user_context.get('task_context', {})}
+        }
+        
+        # Determine orchestration mode, unless given or escalated for this session
+        escalated = self.session_overlays.get(session_id, {}).get('orchestration_mode') if session_id else None
+        if 'orchestration_mode' in user_context:
+            context['orchestration_mode_reason'] = 'Requested'
+        elif escalated is not None:
+            context['orchestration_mode'] = escalated
+            context['orchestration_mode_reason'] = 'Escalated by adaptation'
+        else:
+            context['orchestration_mode'] = self._determine_orchestration_mode(context)
+        
+        try:
+            result = await self.process_request(context)
+        except Exception:
+            self.record_outcome(session_id, 'build_failed')
+            raise
+        self.record_outcome(session_id, 'degraded' if result.get('degraded_mode') else 'success')
+        return result
+    
+    def record_outcome(self, session_id: Optional[str], outcome: str):
+        """Remember a build outcome (e.g. 'test_failed', 'build_failed') for the session's next mode choice"""
+        if session_id is None:
+            return
+        outcomes = self.past_outcomes.pop(session_id, None) or deque(maxlen=self.max_outcomes)
+        outcomes.append(outcome)
+        self.past_outcomes[session_id] = outcomes
+        while len(self.past_outcomes) > self.max_sessions:
+            self.past_outcomes.popitem(last=False)
+    
+    def _assess_task(self, user_request: str, user_context: Dict) -> Dict[str, Any]:
+        """Keyword assessment of complexity, security sensitivity and quality bar"""
+        hits = self.task_matcher.scan(user_request)
+        
+        if 'novel' in hits:
+            complexity = 'novel'
+        elif 'complex' in hits:
+            complexity = 'complex'
+        elif len(user_request.split()) < 12:
+            complexity = 'simple'
+        else:
+            complexity = 'medium'
+        
+        enterprise = 'enterprise' in hits or user_context.get('expertise_indicators', {}).get('enterprise_context', False)
+        return {
+            'complexity': complexity,
+            'security_sensitive': 'security' in hits,
+            'quality_requirement': 'enterprise' if enterprise else 'standard'
+        }
+    
+    def _infer_user_role(self, user_context: Dict) -> str:
+        """Dynamically infer user role from context and behavior"""
+        expertise_indicators = user_context.get('expertise_indicators', {})
+        
+        if expertise_indicators.get('successful_builds', 0) >= 3:
+            return 'EXPERT'
+        elif expertise_indicators.get('enterprise_context', False):
+            return 'ADMIN'
+        else:
+            return 'NOVICE'
+    
+    def _determine_orchestration_mode(self, context: Dict) -> str:
+        """First matching `mode_selection.priority_rules` entry (precompiled)"""
+        mode, reason = self.mode_selector.select(context)
+        context['orchestration_mode_reason'] = reason
+        return mode
 
 
 # Example usage and configuration
@@ -660,9 +1625,19 @@ def create_production_orchestrator(config_path: Path) -> AdaptiveAgent:
     with open(config_path) as f:
         config = yaml.safe_load(f)
     
-    # Initialize registry
+    # Initialize registry, with token counts for the configured model family
+    token_counter = None
+    token_config = config.get('token_counting')
+    if token_config:
+        cache_path = token_config.get('cache_path')
+        token_counter = TokenCounter(
+            model=token_config.get('model', 'gpt-4'),
+            cache_path=Path(cache_path) if cache_path else None
+        )
     registry_path = Path(config['registry_path'])
-    registry = ModuleRegistry(registry_path)
+    registry = ModuleRegistry(registry_path, token_counter=token_counter)
+    if token_counter is not None:
+        token_counter.save()
     
     # Base context from config
     base_context = {
@@ -671,8 +1646,28 @@ def create_production_orchestrator(config_path: Path) -> AdaptiveAgent:
         'compliance_level': config.get('compliance_level', 'enterprise')
     }
     
-    # Create adaptive agent
-    agent = AdaptiveAgent(registry, base_context)
+    agent_options = {
+        'predictive_loading': config.get('predictive_loading', False),
+        'adaptation_config': config.get('adaptation_rules')
+    }
+    
+    # Create adaptive agent, with local prompt management when configured
+    prompt_config = config.get('prompt_manager')
+    if prompt_config:
+        if prompt_config.get('type', 'local') != 'local':
+            raise ValueError(f"Unsupported prompt manager type: {prompt_config['type']}")
+        prompt_manager = LocalPromptManager(Path(prompt_config['base_path']))
+        if config.get('orchestration_modes'):
+            mode_selector = ModeSelector.from_file(Path(config['orchestration_modes']))
+            agent = ProductionOrchestratorAgent(registry, prompt_manager, base_context, mode_selector, **agent_options)
+        else:
+            agent = ManagedModularAgent(registry, prompt_manager, base_context, **agent_options)
+    else:
+        agent = AdaptiveAgent(registry, base_context, **agent_options)
+    
+    # One-shot import of a prebuilt module bundle, if configured
+    if config.get('module_bundle'):
+        agent.module_loader.preload_bundle(Path(config['module_bundle']))
     
     return agent
 
@@ -0,0 +1,96 @@
+"""
+Multi-Pattern Keyword Matcher
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Aho-Corasick automaton with word-boundary filtering
+
+Request analysis checks dozens of keyword lists against the same text. This
+module compiles all of them into one Aho-Corasick automaton keyed by label,
+so a single pass over the lower-cased request finds every hit in time
+linear in the text length (plus the number of matches), however many
+keywords are configured.
+
+Matches must start at a word boundary and, unless the keyword ends with
+`*`, end at one: `new` does not match "renewal" or "knew", while
+`pattern*` matches "pattern" and "patterns".
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """Single-pass matcher from keywords to the labels they signal"""
+    
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.labels = sorted(groups)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (keyword length, needs right boundary, labels)
+        self._output: List[List[Tuple[int, bool, Tuple[str, ...]]]] = [[]]
+        
+        keyword_labels: Dict[Tuple[str, bool], List[str]] = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                prefix = keyword.endswith('*')
+                keyword = keyword.rstrip('*')
+                if keyword:
+                    keyword_labels.setdefault((keyword, prefix), []).append(label)
+        
+        for (keyword, prefix), labels in keyword_labels.items():
+            self._insert(keyword, not prefix, tuple(dict.fromkeys(labels)))
+        self._build_failure_links()
+    
+    def _insert(self, keyword: str, whole_word: bool, labels: Tuple[str, ...]):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(keyword), whole_word, labels))
+    
+    def _build_failure_links(self):
+        """Breadth-first failure links; outputs inherit their failure state's"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+                queue.append(next_state)
+    
+    def scan(self, text: str) -> Set[str]:
+        """Labels of every keyword found in `text` (case-insensitive)"""
+        return {label for _, _, labels in self.iter_matches(text) for label in labels}
+    
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, Tuple[str, ...]]]:
+        """Yield (start, end, labels) for each word-bounded keyword occurrence"""
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(text)
+        state = 0
+        
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            
+            for keyword_length, whole_word, labels in output[state]:
+                start = i - keyword_length + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if whole_word and i + 1 < length and _is_word_char(text[i + 1]):
+                    continue
+                yield start, i + 1, labels
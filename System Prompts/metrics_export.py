@@ -0,0 +1,258 @@
+"""
+Metrics Export Surface
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Bounded in-process metrics with Prometheus/OpenMetrics export
+
+Keeps cumulative counters, gauges and histograms keyed by label set, plus a
+ring of time buckets for recent rollups (e.g. "last 5 minutes"). Memory is
+bounded by the series cap and the bucket retention, never by traffic.
+Exposition is available as text (Prometheus 0.0.4 or OpenMetrics 1.0), as an
+atomically written textfile for node-exporter style collection, or over a
+minimal HTTP endpoint.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import bisect
+import os
+import threading
+import time
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelKey]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+@dataclass
+class HistogramState:
+    """Cumulative histogram for one label set"""
+    bucket_counts: List[int]
+    count: int = 0
+    total: float = 0.0
+
+
+@dataclass
+class TimeBucket:
+    """Rollup of counter increments and observations within one time slice"""
+    start: float
+    counters: Dict[SeriesKey, float] = field(default_factory=dict)
+    observations: Dict[SeriesKey, List[float]] = field(default_factory=dict)  # [count, sum]
+
+
+class MetricsStore:
+    """Thread-safe, bounded metrics store with time-bucketed rollups"""
+    
+    def __init__(self, bucket_seconds: float = 60.0, retention_buckets: int = 60,
+                 max_series: int = 10000, clock: Callable[[], float] = time.time):
+        self.bucket_seconds = bucket_seconds
+        self.max_series = max_series
+        self.clock = clock
+        self.families: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[SeriesKey, float] = {}
+        self.gauges: Dict[SeriesKey, float] = {}
+        self.histograms: Dict[SeriesKey, HistogramState] = {}
+        self.rollups: deque = deque(maxlen=retention_buckets)
+        self.dropped_series = 0
+        self._lock = threading.Lock()
+    
+    def describe(self, name: str, metric_type: str, help_text: str,
+                 buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        """Declare a metric family (counter, gauge or histogram)"""
+        self.families[name] = {'type': metric_type, 'help': help_text, 'buckets': tuple(sorted(buckets))}
+    
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, value: float = 1.0):
+        """Increment a counter"""
+        key = (name, self._label_key(labels))
+        with self._lock:
+            if not self._admit(key, self.counters):
+                return
+            self.counters[key] = self.counters.get(key, 0.0) + value
+            rollup = self._current_bucket().counters
+            rollup[key] = rollup.get(key, 0.0) + value
+    
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Set a gauge to an absolute value"""
+        key = (name, self._label_key(labels))
+        with self._lock:
+            if self._admit(key, self.gauges):
+                self.gauges[key] = float(value)
+    
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Record one observation in a histogram"""
+        key = (name, self._label_key(labels))
+        buckets = self.families[name]['buckets']
+        with self._lock:
+            state = self.histograms.get(key)
+            if state is None:
+                if not self._admit(key, self.histograms):
+                    return
+                state = self.histograms[key] = HistogramState(bucket_counts=[0] * (len(buckets) + 1))
+            
+            state.bucket_counts[bisect.bisect_left(buckets, value)] += 1
+            state.count += 1
+            state.total += value
+            
+            rollup = self._current_bucket().observations.setdefault(key, [0, 0.0])
+            rollup[0] += 1
+            rollup[1] += value
+    
+    def snapshot(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Programmatic view: cumulative values, or rollups over a recent window"""
+        with self._lock:
+            if window_seconds is None:
+                return {
+                    'counters': {self._series_name(k): v for k, v in self.counters.items()},
+                    'gauges': {self._series_name(k): v for k, v in self.gauges.items()},
+                    'histograms': {
+                        self._series_name(k): {'count': s.count, 'sum': s.total}
+                        for k, s in self.histograms.items()
+                    },
+                    'dropped_series': self.dropped_series
+                }
+            
+            cutoff = self.clock() - window_seconds
+            counters: Dict[str, float] = {}
+            observations: Dict[str, Dict[str, float]] = {}
+            for bucket in self.rollups:
+                if bucket.start + self.bucket_seconds <= cutoff:
+                    continue
+                for key, value in bucket.counters.items():
+                    name = self._series_name(key)
+                    counters[name] = counters.get(name, 0.0) + value
+                for key, (count, total) in bucket.observations.items():
+                    entry = observations.setdefault(self._series_name(key), {'count': 0, 'sum': 0.0})
+                    entry['count'] += count
+                    entry['sum'] += total
+            
+            for entry in observations.values():
+                entry['mean'] = entry['sum'] / entry['count'] if entry['count'] else 0.0
+            
+            return {
+                'window_seconds': window_seconds,
+                'counters': counters,
+                'histograms': observations,
+                'gauges': {self._series_name(k): v for k, v in self.gauges.items()}
+            }
+    
+    def render(self, openmetrics: bool = False) -> str:
+        """Text exposition in Prometheus 0.0.4 or OpenMetrics 1.0 format"""
+        lines: List[str] = []
+        with self._lock:
+            for name, family in sorted(self.families.items()):
+                metric_type = family['type']
+                base = name[:-len('_total')] if openmetrics and name.endswith('_total') else name
+                lines.append(f"# HELP {base} {family['help']}")
+                lines.append(f"# TYPE {base} {metric_type}")
+                
+                if metric_type == 'counter':
+                    for (series, labels), value in sorted(self.counters.items()):
+                        if series == name:
+                            lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+                elif metric_type == 'gauge':
+                    for (series, labels), value in sorted(self.gauges.items()):
+                        if series == name:
+                            lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+                else:
+                    for (series, labels), state in sorted(self.histograms.items(), key=lambda item: item[0]):
+                        if series == name:
+                            lines.extend(self._render_histogram(name, labels, state, family['buckets']))
+        
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+    
+    def write_textfile(self, path: Path, openmetrics: bool = False):
+        """Atomically write the exposition to a file"""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(self.render(openmetrics))
+        os.replace(tmp_path, path)
+    
+    def serve_http(self, port: int = 9464, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve /metrics from a daemon thread; OpenMetrics when the client asks for it"""
+        store = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                body = store.render(openmetrics).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+    
+    def _admit(self, key: SeriesKey, series: Dict) -> bool:
+        """Enforce the series cap (caller holds the lock)"""
+        if key in series:
+            return True
+        if len(self.counters) + len(self.gauges) + len(self.histograms) >= self.max_series:
+            self.dropped_series += 1
+            return False
+        return True
+    
+    def _current_bucket(self) -> TimeBucket:
+        """Rollup bucket for the current time slice (caller holds the lock)"""
+        now = self.clock()
+        start = now - now % self.bucket_seconds
+        if not self.rollups or self.rollups[-1].start != start:
+            self.rollups.append(TimeBucket(start=start))
+        return self.rollups[-1]
+    
+    def _render_histogram(self, name: str, labels: LabelKey, state: HistogramState,
+                          buckets: Tuple[float, ...]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(buckets, state.bucket_counts):
+            cumulative += count
+            bucket_labels = labels + (('le', self._format_value(bound)),)
+            lines.append(f"{name}_bucket{self._format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{name}_bucket{self._format_labels(labels + (('le', '+Inf'),))} {state.count}")
+        lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(state.total)}")
+        lines.append(f"{name}_count{self._format_labels(labels)} {state.count}")
+        return lines
+    
+    @staticmethod
+    def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+        if not labels:
+            return ()
+        return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+    
+    @classmethod
+    def _series_name(cls, key: SeriesKey) -> str:
+        name, labels = key
+        return f"{name}{cls._format_labels(labels)}"
+    
+    @staticmethod
+    def _format_labels(labels: LabelKey) -> str:
+        if not labels:
+            return ''
+        escaped = (
+            f'{k}="' + v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+            for k, v in labels
+        )
+        return '{' + ','.join(escaped) + '}'
+    
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return repr(float(value))
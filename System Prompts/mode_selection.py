@@ -0,0 +1,289 @@
+"""
+Orchestration Mode Selection
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Conditions from orchestration_modes.yaml compiled to closures
+
+`mode_selection.priority_rules` and each mode's `triggers` are written as
+small Python-like conditions:
+
+    task_context.complexity == 'novel' or task_context.pattern_confidence < 0.6
+    any(failure in past_outcomes for failure in ['test_failed', 'security_issue'])
+
+This module parses each condition once into a tree of closures (no `eval`,
+no `ast`), so selecting a mode on the request path is a handful of dict
+lookups and comparisons, with `and`/`or` short-circuiting and the priority
+list stopping at the first match.
+
+Supported: `and`, `or`, `not`, `==`, `!=`, `<`, `<=`, `>`, `>=`, `in`,
+`not in`, parentheses, numbers, quoted strings, `true`/`false`/`none`,
+list literals, dotted names looked up in the request context, and
+`any(... for x in ...)` / `all(...)`. A missing name evaluates to None, and
+ordering comparisons against None are False. `default_case` is always true.
+Names with a part starting with `_` are rejected at compile time, so a
+condition cannot reach private or dunder attributes of context values.
+Free-text triggers ("production deployment context") do not compile; they
+are reported in `ModeSelector.unsupported` and skipped.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from collections import ChainMap
+from pathlib import Path
+import functools
+import operator
+import re
+
+import yaml
+
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+DEFAULT_MODES_CONFIG = Path(__file__).parent / '01-Orchestrator-Architect' / 'config' / 'orchestration_modes.yaml'
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<op>==|!=|<=|>=|<|>|\(|\)|\[|\]|,)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+    )""", re.VERBOSE)
+
+_CONSTANTS = {
+    'true': True, 'True': True,
+    'false': False, 'False': False,
+    'none': None, 'None': None, 'null': None,
+    'default_case': True
+}
+
+_ORDERING = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+class ConditionSyntaxError(ValueError):
+    """A condition string is outside the supported grammar"""
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = _TOKEN_PATTERN.match(source, position)
+        if match is None or match.end() == position:
+            raise ConditionSyntaxError(f"Unexpected character at {position} in {source!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _lookup(path: Tuple[str, ...]) -> Evaluator:
+    """Compile a dotted name into a nested mapping/attribute lookup"""
+    head, rest = path[0], path[1:]
+    
+    def lookup(context: Mapping[str, Any]) -> Any:
+        value = context.get(head)
+        for part in rest:
+            if value is None:
+                return None
+            value = value.get(part) if isinstance(value, Mapping) else getattr(value, part, None)
+        return value
+    
+    return lookup
+
+
+def _compare(op: str, left: Evaluator, right: Evaluator) -> Evaluator:
+    if op == '==':
+        return lambda context: left(context) == right(context)
+    if op == '!=':
+        return lambda context: left(context) != right(context)
+    if op in ('in', 'not in'):
+        negate = op == 'not in'
+        
+        def membership(context):
+            container = right(context)
+            if container is None:
+                return negate
+            try:
+                return (left(context) in container) != negate
+            except TypeError:
+                return False
+        return membership
+    
+    compare = _ORDERING[op]
+    
+    def ordering(context):
+        a, b = left(context), right(context)
+        if a is None or b is None:
+            return False
+        try:
+            return compare(a, b)
+        except TypeError:
+            return False
+    return ordering
+
+
+class _Parser:
+    """Recursive-descent parser producing closures"""
+    
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.position = 0
+    
+    def parse(self) -> Evaluator:
+        evaluator = self._or()
+        if self.position != len(self.tokens):
+            raise ConditionSyntaxError(f"Unexpected {self._peek()[1]!r} in {self.source!r}")
+        return evaluator
+    
+    def _peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+    
+    def _accept(self, value: str) -> bool:
+        if self._peek()[1] == value:
+            self.position += 1
+            return True
+        return False
+    
+    def _expect(self, value: str):
+        if not self._accept(value):
+            raise ConditionSyntaxError(f"Expected {value!r} in {self.source!r}")
+    
+    def _or(self) -> Evaluator:
+        operands = [self._and()]
+        while self._accept('or'):
+            operands.append(self._and())
+        return functools.reduce(lambda a, b: lambda context: a(context) or b(context), operands)
+    
+    def _and(self) -> Evaluator:
+        operands = [self._not()]
+        while self._accept('and'):
+            operands.append(self._not())
+        return functools.reduce(lambda a, b: lambda context: a(context) and b(context), operands)
+    
+    def _not(self) -> Evaluator:
+        if self._accept('not'):
+            operand = self._not()
+            return lambda context: not operand(context)
+        return self._comparison()
+    
+    def _comparison(self) -> Evaluator:
+        left = self._primary()
+        kind, value = self._peek()
+        if kind == 'op' and value in ('==', '!=', '<', '<=', '>', '>='):
+            self.position += 1
+            return _compare(value, left, self._primary())
+        if value == 'in':
+            self.position += 1
+            return _compare('in', left, self._primary())
+        if value == 'not' and self.position + 1 < len(self.tokens) and self.tokens[self.position + 1][1] == 'in':
+            self.position += 2
+            return _compare('not in', left, self._primary())
+        return left
+    
+    def _primary(self) -> Evaluator:
+        kind, value = self._peek()
+        if kind is None:
+            raise ConditionSyntaxError(f"Unexpected end of {self.source!r}")
+        self.position += 1
+        
+        if kind == 'number':
+            constant = float(value) if '.' in value else int(value)
+            return lambda context: constant
+        if kind == 'string':
+            text = value[1:-1]
+            return lambda context: text
+        if value == '(':
+            inner = self._or()
+            self._expect(')')
+            return inner
+        if value == '[':
+            items = []
+            if not self._accept(']'):
+                items.append(self._or())
+                while self._accept(','):
+                    items.append(self._or())
+                self._expect(']')
+            return lambda context: [item(context) for item in items]
+        if kind == 'name':
+            if value in ('any', 'all') and self._peek()[1] == '(':
+                return self._quantifier(any if value == 'any' else all)
+            if value in _CONSTANTS:
+                constant = _CONSTANTS[value]
+                return lambda context: constant
+            if value in ('and', 'or', 'not', 'in', 'for'):
+                raise ConditionSyntaxError(f"Unexpected {value!r} in {self.source!r}")
+            path = tuple(value.split('.'))
+            if any(part.startswith('_') for part in path):
+                raise ConditionSyntaxError(f"Private name {value!r} in {self.source!r}")
+            return _lookup(path)
+        
+        raise ConditionSyntaxError(f"Unexpected {value!r} in {self.source!r}")
+    
+    def _quantifier(self, reduce: Callable) -> Evaluator:
+        """any(<expr> for <name> in <iterable>) / all(...)"""
+        self._expect('(')
+        body = self._or()
+        self._expect('for')
+        kind, name = self._peek()
+        if kind != 'name' or '.' in name or name.startswith('_'):
+            raise ConditionSyntaxError(f"Expected a loop variable in {self.source!r}")
+        self.position += 1
+        self._expect('in')
+        iterable = self._or()
+        self._expect(')')
+        
+        def quantifier(context):
+            items = iterable(context) or ()
+            return reduce(body(ChainMap({name: item}, context)) for item in items)
+        return quantifier
+
+
+def compile_condition(source: str) -> Callable[[Mapping[str, Any]], bool]:
+    """Compile a condition string; raises ConditionSyntaxError if unsupported"""
+    evaluator = _Parser(source).parse()
+    return lambda context: bool(evaluator(context))
+
+
+class ModeSelector:
+    """Priority-ordered mode selection compiled from orchestration_modes.yaml"""
+    
+    def __init__(self, config: Dict[str, Any], default_mode: str = 'STANDARD'):
+        self.default_mode = default_mode
+        self.unsupported: List[Tuple[str, str, str]] = []
+        
+        self.rules: List[Tuple[Callable[[Mapping[str, Any]], bool], str, str]] = []
+        for rule in config.get('mode_selection', {}).get('priority_rules', []):
+            predicate = self._compile(f"priority_rules:{rule['mode']}", rule['condition'])
+            if predicate is not None:
+                self.rules.append((predicate, rule['mode'], rule.get('reason', rule['condition'])))
+        
+        self.triggers: Dict[str, List[Callable[[Mapping[str, Any]], bool]]] = {}
+        for mode, definition in config.get('orchestration_modes', {}).items():
+            compiled = [self._compile(f"{mode}.triggers", trigger) for trigger in definition.get('triggers', [])]
+            self.triggers[mode] = [predicate for predicate in compiled if predicate is not None]
+    
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_MODES_CONFIG, **kwargs) -> 'ModeSelector':
+        with open(path) as f:
+            return cls(yaml.safe_load(f), **kwargs)
+    
+    def select(self, context: Mapping[str, Any]) -> Tuple[str, str]:
+        """First matching priority rule as (mode, reason)"""
+        for predicate, mode, reason in self.rules:
+            if predicate(context):
+                return mode, reason
+        return self.default_mode, 'No priority rule matched'
+    
+    def triggered_modes(self, context: Mapping[str, Any]) -> List[str]:
+        """Modes with at least one compiled trigger that holds"""
+        return [mode for mode, predicates in self.triggers.items()
+                if any(predicate(context) for predicate in predicates)]
+    
+    def _compile(self, where: str, source: str) -> Optional[Callable[[Mapping[str, Any]], bool]]:
+        try:
+            return compile_condition(source)
+        except ConditionSyntaxError as e:
+            self.unsupported.append((where, source, str(e)))
+            return None
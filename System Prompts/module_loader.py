@@ -0,0 +1,223 @@
+"""
+Module Plugin Loader
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Content-addressed plugin loading for dynamic modules
+
+Turns `ModuleMetadata.file_path` into a live `ModuleInterface` implementation:
+
+- Python modules (`.py`) are compiled once per content hash. Their body runs
+  lazily, on first use, so heavy imports inside a plugin are only paid by
+  requests that actually exercise it. A plugin exposes either a
+  `create_module(metadata)` factory or a `Module` class.
+- Markdown and other text modules become `PromptModule`s that contribute
+  their content to the chain's `prompt_fragments`.
+- A zip bundle of many modules can be preloaded in one read, after which
+  loads are served from the cache without touching the filesystem.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from dataclasses import dataclass
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import types
+import zipfile
+
+
+BUNDLE_MANIFEST = 'manifest.json'
+
+
+@dataclass
+class CachedSource:
+    """Verified module content, shared by every load of the same hash"""
+    sha256_hash: str
+    suffix: str
+    content: bytes
+    code: Optional[types.CodeType] = None
+    namespace: Optional[types.ModuleType] = None
+
+
+class PromptModule:
+    """Module backed by prompt text (markdown, YAML, JSON)"""
+    
+    def __init__(self, module_id: str, content: str, variant: Optional[str] = None):
+        self.module_id = module_id
+        self.content = content
+        self.variant = variant  # Prompt version served, when chosen by an A/B test
+    
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Append this module's prompt content to the chain's fragments"""
+        return {'prompt_fragments': [*context.get('prompt_fragments', []), self.content]}
+    
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return True
+    
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return 'prompt_fragments' in result
+
+
+class PromptVariantsModule:
+    """Prompt module under an A/B experiment: one loaded prompt per variant
+    
+    Each request picks its arm with `choose(module_id, variants)`; the arm
+    served is reported in the chain's `prompt_variants`.
+    """
+    
+    def __init__(self, module_id: str, variants: Dict[str, PromptModule],
+                 choose: Callable[[str, List[str]], Awaitable[str]]):
+        self.module_id = module_id
+        self.variants = variants
+        self.choose = choose
+    
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        variant = await self.choose(self.module_id, list(self.variants))
+        result = await self.variants[variant].process(context)
+        result['prompt_variants'] = {**context.get('prompt_variants', {}), self.module_id: variant}
+        return result
+    
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return True
+    
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return 'prompt_fragments' in result
+
+
+class LazyPluginModule:
+    """Proxy that executes a Python plugin's body on first use"""
+    
+    def __init__(self, loader: 'ModuleLoader', source: CachedSource, metadata: Any):
+        self._loader = loader
+        self._source = source
+        self._metadata = metadata
+        self._impl = None
+    
+    def _materialize(self):
+        if self._impl is None:
+            self._impl = self._loader._create_plugin(self._source, self._metadata)
+        return self._impl
+    
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._materialize().process(context)
+    
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return self._materialize().validate_input(context)
+    
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return self._materialize().validate_output(result)
+    
+    async def cleanup(self):
+        # Never materialize a plugin just to clean it up
+        if self._impl is not None and hasattr(self._impl, 'cleanup'):
+            await self._impl.cleanup()
+
+
+class ModuleLoader:
+    """Content-addressed loader with an import cache keyed by SHA-256"""
+    
+    def __init__(self, base_path: Path = Path('.'), max_cached: int = 1024):
+        self.base_path = base_path
+        self.max_cached = max_cached
+        self.cache: "OrderedDict[str, CachedSource]" = OrderedDict()
+        self.stats = {'cache_hits': 0, 'file_reads': 0, 'compiles': 0, 'executions': 0}
+    
+    def load(self, metadata: Any) -> Any:
+        """Return a fresh module implementation for `metadata`"""
+        source = self._get_source(metadata)
+        
+        if source.suffix == '.py':
+            if source.code is None:
+                source.code = compile(source.content, str(metadata.file_path), 'exec')
+                self.stats['compiles'] += 1
+            return LazyPluginModule(self, source, metadata)
+        
+        return PromptModule(metadata.id, source.content.decode('utf-8'))
+    
+    def read_text(self, metadata: Any) -> str:
+        """Verified text content of a module (served from the cache when warm)"""
+        return self._get_source(metadata).content.decode('utf-8')
+    
+    def preload_bundle(self, bundle_path: Path) -> int:
+        """Load every module in a bundle into the cache with a single read"""
+        with zipfile.ZipFile(bundle_path) as bundle:
+            manifest = json.loads(bundle.read(BUNDLE_MANIFEST))
+            for sha256_hash, suffix in manifest['modules'].items():
+                content = bundle.read(sha256_hash)
+                if hashlib.sha256(content).hexdigest() != sha256_hash:
+                    raise ValueError(f"Corrupt bundle entry {sha256_hash} in {bundle_path}")
+                self._store(CachedSource(sha256_hash, suffix, content))
+        
+        return len(manifest['modules'])
+    
+    def _get_source(self, metadata: Any) -> CachedSource:
+        """Fetch verified content from the cache, falling back to disk"""
+        source = self.cache.get(metadata.sha256_hash)
+        if source is not None:
+            self.cache.move_to_end(metadata.sha256_hash)
+            self.stats['cache_hits'] += 1
+            return source
+        
+        file_path = self._resolve(metadata.file_path)
+        content = file_path.read_bytes()
+        self.stats['file_reads'] += 1
+        
+        if hashlib.sha256(content).hexdigest() != metadata.sha256_hash:
+            raise ValueError(f"Integrity check failed for {metadata.id}")
+        
+        source = CachedSource(metadata.sha256_hash, file_path.suffix, content)
+        self._store(source)
+        return source
+    
+    def _store(self, source: CachedSource):
+        self.cache[source.sha256_hash] = source
+        self.cache.move_to_end(source.sha256_hash)
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+    
+    def _resolve(self, file_path: Path) -> Path:
+        file_path = Path(file_path)
+        return file_path if file_path.is_absolute() else self.base_path / file_path
+    
+    def _create_plugin(self, source: CachedSource, metadata: Any) -> Any:
+        """Execute a plugin body (once per hash) and instantiate it"""
+        if source.namespace is None:
+            namespace = types.ModuleType(f"agent_module_{source.sha256_hash[:16]}")
+            namespace.__file__ = str(metadata.file_path)
+            exec(source.code, namespace.__dict__)
+            source.namespace = namespace
+            self.stats['executions'] += 1
+        
+        factory = getattr(source.namespace, 'create_module', None)
+        if factory is not None:
+            return factory(metadata)
+        
+        module_class = getattr(source.namespace, 'Module', None)
+        if module_class is None:
+            raise TypeError(f"Module {metadata.id} defines neither create_module() nor Module")
+        return module_class()
+
+
+def build_bundle(modules: Iterable[Any], bundle_path: Path, base_path: Path = Path('.')) -> int:
+    """Pack module files into a content-addressed zip bundle"""
+    entries: Dict[str, str] = {}
+    
+    with zipfile.ZipFile(bundle_path, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        for metadata in modules:
+            file_path = Path(metadata.file_path)
+            if not file_path.is_absolute():
+                file_path = base_path / file_path
+            
+            content = file_path.read_bytes()
+            sha256_hash = hashlib.sha256(content).hexdigest()
+            if sha256_hash != metadata.sha256_hash:
+                raise ValueError(f"Integrity check failed for {metadata.id}")
+            
+            if sha256_hash not in entries:
+                bundle.writestr(sha256_hash, content)
+                entries[sha256_hash] = file_path.suffix
+        
+        bundle.writestr(BUNDLE_MANIFEST, json.dumps({'version': '1.0', 'modules': entries}))
+    
+    return len(entries)
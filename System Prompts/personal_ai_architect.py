@@ -12,16 +12,28 @@ CORE PRINCIPLE: Learn from Faheem's patterns to provide maximum productivity adv
 - Optimizes for personal competitive advantage
 """
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
 from pathlib import Path
 import hashlib
 import yaml
 import json
 import pickle
+import warnings
 from enum import Enum
-from collections import defaultdict, deque
-import statistics
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+
+from behavior_store import BehaviorStore, SQLiteBehaviorRepository
+from keyword_matcher import KeywordMatcher
+from request_classifier import RequestClassifier, append_example
+from streaming_stats import EWMA, HourHistogram, RunningStats
+
+PERSONAL_ARCHITECT_CONFIG = Path(__file__).parent / "config" / "personal_architect.yaml"
+ORCHESTRATION_MODES_CONFIG = Path(__file__).parent / "01-Orchestrator-Architect" / "config" / "orchestration_modes.yaml"
 
 class UserExpertiseLevel(Enum):
     LEARNING = "learning"      # Still exploring concepts
@@ -35,6 +47,22 @@ class ProjectComplexity(Enum):
     COMPLEX = "complex"        # Custom frameworks, integrations
     CUTTING_EDGE = "cutting_edge"  # Novel research, experimental
 
+# Session-level expertise learning
+SESSION_GAP = timedelta(minutes=30)   # Inactivity that ends a session
+SESSION_WINDOW = 20                   # Recent requests counted within a session
+SESSION_DECAY = 0.5                   # Weight of earlier sessions, per session
+ADVANCED_CATEGORIES = ("framework", "technical", "performance")
+
+def normalize_request(request: str) -> str:
+    """Lower-cased request with runs of whitespace collapsed (the analysis cache key)"""
+    return " ".join(request.lower().split())
+
+def indicator_category(indicator: str) -> str:
+    """Counter category for an expertise indicator"""
+    if indicator.startswith("knows_"):
+        return "framework"
+    return indicator.split("_", 1)[0]  # technical_sophisticated -> technical, ...
+
 @dataclass
 class UserBehaviorPattern:
     """Tracks user behavior to learn preferences"""
@@ -58,9 +86,10 @@ class UserBehaviorPattern:
         "custom": 0.0
     })
     
-    # Time-based Patterns
-    productive_hours: List[int] = field(default_factory=list)
-    session_durations: deque = field(default_factory=lambda: deque(maxlen=20))
+    # Time-based Patterns (streaming estimators; session lengths in hours)
+    productive_hours: HourHistogram = field(default_factory=HourHistogram)
+    session_length_stats: RunningStats = field(default_factory=RunningStats)
+    session_length_trend: EWMA = field(default_factory=EWMA)
     
     # Success Patterns
     successful_approaches: Dict[str, int] = field(default_factory=dict)
@@ -69,52 +98,412 @@ class UserBehaviorPattern:
     # Current Session Context
     current_session_start: datetime = field(default_factory=datetime.now)
     current_expertise_indicators: List[str] = field(default_factory=list)
+    last_activity: Optional[datetime] = None
     
-    def update_session_start(self):
-        """Start a new session"""
-        self.current_session_start = datetime.now()
+    # Expertise signals: per-category indicator counts over the session's last
+    # SESSION_WINDOW requests, plus decayed totals from earlier sessions
+    session_indicator_window: deque = field(default_factory=lambda: deque(maxlen=SESSION_WINDOW))
+    session_indicator_counts: Dict[str, int] = field(default_factory=dict)
+    indicator_history: Dict[str, float] = field(default_factory=dict)
+    
+    def update_session_start(self, timestamp: Optional[datetime] = None):
+        """Start a new session, folding the last one into the decayed history"""
+        for category in self.indicator_history.keys() | self.session_indicator_counts.keys():
+            self.indicator_history[category] = (SESSION_DECAY * self.indicator_history.get(category, 0.0)
+                                                + self.session_indicator_counts.get(category, 0))
+        self.session_indicator_window.clear()
+        self.session_indicator_counts = {}
+        
+        self.current_session_start = timestamp or datetime.now()
         self.session_count += 1
         self.current_expertise_indicators = []
+    
+    def observe_indicators(self, indicators: List[str]):
+        """Count one request's indicators into the sliding session window (O(indicators))"""
+        categories = tuple(indicator_category(indicator) for indicator in indicators)
+        counts = self.session_indicator_counts
+        
+        if len(self.session_indicator_window) == self.session_indicator_window.maxlen:
+            for category in self.session_indicator_window[0]:
+                counts[category] -= 1
+        self.session_indicator_window.append(categories)
+        for category in categories:
+            counts[category] = counts.get(category, 0) + 1
+        
+        self.current_expertise_indicators = list(indicators)
+    
+    def advanced_signal(self, new_session: bool = False) -> float:
+        """Advanced-indicator score: session window plus decayed history
+        
+        With `new_session`, the score a new session would start from.
+        """
+        if new_session:
+            return sum(SESSION_DECAY * self.indicator_history.get(category, 0.0)
+                       + self.session_indicator_counts.get(category, 0)
+                       for category in ADVANCED_CATEGORIES)
+        return sum(self.session_indicator_counts.get(category, 0) + self.indicator_history.get(category, 0.0)
+                   for category in ADVANCED_CATEGORIES)
+    
+    def apply_event(self, event: Dict[str, Any]):
+        """Apply one recorded behavior event (used live and on replay)"""
+        timestamp = datetime.fromisoformat(event["timestamp"])
+        
+        if event["type"] in ("request", "session_start"):
+            # Logs written before sessions spanned requests always start one
+            if (event["type"] == "session_start" or self.last_activity is None
+                    or timestamp - self.last_activity > SESSION_GAP):
+                self.update_session_start(timestamp)
+            self.observe_indicators(event.get("indicators", []))
+            self.productive_hours.update(timestamp.hour)
+            self.last_activity = timestamp
+        
+        elif event["type"] == "outcome":
+            approach = event["approach"]
+            self.total_projects += 1
+            
+            if event["success"]:
+                self.successful_builds += 1
+                self.successful_approaches[approach] = self.successful_approaches.get(approach, 0) + 1
+            else:
+                self.failed_approaches[approach] = self.failed_approaches.get(approach, 0) + 1
+            
+            # Update framework familiarity based on usage
+            for framework in self.framework_familiarity:
+                if framework in approach.lower():
+                    self.framework_familiarity[framework] += 0.1
+            
+            # Record session duration
+            self.record_session_length((timestamp - self.current_session_start).total_seconds() / 3600)
+    
+    def record_session_length(self, hours: float):
+        self.session_length_stats.update(hours)
+        self.session_length_trend.update(hours)
+    
+    def absorb_legacy_samples(self, productive_hours: List[int], session_durations: List[float]):
+        """Fold raw samples kept by older versions into the streaming estimators"""
+        for hour in productive_hours:
+            self.productive_hours.update(hour)
+        for hours in session_durations:
+            self.record_session_length(hours)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe snapshot of the pattern"""
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["typical_project_complexity"] = self.typical_project_complexity.value
+        for name in ("productive_hours", "session_length_stats", "session_length_trend"):
+            data[name] = data[name].to_dict()
+        data["current_session_start"] = self.current_session_start.isoformat()
+        data["last_activity"] = self.last_activity.isoformat() if self.last_activity else None
+        data["session_indicator_window"] = [list(categories) for categories in self.session_indicator_window]
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UserBehaviorPattern":
+        known = {f.name for f in fields(cls)}
+        legacy_hours = data.get("productive_hours") if isinstance(data.get("productive_hours"), list) else []
+        legacy_durations = data.get("session_durations", [])
+        data = {key: value for key, value in data.items() if key in known}
+        if "typical_project_complexity" in data:
+            data["typical_project_complexity"] = ProjectComplexity(data["typical_project_complexity"])
+        for name, estimator in (("productive_hours", HourHistogram), ("session_length_stats", RunningStats),
+                                ("session_length_trend", EWMA)):
+            if isinstance(data.get(name), dict):
+                data[name] = estimator.from_dict(data[name])
+            else:
+                data.pop(name, None)
+        if "current_session_start" in data:
+            data["current_session_start"] = datetime.fromisoformat(data["current_session_start"])
+        if data.get("last_activity"):
+            data["last_activity"] = datetime.fromisoformat(data["last_activity"])
+        if "session_indicator_window" in data:
+            data["session_indicator_window"] = deque(
+                (tuple(categories) for categories in data["session_indicator_window"]), maxlen=SESSION_WINDOW
+            )
+        behavior = cls(**data)
+        behavior.absorb_legacy_samples(legacy_hours, legacy_durations)
+        return behavior
+
+@dataclass(frozen=True)
+class RequestAnalysis:
+    """The pure, text-only part of analyzing a request (safe to memoize)"""
+    expertise_indicators: Tuple[str, ...]
+    complexity: ProjectComplexity
+    urgency: str
+    learned_expertise: Optional[UserExpertiseLevel]
+    role_hints: Tuple[str, ...]
 
 @dataclass 
 class ContextualIntelligence:
     """Learns and adapts to user context automatically"""
     
-    def __init__(self):
-        self.behavior_file = Path("data/user_behavior.pkl")
-        self.behavior = self.load_behavior_patterns()
+    # Advanced framework knowledge (each hit becomes a `knows_<term>` indicator)
+    # A trailing `*` also matches longer words: `pattern*` covers "patterns"
+    ADVANCED_TERMS = [
+        "langraph", "crewai", "autogen", "llamaindex",
+        "vector database*", "embedding*", "retrieval",
+        "multi-agent", "hierarchical", "tool calling",
+        "state management", "workflow orchestration"
+    ]
+    
+    KEYWORD_GROUPS = {
+        "technical_sophisticated": ["architecture*", "pattern*", "framework*", "integration*"],
+        "performance_focused": ["optimiz*", "performance", "scalable", "production"],
+        "efficiency_focused": ["quick*", "fast", "directly", "skip*", "efficient*"],
+        "complexity:multi_agent": ["multi-agent", "team*", "coordination", "hierarchical"],
+        "complexity:integration": ["database*", "api", "apis", "integration*", "webhook*", "pipeline*"],
+        "complexity:novel": ["custom", "novel", "experimental", "research*", "new"],
+        "complexity:production": ["production", "enterprise", "scalable", "deployment*"],
+        "urgency:high": ["urgent", "asap", "quickly", "fast", "immediate*", "now", "today"],
+        "urgency:low": ["explor*", "experiment*", "learn*", "understand*", "research*"]
+    }
+    
+    # Compiled once per process and shared by every user's instance
+    _compiled_keywords = None
+    
+    # Learned request classifier (request_classifier.py), shared and swappable at runtime;
+    # predictions below CLASSIFIER_MIN_CONFIDENCE fall back to the keyword heuristics
+    CLASSIFIER_MODEL = Path("data/models/request_classifier.npz")
+    CLASSIFIER_EXAMPLES = Path("data/classifier_examples.jsonl")
+    CLASSIFIER_MIN_CONFIDENCE = 0.7
+    _classifier = None
+    _classifier_checked = False
+    
+    # Bounded LRU of RequestAnalysis keyed by a hash of the normalized request text
+    ANALYSIS_CACHE_SIZE = 4096
+    _analysis_cache = OrderedDict()
+    _analysis_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    # Code order for batch analysis
+    EXPERTISE_LEVELS = list(UserExpertiseLevel)
+    COMPLEXITY_LEVELS = list(ProjectComplexity)
+    URGENCY_LEVELS = ["high", "medium", "low"]
+    
+    def __init__(self, user_id: Optional[str] = None,
+                 repository: Optional[SQLiteBehaviorRepository] = None):
+        """Single-user (local event log) by default; per-user when given a repository"""
+        self.user_id = user_id
+        self.repository = repository
+        if repository is not None:
+            self.behavior = repository.get(user_id)
+        else:
+            self.behavior_file = Path("data/user_behavior.pkl")  # Legacy pickle, migrated on first load
+            self.behavior_store = BehaviorStore(Path("data/behavior"))
+            self.behavior = self.load_behavior_patterns()
+        self.keyword_matcher, self._advanced_labels = self._build_keyword_matcher()
+        self.last_request: Optional[str] = None
+        
+    @classmethod
+    def _build_keyword_matcher(cls) -> Tuple[KeywordMatcher, List[str]]:
+        """Compile built-in keywords plus those in personal_architect.yaml and
+        the role_detection indicators in orchestration_modes.yaml"""
+        if cls._compiled_keywords is not None:
+            return cls._compiled_keywords
+        
+        groups = {label: list(keywords) for label, keywords in cls.KEYWORD_GROUPS.items()}
+        advanced_terms = list(cls.ADVANCED_TERMS)
+        
+        if PERSONAL_ARCHITECT_CONFIG.exists():
+            with open(PERSONAL_ARCHITECT_CONFIG) as f:
+                config = yaml.safe_load(f) or {}
+            indicators = config.get("adaptive_intelligence", {}).get("expertise_indicators", {})
+            advanced_terms += indicators.get("framework_knowledge", [])
+            groups["technical_sophisticated"] += indicators.get("technical_sophistication", [])
+            groups["efficiency_focused"] += indicators.get("efficiency_focus", [])
+            
+            rules = config.get("adaptation_rules", {})
+            groups["urgency:high"] += rules.get("urgency_detection", {}).get("keywords", [])
+            groups["urgency:low"] += rules.get("exploration_detection", {}).get("keywords", [])
+            groups["self_reported_expertise"] = rules.get("expertise_detection", {}).get("indicators", [])
+        
+        if ORCHESTRATION_MODES_CONFIG.exists():
+            with open(ORCHESTRATION_MODES_CONFIG) as f:
+                config = yaml.safe_load(f) or {}
+            role_indicators = config.get("role_detection", {}).get("automatic_indicators", {})
+            for role, phrases in role_indicators.items():
+                keywords = []
+                for phrase in phrases:
+                    # "mentions specific frameworks (LangGraph, CrewAI)" -> phrase + listed names
+                    head, _, listed = phrase.partition("(")
+                    keywords.append(head.strip())
+                    keywords += [name.strip() for name in listed.rstrip(")").split(",") if name.strip()]
+                groups[f"role:{role}"] = keywords
         
-    def load_behavior_patterns(self) -> UserBehaviorPattern:
-        """Load existing behavior patterns or create new"""
-        if self.behavior_file.exists():
+        for term in advanced_terms:
+            groups.setdefault(f"knows:{term.rstrip('*')}", []).append(term)
+        advanced_labels = list(dict.fromkeys(f"knows:{term.rstrip('*')}" for term in advanced_terms))
+        
+        cls._compiled_keywords = (KeywordMatcher(groups), advanced_labels)
+        return cls._compiled_keywords
+    
+    @classmethod
+    def use_classifier(cls, classifier: Optional[RequestClassifier]):
+        """Swap the shared classifier (None returns to the keyword heuristics)"""
+        cls._classifier = classifier
+        cls._classifier_checked = True
+        cls._analysis_cache.clear()  # Cached analyses include the old model's predictions
+    
+    @classmethod
+    def load_classifier(cls, path: Path) -> RequestClassifier:
+        """Load a model file and swap it in for every instance"""
+        classifier = RequestClassifier.load(path)
+        cls.use_classifier(classifier)
+        return classifier
+    
+    @classmethod
+    def _active_classifier(cls) -> Optional[RequestClassifier]:
+        """The shared classifier, loading the configured model on first use"""
+        if cls._classifier_checked:
+            return cls._classifier
+        cls._classifier_checked = True
+        
+        if PERSONAL_ARCHITECT_CONFIG.exists():
+            with open(PERSONAL_ARCHITECT_CONFIG) as f:
+                settings = (yaml.safe_load(f) or {}).get("request_classifier", {})
+            cls.CLASSIFIER_MODEL = Path(settings.get("model_path", cls.CLASSIFIER_MODEL))
+            cls.CLASSIFIER_EXAMPLES = Path(settings.get("examples_file", cls.CLASSIFIER_EXAMPLES))
+            cls.CLASSIFIER_MIN_CONFIDENCE = settings.get("min_confidence", cls.CLASSIFIER_MIN_CONFIDENCE)
+        
+        if cls.CLASSIFIER_MODEL.exists():
             try:
-                with open(self.behavior_file, 'rb') as f:
-                    return pickle.load(f)
-            except Exception:
-                pass
-        return UserBehaviorPattern()
+                cls._classifier = RequestClassifier.load(cls.CLASSIFIER_MODEL)
+            except (OSError, ValueError, KeyError) as e:
+                warnings.warn(f"Ignoring unreadable request classifier {cls.CLASSIFIER_MODEL}: {e}")
+        return cls._classifier
+    
+    def _classify(self, request: str) -> Dict[str, str]:
+        """Confident classifier labels for a request (empty without a model)"""
+        classifier = self._active_classifier()
+        if classifier is None:
+            return {}
+        return {head: label for head, (label, confidence) in classifier.predict(request).items()
+                if confidence >= self.CLASSIFIER_MIN_CONFIDENCE}
+    
+    def load_behavior_patterns(self) -> UserBehaviorPattern:
+        """Load the last snapshot and replay the events recorded after it"""
+        state, events = self.behavior_store.load()
+        
+        if state is not None:
+            behavior = UserBehaviorPattern.from_dict(state)
+        else:
+            behavior = self._load_legacy_behavior()
+            if behavior is not None:
+                self.behavior_store.write_snapshot(behavior.to_dict())
+            else:
+                behavior = UserBehaviorPattern()
+        
+        for event in events:
+            behavior.apply_event(event)
+        return behavior
+    
+    def _load_legacy_behavior(self) -> Optional[UserBehaviorPattern]:
+        """One-time import of the old whole-file pickle"""
+        if not self.behavior_file.exists():
+            return None
+        try:
+            with open(self.behavior_file, 'rb') as f:
+                legacy = pickle.load(f)
+            # Fields added since the pickle was written keep their defaults
+            state = dict(vars(legacy))
+            legacy_hours = state.pop("productive_hours", [])
+            legacy_durations = state.pop("session_durations", [])
+            behavior = UserBehaviorPattern()
+            behavior.__dict__.update(state)
+            behavior.absorb_legacy_samples(legacy_hours, legacy_durations)
+            return behavior
+        except Exception as e:
+            warnings.warn(f"Ignoring unreadable legacy behavior file {self.behavior_file}: {e}")
+            return None
     
     def save_behavior_patterns(self):
-        """Persist learned patterns"""
-        self.behavior_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.behavior_file, 'wb') as f:
-            pickle.dump(self.behavior, f)
+        """Persist learned patterns as a compacted snapshot"""
+        if self.repository is not None:
+            self.repository.flush()
+            return
+        self.behavior_store.write_snapshot(self.behavior.to_dict())
+    
+    def close(self):
+        """Sync and close the local event log (the repository belongs to its owner)"""
+        if self.repository is None:
+            self.behavior_store.close()
+    
+    def _record_event(self, event: Dict[str, Any]):
+        """Apply an event in memory and append it to the log (O(event) to persist)"""
+        if self.repository is not None:
+            self.repository.record(self.user_id, event)
+            return
+        
+        self.behavior.apply_event(event)
+        self.behavior_store.append(event)
+        if self.behavior_store.needs_snapshot():
+            self.save_behavior_patterns()
+    
+    def analyze_text(self, request: str) -> RequestAnalysis:
+        """Text-only analysis of a request, memoized on its normalized form
+        
+        Case and runs of whitespace do not change the result, so retried
+        and resubmitted requests are served from the cache.
+        """
+        request = normalize_request(request)
+        key = hashlib.blake2b(request.encode("utf-8"), digest_size=16).digest()
+        cache, stats = self._analysis_cache, self._analysis_cache_stats
+        
+        analysis = cache.get(key)
+        if analysis is not None:
+            cache.move_to_end(key)
+            stats["hits"] += 1
+            return analysis
+        stats["misses"] += 1
+        
+        # One pass over the request finds every keyword group
+        hits = self.keyword_matcher.scan(request)
+        complexity = self._assess_project_complexity(request, {}, hits)
+        
+        # A confident learned prediction overrides the keyword heuristics
+        learned = self._classify(request)
+        if learned.get("project_complexity") in {level.value for level in ProjectComplexity}:
+            complexity = ProjectComplexity(learned["project_complexity"])
+        learned_expertise = None
+        if learned.get("user_expertise") in {level.value for level in UserExpertiseLevel}:
+            learned_expertise = UserExpertiseLevel(learned["user_expertise"])
+        
+        analysis = RequestAnalysis(
+            expertise_indicators=tuple(self._detect_expertise_indicators(request, hits)),
+            complexity=complexity,
+            urgency=self._detect_urgency_level(request, hits),
+            learned_expertise=learned_expertise,
+            role_hints=tuple(sorted(label.split(":", 1)[1] for label in hits if label.startswith("role:")))
+        )
+        cache[key] = analysis
+        if len(cache) > self.ANALYSIS_CACHE_SIZE:
+            cache.popitem(last=False)
+            stats["evictions"] += 1
+        return analysis
+    
+    @classmethod
+    def analysis_cache_info(cls) -> Dict[str, Any]:
+        """Hit/miss counters and hit rate of the shared analysis cache"""
+        stats = cls._analysis_cache_stats
+        lookups = stats["hits"] + stats["misses"]
+        return dict(stats, size=len(cls._analysis_cache), max_size=cls.ANALYSIS_CACHE_SIZE,
+                    hit_rate=stats["hits"] / lookups if lookups else 0.0)
     
     def analyze_request(self, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze request to determine user expertise and needs automatically"""
         
-        # Update session
-        self.behavior.update_session_start()
-        
-        expertise_indicators = self._detect_expertise_indicators(request)
-        complexity = self._assess_project_complexity(request, context)
-        urgency = self._detect_urgency_level(request)
+        # Text-only analysis may come from the cache; the session updates below never do
+        analysis = self.analyze_text(request)
+        complexity, urgency = analysis.complexity, analysis.urgency
+        self.last_request = request
         
-        # Learn from indicators
-        self.behavior.current_expertise_indicators.extend(expertise_indicators)
+        # Count this request's indicators (a new session starts after inactivity)
+        self._record_event({
+            "type": "request",
+            "timestamp": datetime.now().isoformat(),
+            "indicators": list(analysis.expertise_indicators)
+        })
         
         # Determine current expertise level
-        current_expertise = self._calculate_current_expertise()
+        current_expertise = analysis.learned_expertise or self._calculate_current_expertise()
         
         # Adaptive configuration based on learned patterns
         config = {
@@ -124,60 +513,116 @@ class ContextualIntelligence:
             "communication_style": self._adapt_communication_style(current_expertise, urgency),
             "detail_level": self._adapt_detail_level(current_expertise, complexity),
             "approval_frequency": self._adapt_approval_frequency(current_expertise, complexity),
-            "context_budget": self._calculate_context_budget(complexity, urgency)
+            "context_budget": self._calculate_context_budget(complexity, urgency),
+            "role_hints": list(analysis.role_hints)
         }
         
         return config
     
-    def _detect_expertise_indicators(self, request: str) -> List[str]:
+    def analyze_batch(self, requests: List[str], workers: Optional[int] = None,
+                      chunk_size: int = 20000) -> Dict[str, np.ndarray]:
+        """Analyze many requests without side effects, as columns
+        
+        Each request is scored as the first request of a new session on top
+        of the current learned behavior, exactly as `analyze_request` would
+        after `SESSION_GAP` of inactivity, but nothing is recorded, printed
+        or persisted. Keyword scanning fans out over a process pool for large
+        inputs; the decision logic runs vectorized over the resulting hit
+        matrix.
+        """
+        matcher, advanced_labels = self._build_keyword_matcher()
+        label_index = {label: i for i, label in enumerate(matcher.labels)}
+        
+        chunks = [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+        if len(chunks) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                hits = np.concatenate(list(pool.map(_scan_requests, chunks)))
+        else:
+            hits = np.concatenate([_scan_requests(chunk) for chunk in chunks]
+                                  or [np.zeros((0, len(matcher.labels)), dtype=bool)])
+        
+        def hit(label: str) -> np.ndarray:
+            if label not in label_index:
+                return np.zeros(len(hits), dtype=bool)
+            return hits[:, label_index[label]]
+        
+        # Project complexity (index into COMPLEXITY_LEVELS)
+        score = (2 * hit("complexity:multi_agent") + hit("complexity:integration")
+                 + 2 * hit("complexity:novel") + hit("complexity:production"))
+        complexity = np.select([score >= 4, score >= 3, score >= 1], [3, 2, 1], 0)
+        
+        # Urgency (index into URGENCY_LEVELS)
+        urgency = np.where(hit("urgency:high"), 0, np.where(hit("urgency:low"), 2, 1))
+        
+        # Expertise: learned base level adjusted by this request's indicators
+        advanced = sum(hit(label).astype(np.int64) for label in advanced_labels)
+        advanced = advanced + hit("technical_sophisticated") + hit("performance_focused")
+        advanced = advanced + self.behavior.advanced_signal(new_session=True)
+        base_level = self.EXPERTISE_LEVELS.index(self._base_expertise(self.behavior.session_count + 1))
+        learning = self.EXPERTISE_LEVELS.index(UserExpertiseLevel.LEARNING)
+        expertise = np.select(
+            [(advanced >= 3) & (base_level != learning), advanced >= 2],
+            [self.EXPERTISE_LEVELS.index(UserExpertiseLevel.INNOVATOR), self.EXPERTISE_LEVELS.index(UserExpertiseLevel.EXPERT)],
+            base_level
+        )
+        
+        # Confident learned predictions override, as in analyze_request
+        classifier = self._active_classifier()
+        if classifier is not None and requests:
+            probabilities = classifier.predict_proba_batch([normalize_request(request) for request in requests])
+            for head, levels, codes in (("project_complexity", self.COMPLEXITY_LEVELS, complexity),
+                                        ("user_expertise", self.EXPERTISE_LEVELS, expertise)):
+                if head not in probabilities:
+                    continue
+                values = [level.value for level in levels]
+                class_codes = np.array([values.index(label) if label in values else -1
+                                        for label in classifier.heads[head][0]])
+                learned = class_codes[probabilities[head].argmax(axis=1)]
+                confident = (probabilities[head].max(axis=1) >= self.CLASSIFIER_MIN_CONFIDENCE) & (learned >= 0)
+                codes[confident] = learned[confident]
+        
+        # The remaining adaptations are small lookup tables over those codes
+        table = lambda fn, rows, cols: np.array([[fn(r, c) for c in cols] for r in rows], dtype=object)
+        return {
+            "user_expertise": np.array([level.value for level in self.EXPERTISE_LEVELS], dtype=object)[expertise],
+            "project_complexity": np.array([level.value for level in self.COMPLEXITY_LEVELS], dtype=object)[complexity],
+            "urgency_level": np.array(self.URGENCY_LEVELS, dtype=object)[urgency],
+            "communication_style": table(self._adapt_communication_style, self.EXPERTISE_LEVELS, self.URGENCY_LEVELS)[expertise, urgency],
+            "detail_level": table(self._adapt_detail_level, self.EXPERTISE_LEVELS, self.COMPLEXITY_LEVELS)[expertise, complexity],
+            "approval_frequency": table(self._adapt_approval_frequency, self.EXPERTISE_LEVELS, self.COMPLEXITY_LEVELS)[expertise, complexity],
+            "context_budget": table(self._calculate_context_budget, self.COMPLEXITY_LEVELS, self.URGENCY_LEVELS).astype(np.int64)[complexity, urgency]
+        }
+    
+    def _detect_expertise_indicators(self, request: str, hits: Optional[set] = None) -> List[str]:
         """Detect indicators of user expertise level from request"""
-        indicators = []
+        if hits is None:
+            hits = self.keyword_matcher.scan(request)
         
         # Advanced framework knowledge
-        advanced_terms = [
-            "langraph", "crewai", "autogen", "llamaindex",
-            "vector database", "embedding", "retrieval",
-            "multi-agent", "hierarchical", "tool calling",
-            "state management", "workflow orchestration"
-        ]
-        
-        for term in advanced_terms:
-            if term.lower() in request.lower():
-                indicators.append(f"knows_{term.replace(' ', '_')}")
-        
-        # Technical sophistication
-        if any(word in request.lower() for word in ["architecture", "pattern", "framework", "integration"]):
-            indicators.append("technical_sophisticated")
-            
-        if any(word in request.lower() for word in ["optimize", "performance", "scalable", "production"]):
-            indicators.append("performance_focused")
-            
-        # Efficiency indicators  
-        if any(phrase in request.lower() for phrase in ["quick", "fast", "directly", "skip", "efficient"]):
-            indicators.append("efficiency_focused")
+        indicators = [f"knows_{label[len('knows:'):].replace(' ', '_')}"
+                      for label in self._advanced_labels if label in hits]
+        
+        # Technical sophistication, performance and efficiency focus
+        for label in ("technical_sophisticated", "performance_focused", "efficiency_focused",
+                      "self_reported_expertise"):
+            if label in hits:
+                indicators.append(label)
             
         return indicators
     
-    def _assess_project_complexity(self, request: str, context: Dict[str, Any]) -> ProjectComplexity:
+    def _assess_project_complexity(self, request: str, context: Dict[str, Any],
+                                   hits: Optional[set] = None) -> ProjectComplexity:
         """Determine project complexity from request and context"""
-        
-        complexity_score = 0
-        
-        # Multi-agent indicators
-        if any(word in request.lower() for word in ["multi-agent", "team", "coordination", "hierarchical"]):
-            complexity_score += 2
-            
-        # Integration complexity
-        if any(word in request.lower() for word in ["database", "api", "integration", "webhook", "pipeline"]):
-            complexity_score += 1
-            
-        # Custom/Novel indicators  
-        if any(word in request.lower() for word in ["custom", "novel", "experimental", "research", "new"]):
-            complexity_score += 2
-            
-        # Production indicators
-        if any(word in request.lower() for word in ["production", "enterprise", "scalable", "deployment"]):
-            complexity_score += 1
+        if hits is None:
+            hits = self.keyword_matcher.scan(request)
+        
+        complexity_weights = {
+            "complexity:multi_agent": 2,   # Multi-agent indicators
+            "complexity:integration": 1,   # Integration complexity
+            "complexity:novel": 2,         # Custom/Novel indicators
+            "complexity:production": 1     # Production indicators
+        }
+        complexity_score = sum(weight for label, weight in complexity_weights.items() if label in hits)
             
         # Map score to complexity
         if complexity_score >= 4:
@@ -189,15 +634,15 @@ class ContextualIntelligence:
         else:
             return ProjectComplexity.SIMPLE
     
-    def _detect_urgency_level(self, request: str) -> str:
+    def _detect_urgency_level(self, request: str, hits: Optional[set] = None) -> str:
         """Detect urgency from request language"""
+        if hits is None:
+            hits = self.keyword_matcher.scan(request)
         
-        urgent_indicators = ["urgent", "asap", "quickly", "fast", "immediate", "now", "today"]
-        if any(word in request.lower() for word in urgent_indicators):
+        if "urgency:high" in hits:
             return "high"
             
-        relaxed_indicators = ["explore", "experiment", "learn", "understand", "research"]  
-        if any(word in request.lower() for word in relaxed_indicators):
+        if "urgency:low" in hits:
             return "low"
             
         return "medium"
@@ -206,16 +651,10 @@ class ContextualIntelligence:
         """Calculate current expertise based on accumulated patterns"""
         
         # Factor in session count and success rate
-        if self.behavior.session_count < 5:
-            base_level = UserExpertiseLevel.LEARNING
-        elif self.behavior.successful_builds / max(self.behavior.total_projects, 1) > 0.8:
-            base_level = UserExpertiseLevel.EXPERT
-        else:
-            base_level = UserExpertiseLevel.PROFICIENT
+        base_level = self._base_expertise(self.behavior.session_count)
             
-        # Adjust based on current session indicators
-        advanced_indicators = sum(1 for ind in self.behavior.current_expertise_indicators 
-                                if "technical" in ind or "performance" in ind or "knows_" in ind)
+        # Adjust based on session and (decayed) earlier indicator counters
+        advanced_indicators = self.behavior.advanced_signal()
         
         if advanced_indicators >= 3 and base_level != UserExpertiseLevel.LEARNING:
             return UserExpertiseLevel.INNOVATOR
@@ -224,6 +663,15 @@ class ContextualIntelligence:
             
         return base_level
     
+    def _base_expertise(self, session_count: int) -> UserExpertiseLevel:
+        """Expertise implied by history alone"""
+        if session_count < 5:
+            return UserExpertiseLevel.LEARNING
+        elif self.behavior.successful_builds / max(self.behavior.total_projects, 1) > 0.8:
+            return UserExpertiseLevel.EXPERT
+        else:
+            return UserExpertiseLevel.PROFICIENT
+    
     def _adapt_communication_style(self, expertise: UserExpertiseLevel, urgency: str) -> str:
         """Adapt communication style based on expertise and urgency"""
         
@@ -293,28 +741,36 @@ class ContextualIntelligence:
             
         return budget
     
-    def record_outcome(self, approach: str, success: bool, context: Dict[str, Any]):
-        """Record outcome to learn from successes and failures"""
-        
-        self.behavior.total_projects += 1
-        
-        if success:
-            self.behavior.successful_builds += 1
-            self.behavior.successful_approaches[approach] = self.behavior.successful_approaches.get(approach, 0) + 1
-        else:
-            self.behavior.failed_approaches[approach] = self.behavior.failed_approaches.get(approach, 0) + 1
-        
-        # Update framework familiarity based on usage
-        for framework in self.behavior.framework_familiarity:
-            if framework in approach.lower():
-                self.behavior.framework_familiarity[framework] += 0.1
-        
-        # Record session duration
-        session_duration = (datetime.now() - self.behavior.current_session_start).total_seconds() / 3600
-        self.behavior.session_durations.append(session_duration)
-        
-        # Save updated patterns
-        self.save_behavior_patterns()
+    def record_outcome(self, approach: str, success: bool, context: Dict[str, Any],
+                       corrections: Optional[Dict[str, Any]] = None):
+        """Record outcome to learn from successes and failures
+        
+        `corrections` gives the true `project_complexity` and/or
+        `user_expertise` of the last request; those labels become a classifier
+        training example, marked corrected when they differ from the
+        configuration in `context` and confirmed when they match it.
+        """
+        
+        self._record_event({
+            "type": "outcome",
+            "timestamp": datetime.now().isoformat(),
+            "approach": approach,
+            "success": success
+        })
+        
+        if self.last_request is not None and corrections:
+            labels = {}
+            corrected = False
+            for head in ("project_complexity", "user_expertise"):
+                label, predicted = corrections.get(head), context.get(head)
+                if label is None:
+                    continue
+                labels[head] = label.value if isinstance(label, Enum) else str(label)
+                corrected = corrected or labels[head] != (predicted.value if isinstance(predicted, Enum) else predicted)
+            if labels:
+                self._active_classifier()  # Applies any configured examples_file
+                append_example(self.CLASSIFIER_EXAMPLES, self.last_request, labels, success,
+                               corrected=corrected, confirmed=not corrected, user_id=self.user_id)
     
     def get_personalized_recommendations(self) -> Dict[str, Any]:
         """Get personalized recommendations based on learned patterns"""
@@ -323,8 +779,9 @@ class ContextualIntelligence:
         top_approaches = sorted(self.behavior.successful_approaches.items(), 
                                key=lambda x: x[1], reverse=True)[:3]
         
-        # Analyze productive times
-        avg_session_duration = statistics.mean(self.behavior.session_durations) if self.behavior.session_durations else 1.0
+        # Analyze productive times (recent sessions weigh most)
+        session_trend = self.behavior.session_length_trend
+        avg_session_duration = session_trend.mean if session_trend.mean is not None else 1.0
         
         # Framework recommendations based on familiarity
         recommended_frameworks = sorted(self.behavior.framework_familiarity.items(),
@@ -333,6 +790,8 @@ class ContextualIntelligence:
         return {
             "successful_approaches": top_approaches,
             "optimal_session_duration": avg_session_duration,
+            "session_duration_stddev": session_trend.stddev,
+            "productive_hours": self.behavior.productive_hours.peak_hours(),
             "recommended_frameworks": recommended_frameworks,
             "success_rate": self.behavior.successful_builds / max(self.behavior.total_projects, 1),
             "expertise_trajectory": self._calculate_expertise_trajectory()
@@ -341,7 +800,7 @@ class ContextualIntelligence:
     def _calculate_expertise_trajectory(self) -> str:
         """Calculate if user is improving over time"""
         
-        if len(self.behavior.session_durations) < 3:
+        if self.behavior.session_length_stats.count < 3:
             return "insufficient_data"
             
         recent_success = self.behavior.successful_builds / max(self.behavior.total_projects, 1)
@@ -356,40 +815,115 @@ class ContextualIntelligence:
             return "needs_support"
 
 
+def _scan_requests(requests: List[str]) -> np.ndarray:
+    """Keyword hits as a (requests, labels) boolean matrix (process-pool worker)"""
+    matcher, _ = ContextualIntelligence._build_keyword_matcher()
+    label_index = {label: i for i, label in enumerate(matcher.labels)}
+    seen: Dict[str, int] = {}  # Logged traffic repeats itself; scan each distinct text once
+    hits = np.zeros((len(requests), len(matcher.labels)), dtype=bool)
+    for i, request in enumerate(requests):
+        request = normalize_request(request)
+        first = seen.setdefault(request, i)
+        if first != i:
+            hits[i] = hits[first]
+            continue
+        for label in matcher.scan(request):
+            hits[i, label_index[label]] = True
+    return hits
+
+
 class PersonalAIArchitect:
     """Main orchestrator that learns and adapts to user automatically"""
     
-    def __init__(self):
+    def __init__(self, behavior_db: Path = Path("data/behavior.db"), max_cached_users: int = 256):
+        self.behavior_db = behavior_db
+        self.max_cached_users = max_cached_users
         self.intelligence = ContextualIntelligence()
-        self.current_config = None
-        
-    def process_request(self, request: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        self.repository: Optional[SQLiteBehaviorRepository] = None
+        # user_id (None for the default user) -> configuration and text of their last request
+        self._configs: "OrderedDict[Optional[str], Dict[str, Any]]" = OrderedDict()
+        self._last_requests: "OrderedDict[Optional[str], str]" = OrderedDict()
+    
+    @property
+    def current_config(self) -> Optional[Dict[str, Any]]:
+        """Configuration of the default (single) user's last request"""
+        return self._configs.get(None)
+    
+    def _intelligence_for(self, user_id: Optional[str]) -> ContextualIntelligence:
+        """The default single-user intelligence, or a view onto one user's profile"""
+        if user_id is None:
+            return self.intelligence
+        if self.repository is None:
+            self.repository = SQLiteBehaviorRepository(
+                self.behavior_db,
+                create=lambda uid: UserBehaviorPattern(user_id=uid),
+                restore=UserBehaviorPattern.from_dict,
+                max_cached=self.max_cached_users
+            )
+        return ContextualIntelligence(user_id, self.repository)
+        
+    def process_request(self, request: str, context: Dict[str, Any] = None,
+                        user_id: Optional[str] = None) -> Dict[str, Any]:
         """Process user request with automatic adaptation"""
         
         if context is None:
             context = {}
             
         # Analyze request and determine optimal configuration
-        self.current_config = self.intelligence.analyze_request(request, context)
+        config = self._intelligence_for(user_id).analyze_request(request, context)
+        for per_user, value in ((self._configs, config), (self._last_requests, request)):
+            per_user[user_id] = value
+            per_user.move_to_end(user_id)
+            while len(per_user) > self.max_cached_users:
+                per_user.popitem(last=False)
         
-        print(f"🧠 Automatically configured for your current expertise level: {self.current_config['user_expertise'].value}")
-        print(f"📊 Project complexity detected: {self.current_config['project_complexity'].value}")
-        print(f"⚡ Communication style: {self.current_config['communication_style']}")
+        print(f"🧠 Automatically configured for your current expertise level: {config['user_expertise'].value}")
+        print(f"📊 Project complexity detected: {config['project_complexity'].value}")
+        print(f"⚡ Communication style: {config['communication_style']}")
         
-        return self.current_config
+        return config
     
-    def record_session_outcome(self, approach: str, success: bool):
-        """Record session outcome for learning"""
-        self.intelligence.record_outcome(approach, success, self.current_config or {})
+    def record_session_outcome(self, approach: str, success: bool, user_id: Optional[str] = None,
+                               corrections: Optional[Dict[str, Any]] = None):
+        """Record session outcome for learning
+        
+        Pass `corrections` (e.g. {"project_complexity": ProjectComplexity.SIMPLE})
+        to correct or confirm how the last request was classified; only such
+        labels are used to train the request classifier.
+        """
+        intelligence = self._intelligence_for(user_id)
+        # Per-user intelligences are views built per call; the request lives here
+        intelligence.last_request = self._last_requests.get(user_id)
+        intelligence.record_outcome(approach, success, self._configs.get(user_id, {}), corrections)
         
         if success:
             print("✅ Success recorded - system learning from this approach")
         else:
             print("📝 Feedback recorded - system will adapt for better results")
     
-    def get_personal_insights(self) -> Dict[str, Any]:
+    def analyze_batch(self, requests: List[str], user_id: Optional[str] = None,
+                      workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Side-effect-free analysis of many (e.g. logged) requests, as columns"""
+        return self._intelligence_for(user_id).analyze_batch(requests, workers=workers)
+    
+    def load_classifier(self, path: Path) -> RequestClassifier:
+        """Swap in a trained request classifier model (see request_classifier.py)"""
+        return ContextualIntelligence.load_classifier(path)
+    
+    def get_personal_insights(self, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Get insights about your usage patterns and recommendations"""
-        return self.intelligence.get_personalized_recommendations()
+        return self._intelligence_for(user_id).get_personalized_recommendations()
+    
+    def analysis_cache_info(self) -> Dict[str, Any]:
+        """Hit rate of the request analysis cache (shared by all users)"""
+        return ContextualIntelligence.analysis_cache_info()
+    
+    def close(self):
+        """Write back buffered behavior events"""
+        self.intelligence.close()
+        if self.repository is not None:
+            self.repository.close()
+            self.repository = None
 
 
 # Example usage for Faheem's personal system
@@ -0,0 +1,151 @@
+"""
+Predictive Module Preloading
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Markov prediction over request module-set sequences
+
+Implements the `predictive_loading` productivity feature: the agent learns
+which module set tends to follow which, and warms the likely next modules in
+the background while it is idle so the next request finds them loaded.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+from dataclasses import dataclass
+from collections import Counter, OrderedDict
+
+
+@dataclass
+class PrefetchStats:
+    """Counters for prediction quality and prefetch cost"""
+    predictions: int = 0
+    exact_hits: int = 0
+    predicted_modules: int = 0
+    correct_modules: int = 0
+    prefetched_loads: int = 0
+    warm_hits: int = 0
+    wasted_loads: int = 0
+    
+    @property
+    def accuracy(self) -> float:
+        """Share of predictions that matched the next module set exactly"""
+        return self.exact_hits / self.predictions if self.predictions else 0.0
+    
+    @property
+    def module_precision(self) -> float:
+        """Share of predicted modules the next request actually used"""
+        return self.correct_modules / self.predicted_modules if self.predicted_modules else 0.0
+    
+    def report(self) -> Dict[str, Any]:
+        """Summary suitable for logging or dashboards"""
+        return {
+            'predictions': self.predictions,
+            'accuracy': self.accuracy,
+            'module_precision': self.module_precision,
+            'prefetched_loads': self.prefetched_loads,
+            'warm_hits': self.warm_hits,
+            'wasted_loads': self.wasted_loads
+        }
+
+
+class ModuleSequencePredictor:
+    """First-order Markov model over consecutive module sets
+    
+    States are the module sets selected for a request. Transitions are tracked
+    per session so interleaved users do not pollute each other's sequences;
+    when a state has never been seen, the prediction backs off to the most
+    common module set for the current orchestration mode.
+    
+    Memory is bounded: at most `max_states` source states, and each state's
+    (or mode's) counter keeps `max_successors` module sets. A full counter
+    replaces its least frequent entry, which inherits that count plus one
+    (space-saving), so frequent successors survive a stream of rare ones.
+    """
+    
+    def __init__(self, max_states: int = 4096, max_sessions: int = 1024, max_successors: int = 32):
+        self.max_states = max_states
+        self.max_sessions = max_sessions
+        self.max_successors = max_successors
+        self.transitions: Dict[FrozenSet[str], Counter] = {}
+        self.mode_sets: Dict[str, Counter] = {}
+        self.last_by_session: "OrderedDict[Optional[str], FrozenSet[str]]" = OrderedDict()
+        self.last_mode: Optional[str] = None
+        self.last_session: Optional[str] = None
+        self.pending_prediction: Optional[FrozenSet[str]] = None
+        self.stats = PrefetchStats()
+    
+    def observe(self, module_ids: Iterable[str], mode: Optional[str] = None,
+                session_id: Optional[str] = None):
+        """Record the module set chosen for a request"""
+        current = frozenset(module_ids)
+        self._score(current)
+        
+        previous = self.last_by_session.pop(session_id, None)
+        if previous is not None:
+            counts = self.transitions.get(previous)
+            if counts is None and len(self.transitions) < self.max_states:
+                counts = self.transitions[previous] = Counter()
+            if counts is not None:
+                self._increment(counts, current)
+        
+        if mode is not None:
+            self._increment(self.mode_sets.setdefault(mode, Counter()), current)
+        
+        self.last_by_session[session_id] = current
+        while len(self.last_by_session) > self.max_sessions:
+            self.last_by_session.popitem(last=False)
+        self.last_mode = mode
+        self.last_session = session_id
+    
+    def predict(self, session_id: Optional[str] = None) -> FrozenSet[str]:
+        """Most likely next module set (empty when there is nothing to go on)"""
+        if session_id is None:
+            session_id = self.last_session
+        
+        counts = self.transitions.get(self.last_by_session.get(session_id))
+        if not counts and self.last_mode is not None:
+            counts = self.mode_sets.get(self.last_mode)
+        
+        prediction = counts.most_common(1)[0][0] if counts else frozenset()
+        self.pending_prediction = prediction or None
+        return prediction
+    
+    def fit_performance_log(self, performance_log: Iterable[Dict[str, Any]]):
+        """Bootstrap transitions from a recorded registry performance log
+        
+        Chain executions log one entry per step with a `step_index`; an index
+        of 0 marks the start of a new request's module set. The registry's
+        log lives in memory only, so pass one recorded by an earlier run.
+        """
+        current: List[str] = []
+        for entry in performance_log:
+            step_index = entry.get('metrics', {}).get('step_index')
+            if step_index is None:
+                continue
+            if step_index == 0 and current:
+                self.observe(current)
+                current = []
+            current.append(entry['module_id'])
+        
+        if current:
+            self.observe(current)
+    
+    def _increment(self, counts: Counter, module_set: FrozenSet[str]):
+        """Count one occurrence, evicting the rarest entry when the counter is full"""
+        if module_set not in counts and len(counts) >= self.max_successors:
+            rarest = min(counts, key=counts.__getitem__)
+            counts[module_set] = counts.pop(rarest)
+        counts[module_set] += 1
+    
+    def _score(self, actual: FrozenSet[str]):
+        """Score the outstanding prediction against the actual module set"""
+        predicted = self.pending_prediction
+        if predicted is None:
+            return
+        
+        self.pending_prediction = None
+        self.stats.predictions += 1
+        self.stats.predicted_modules += len(predicted)
+        self.stats.correct_modules += len(predicted & actual)
+        if predicted == actual:
+            self.stats.exact_hits += 1
@@ -0,0 +1,154 @@
+"""
+System Prompt Assembly
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Prefix-stable assembly of module prompts
+
+Concatenates the content of selected modules into a final system prompt in a
+canonical order: stable, critical modules (security, governance) first and
+volatile style modules last, each tier sorted by module id. Requests that
+differ only in style share a byte-identical prefix, which maximizes provider
+and vLLM prefix/KV-cache reuse. Assembled prefixes are cached by the hash of
+their module set.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+
+
+# Stability tiers, in assembly order
+STABLE = 0
+STANDARD = 1
+VOLATILE = 2
+
+FRAGMENT_SEPARATOR = '\n\n'
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+@dataclass(frozen=True)
+class PromptFragment:
+    """One module's contribution to the system prompt"""
+    module_id: str
+    content: str
+    stability: int = STANDARD
+    sha256_hash: str = ''
+    
+    @classmethod
+    def from_file(cls, path: Path, stability: int = STANDARD, module_id: Optional[str] = None) -> 'PromptFragment':
+        content = Path(path).read_text(encoding='utf-8')
+        return cls(
+            module_id=module_id or Path(path).stem,
+            content=content,
+            stability=stability,
+            sha256_hash=hashlib.sha256(content.encode('utf-8')).hexdigest()
+        )
+    
+    @property
+    def key(self) -> str:
+        return self.sha256_hash or hashlib.sha256(self.content.encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class AssembledPrompt:
+    """Final system prompt with its cache-relevant split"""
+    text: str
+    prefix_hash: str
+    prefix_tokens: int
+    suffix_tokens: int
+    prefix_cache_hit: bool
+    module_order: Tuple[str, ...]
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prefix_tokens + self.suffix_tokens
+    
+    @property
+    def prefix_share(self) -> float:
+        return self.prefix_tokens / self.total_tokens if self.total_tokens else 0.0
+
+
+class PromptAssembler:
+    """Assembles fragments in canonical, prefix-stable order with prefix caching"""
+    
+    def __init__(self, token_counter: Callable[[str], int] = estimate_tokens,
+                 stability_overrides: Optional[Dict[str, int]] = None,
+                 max_cached_prefixes: int = 256):
+        self.token_counter = token_counter
+        self.stability_overrides = stability_overrides or {}
+        self.max_cached_prefixes = max_cached_prefixes
+        self.prefix_cache: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self.stats = {'prefix_hits': 0, 'prefix_misses': 0}
+    
+    def classify(self, metadata: Any) -> int:
+        """Stability tier for a registry module"""
+        if metadata.id in self.stability_overrides:
+            return self.stability_overrides[metadata.id]
+        if metadata.id.startswith('style_'):
+            return VOLATILE
+        if getattr(metadata.status, 'value', metadata.status) == 'critical':
+            return STABLE
+        return STANDARD
+    
+    def fragments_for_modules(self, modules: Iterable[Any], read_text: Callable[[Any], str],
+                              is_managed: Optional[Callable[[Any], bool]] = None) -> List[PromptFragment]:
+        """Build fragments for registry modules, reading content via `read_text`
+        
+        The file hash identifies a fragment only when its content came from
+        that file; managed modules (`is_managed`) are keyed by a hash of the
+        content served.
+        """
+        return [
+            PromptFragment(
+                module_id=metadata.id,
+                content=read_text(metadata),
+                stability=self.classify(metadata),
+                sha256_hash='' if is_managed is not None and is_managed(metadata) else metadata.sha256_hash
+            )
+            for metadata in modules
+        ]
+    
+    def assemble(self, fragments: Iterable[PromptFragment]) -> AssembledPrompt:
+        """Assemble a system prompt; the non-volatile prefix is cached by set hash"""
+        ordered = sorted(fragments, key=lambda fragment: (fragment.stability, fragment.module_id))
+        prefix_fragments = [f for f in ordered if f.stability < VOLATILE]
+        suffix_fragments = [f for f in ordered if f.stability >= VOLATILE]
+        
+        prefix_hash = hashlib.sha256(
+            '\0'.join(f"{f.module_id}:{f.key}" for f in prefix_fragments).encode('utf-8')
+        ).hexdigest()
+        
+        cached = self.prefix_cache.get(prefix_hash)
+        prefix_cache_hit = cached is not None
+        if prefix_cache_hit:
+            self.prefix_cache.move_to_end(prefix_hash)
+            self.stats['prefix_hits'] += 1
+        else:
+            prefix_text = FRAGMENT_SEPARATOR.join(f.content for f in prefix_fragments)
+            cached = (prefix_text, self.token_counter(prefix_text) if prefix_text else 0)
+            self.prefix_cache[prefix_hash] = cached
+            while len(self.prefix_cache) > self.max_cached_prefixes:
+                self.prefix_cache.popitem(last=False)
+            self.stats['prefix_misses'] += 1
+        prefix_text, prefix_tokens = cached
+        
+        suffix_text = FRAGMENT_SEPARATOR.join(f.content for f in suffix_fragments)
+        if prefix_text and suffix_text:
+            # The separator belongs to the suffix so the prefix stays byte-identical
+            suffix_text = FRAGMENT_SEPARATOR + suffix_text
+        
+        return AssembledPrompt(
+            text=prefix_text + suffix_text,
+            prefix_hash=prefix_hash,
+            prefix_tokens=prefix_tokens,
+            suffix_tokens=self.token_counter(suffix_text) if suffix_text else 0,
+            prefix_cache_hit=prefix_cache_hit,
+            module_order=tuple(f.module_id for f in ordered)
+        )
@@ -0,0 +1,412 @@
+"""
+Cross-Module Prompt Deduplication
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Offline shingling + MinHash/LSH compression pass
+
+The config modules (behavioral_governance.md, security_policies.md,
+communication_framework.md, ...) repeat headings, boilerplate and whole
+policies across files and across architects. This pass splits every module
+into markdown sections, fingerprints each section with word shingles and
+MinHash, and groups exact and near-duplicate sections with LSH banding.
+
+For a given module set, the first module (in assembly order) keeps each
+section; later copies that are identical up to whitespace are replaced by
+a one-line reference to the section that is already in the prompt. Whole
+sections rarely repeat verbatim, so kept sections are deduplicated again at
+block level: paragraphs, whole fenced code blocks, whole lists and then
+single list items that already appeared earlier in the set are replaced the
+same way, whenever the reference is shorter than the text it stands for.
+References are only emitted when the canonical text is part of the same
+module set, so the assembled prompt never points at text the model cannot
+see. Near-duplicates are never replaced, since the clauses that differ may
+matter; they are reported for manual review instead.
+
+Usage:
+    python prompt_dedup.py 01-Orchestrator-Architect/config/*.md --out data/dedup
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import re
+
+import numpy as np
+
+from prompt_assembly import estimate_tokens
+
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+_MERSENNE_PRIME = (1 << 61) - 1
+_HEADING_PATTERN = re.compile(r"^(#{1,3})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_WORD_PATTERN = re.compile(r"\w+")
+_LIST_ITEM_PATTERN = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+\S")
+_STRUCTURE_PATTERN = re.compile(r"^\s*(#{1,6}\s|([-*_])(\s*\2){2,}\s*$|\|)")
+
+
+@dataclass
+class Section:
+    """One markdown section of a module"""
+    module_id: str
+    index: int
+    heading: str
+    text: str
+    signature: Optional[np.ndarray] = None
+    digest: str = ''
+    
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.module_id, self.index)
+
+
+@dataclass
+class DedupResult:
+    """Deduplicated fragments for one module set"""
+    fragments: Dict[str, str]
+    references: List[Dict[str, str]] = field(default_factory=list)
+    near_duplicates: List[Dict[str, object]] = field(default_factory=list)
+    module_tokens: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    tokens_before: int = 0
+    tokens_after: int = 0
+    
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+    
+    def report(self) -> Dict[str, object]:
+        return {
+            'modules': list(self.fragments),
+            'tokens_before': self.tokens_before,
+            'tokens_after': self.tokens_after,
+            'tokens_saved': self.tokens_saved,
+            'references': self.references,
+            'near_duplicates': self.near_duplicates
+        }
+
+
+def split_sections(module_id: str, text: str) -> List[Section]:
+    """Split markdown at level 1-3 headings (any preamble is section 0)"""
+    starts = [match.start() for match in _HEADING_PATTERN.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(text))
+    
+    sections = []
+    for start, end in zip(starts, starts[1:]):
+        chunk = text[start:end]
+        if not chunk.strip():
+            continue
+        heading = _HEADING_PATTERN.match(chunk)
+        sections.append(Section(
+            module_id=module_id,
+            index=len(sections),
+            heading=heading.group(2) if heading else '',
+            text=chunk
+        ))
+    return sections
+
+
+def split_blocks(text: str) -> List[Tuple[str, str]]:
+    """Split a section into (kind, text) blocks that join back to the input
+    
+    Kinds are 'paragraph', 'list' (consecutive list items with their
+    continuation lines) and 'code' (a whole fenced block), which may be
+    deduplicated, and 'raw': blank lines, headings, rules and tables, which
+    are always kept.
+    """
+    blocks: List[List[str]] = []  # [kind, text]
+    in_code = False
+    
+    for line in text.splitlines(keepends=True):
+        fence = line.lstrip().startswith('```')
+        if fence or in_code:
+            kind = 'code'
+            in_code = in_code != fence
+        elif not line.strip() or _STRUCTURE_PATTERN.match(line):
+            kind = 'raw'
+        elif _LIST_ITEM_PATTERN.match(line):
+            kind = 'list'
+        else:
+            kind = 'paragraph'
+        
+        current = blocks[-1] if blocks else None
+        # Unindented text right after an item continues it, as in markdown
+        if current is not None and (current[0] == kind or (current[0] == 'list' and kind == 'paragraph')):
+            current[1] += line
+        else:
+            blocks.append([kind, line])
+    
+    return [(kind, block) for kind, block in blocks]
+
+
+def split_items(list_text: str) -> List[str]:
+    """Split a 'list' block into its items (each with its continuation lines)"""
+    items: List[str] = []
+    for line in list_text.splitlines(keepends=True):
+        if _LIST_ITEM_PATTERN.match(line) or not items:
+            items.append(line)
+        else:
+            items[-1] += line
+    return items
+
+
+def normalized_digest(text: str) -> str:
+    """Hash of a section with runs of whitespace collapsed"""
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures over 32-bit hashed word shingles"""
+    
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, shingle_size: int = SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.shingle_size = shingle_size
+        # a, b < 2**32 and 32-bit shingles keep a * x + b inside uint64
+        self.a = rng.integers(1, 1 << 32, num_permutations, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, num_permutations, dtype=np.uint64)
+    
+    def shingles(self, text: str) -> np.ndarray:
+        words = _WORD_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        grams = {' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+        return np.array(
+            [int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=4).digest(), 'little')
+             for gram in grams],
+            dtype=np.uint64
+        )
+    
+    def signature(self, text: str) -> np.ndarray:
+        values = self.shingles(text)
+        hashed = (self.a[:, None] * values[None, :] + self.b[:, None]) % np.uint64(_MERSENNE_PRIME)
+        return hashed.min(axis=1)
+
+
+class PromptDeduplicator:
+    """Index of module sections with near-duplicate clustering"""
+    
+    def __init__(self, threshold: float = 0.8, min_tokens: int = 20, min_block_tokens: int = 16,
+                 token_counter: Callable[[str], int] = estimate_tokens,
+                 hasher: Optional[MinHasher] = None):
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.min_block_tokens = min_block_tokens
+        self.token_counter = token_counter
+        self.hasher = hasher or MinHasher()
+        self.modules: Dict[str, List[Section]] = {}
+        self._canonical: Dict[Tuple[str, int], Tuple[str, int]] = {}
+    
+    def add_module(self, module_id: str, text: str):
+        """Index a module's sections (call `build()` afterwards)"""
+        sections = split_sections(module_id, text)
+        for section in sections:
+            section.signature = self.hasher.signature(section.text)
+            section.digest = normalized_digest(section.text)
+        self.modules[module_id] = sections
+    
+    def add_files(self, paths: Iterable[Path], base_path: Optional[Path] = None):
+        for path in paths:
+            path = Path(path)
+            module_id = str(path.relative_to(base_path)) if base_path else str(path)
+            self.add_module(module_id, path.read_text(encoding='utf-8'))
+    
+    def build(self):
+        """Cluster duplicate sections with LSH banding and a signature check"""
+        sections = [s for module in self.modules.values() for s in module
+                    if self.token_counter(s.text) >= self.min_tokens]
+        parent = {s.key: s.key for s in sections}
+        
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+        
+        by_key = {s.key: s for s in sections}
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+        buckets: Dict[Tuple[int, bytes], List[Tuple[str, int]]] = {}
+        for section in sections:
+            for band in range(LSH_BANDS):
+                band_key = (band, section.signature[band * rows:(band + 1) * rows].tobytes())
+                buckets.setdefault(band_key, []).append(section.key)
+        
+        for members in buckets.values():
+            for other in members[1:]:
+                first, second = by_key[members[0]], by_key[other]
+                if find(first.key) == find(second.key):
+                    continue
+                if np.mean(first.signature == second.signature) >= self.threshold:
+                    parent[find(second.key)] = find(first.key)
+        
+        self._canonical = {key: find(key) for key in parent}
+    
+    def clusters(self) -> List[List[Tuple[str, int]]]:
+        """Groups of duplicate sections (singletons omitted)"""
+        groups: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+        for key, root in self._canonical.items():
+            groups.setdefault(root, []).append(key)
+        return [sorted(members) for members in groups.values() if len(members) > 1]
+    
+    def compress(self, module_ids: List[str]) -> DedupResult:
+        """Deduplicated fragments for a module set, in the given assembly order
+        
+        Only sections identical up to whitespace are replaced; other members
+        of a near-duplicate cluster are kept and listed in `near_duplicates`.
+        Kept sections then have repeated paragraphs and list items of at
+        least `min_block_tokens` replaced. Token counts before and after are
+        both taken over whole modules.
+        """
+        seen: Dict[str, Section] = {}
+        seen_blocks: Dict[str, Section] = {}
+        kept_by_cluster: Dict[Tuple[str, int], Section] = {}
+        result = DedupResult(fragments={})
+        
+        for module_id in module_ids:
+            parts = []
+            for section in self.modules[module_id]:
+                cluster = self._canonical.get(section.key)
+                kept = seen.get(section.digest) if cluster is not None else None
+                
+                if kept is None:
+                    if cluster is not None:
+                        similar = kept_by_cluster.setdefault(cluster, section)
+                        if similar is not section:
+                            result.near_duplicates.append({
+                                'module_id': module_id,
+                                'section': section.heading,
+                                'similar_module_id': similar.module_id,
+                                'similar_section': similar.heading,
+                                'similarity': float(np.mean(section.signature == similar.signature))
+                            })
+                        seen[section.digest] = section
+                    parts.append(self._compress_blocks(section, seen_blocks, result))
+                    continue
+                
+                heading_line = section.text.splitlines()[0] + '\n' if section.heading else ''
+                parts.append(f"{heading_line}(Same as \"{kept.heading or 'preamble'}\" in {kept.module_id}.)\n\n")
+                result.references.append({
+                    'kind': 'section',
+                    'module_id': module_id,
+                    'section': section.heading,
+                    'canonical_module_id': kept.module_id,
+                    'canonical_section': kept.heading
+                })
+            
+            result.fragments[module_id] = ''.join(parts)
+            before = self.token_counter(''.join(section.text for section in self.modules[module_id]))
+            after = self.token_counter(result.fragments[module_id])
+            result.module_tokens[module_id] = (before, after)
+            result.tokens_before += before
+            result.tokens_after += after
+        
+        return result
+    
+    def _compress_blocks(self, section: Section, seen_blocks: Dict[str, Section], result: DedupResult) -> str:
+        """A kept section's text with blocks already in the prompt replaced
+        
+        Paragraphs, code blocks and whole lists are tried first; the items of
+        a list that is not repeated as a whole are then tried one by one.
+        """
+        parts = []
+        for kind, text in split_blocks(section.text):
+            if kind == 'raw':
+                parts.append(text)
+            elif self._replace_block(kind, text, section, seen_blocks, result, parts):
+                continue
+            elif kind == 'list':
+                for item in split_items(text):
+                    if not self._replace_block('item', item, section, seen_blocks, result, parts):
+                        parts.append(item)
+            else:
+                parts.append(text)
+        return ''.join(parts)
+    
+    def _replace_block(self, kind: str, text: str, section: Section, seen_blocks: Dict[str, Section],
+                       result: DedupResult, parts: List[str]) -> bool:
+        """Append a reference if the block is already in the prompt and the
+        reference is shorter; otherwise remember the block and return False"""
+        if self.token_counter(text) < self.min_block_tokens:
+            return False
+        kept = seen_blocks.setdefault(normalized_digest(text), section)
+        if kept is section:
+            return False
+        
+        where = f"in {kept.module_id} under \"{kept.heading or 'preamble'}\""
+        if kind == 'item':
+            indent, marker = _LIST_ITEM_PATTERN.match(text).group(1, 2)
+            reference = f"{indent}{marker} (Same item as {where}.)\n"
+        else:
+            reference = f"(Same {'code block' if kind == 'code' else kind} as {where}.)\n"
+        # Short blocks can cost less than the reference to them
+        if self.token_counter(reference) >= self.token_counter(text):
+            return False
+        
+        parts.append(reference)
+        result.references.append({
+            'kind': kind,
+            'module_id': section.module_id,
+            'section': section.heading,
+            'canonical_module_id': kept.module_id,
+            'canonical_section': kept.heading
+        })
+        return True
+
+
+def write_fragments(result: DedupResult, out_dir: Path):
+    """Write deduplicated fragments plus a manifest of references and savings"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = result.report()
+    manifest['files'] = {}
+    for module_id, text in result.fragments.items():
+        name = module_id.replace('/', '__')
+        (out_dir / name).write_text(text, encoding='utf-8')
+        manifest['files'][module_id] = name
+    with open(out_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate near-identical sections across prompt modules")
+    parser.add_argument('paths', nargs='+', type=Path, help="module files, in assembly order")
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help="estimated Jaccard similarity to report as a near-duplicate")
+    parser.add_argument('--min-tokens', type=int, default=20, help="ignore sections smaller than this")
+    parser.add_argument('--min-block-tokens', type=int, default=16,
+                        help="ignore paragraphs and list items smaller than this")
+    parser.add_argument('--out', type=Path, help="directory for deduplicated fragments and manifest.json")
+    args = parser.parse_args()
+    
+    deduplicator = PromptDeduplicator(threshold=args.threshold, min_tokens=args.min_tokens,
+                                      min_block_tokens=args.min_block_tokens)
+    deduplicator.add_files(args.paths)
+    deduplicator.build()
+    result = deduplicator.compress([str(path) for path in args.paths])
+    
+    print(f"{'module':<60} {'before':>8} {'after':>8}")
+    for module_id, (before, after) in result.module_tokens.items():
+        print(f"{module_id:<60} {before:>8} {after:>8}")
+    replaced = Counter(reference['kind'] for reference in result.references)
+    print(f"\n{len(deduplicator.clusters())} duplicate clusters; replaced {replaced['section']} sections, "
+          f"{replaced['paragraph']} paragraphs, {replaced['code']} code blocks, "
+          f"{replaced['list']} lists, {replaced['item']} list items")
+    print(f"Tokens: {result.tokens_before} -> {result.tokens_after} (saved {result.tokens_saved})")
+    
+    if result.near_duplicates:
+        print(f"\n{len(result.near_duplicates)} near-duplicate sections kept for manual review:")
+        for entry in result.near_duplicates:
+            print(f"  {entry['module_id']} \"{entry['section'] or 'preamble'}\" ~ "
+                  f"{entry['similar_module_id']} \"{entry['similar_section'] or 'preamble'}\" "
+                  f"({entry['similarity']:.2f})")
+    
+    if args.out:
+        write_fragments(result, args.out)
+
+
+if __name__ == "__main__":
+    main()
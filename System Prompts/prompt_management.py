@@ -0,0 +1,430 @@
+"""
+Prompt Management
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Pluggable prompt version management for managed modules
+
+`PromptManager` is the interface managed agents use to fetch prompt versions,
+log usage and run A/B tests. `LocalPromptManager` implements it without any
+external service:
+
+    base_path/
+    ├── index.json          # prompt_id -> {latest, versions: {version: sha256},
+    │                       #               experiment: [version, ...]}
+    ├── objects/ab/abcd...  # prompt content, content-addressed by SHA-256
+    ├── usage.jsonl         # usage events
+    └── bandit.json         # A/B allocation state
+
+Reads resolve versions through the in-memory index (reloaded when the index
+file changes), then hit an in-memory LRU; misses mmap the object file and
+verify its hash once.
+
+Managed agents serve a prompt's `latest` version unless an experiment is
+configured for it (`set_experiment`); then `ab_test` allocates its variants
+with Thompson sampling (`VariantBandit`) on every request. Usage events that
+name a `variant` update its posterior with a reward combining
+`quality_score` and `latency_ms`, so traffic shifts toward better, faster
+variants.
+
+`BufferedUsageLogger` takes usage logging off the response path: events are
+queued without awaiting and written in batches by a background task.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import random
+import time
+
+
+class PromptManager(ABC):
+    """Abstract interface for prompt management systems"""
+    
+    @abstractmethod
+    async def get_prompt_version(self, prompt_id: str, version: str = 'latest') -> str:
+        pass
+    
+    @abstractmethod
+    async def log_usage(self, prompt_id: str, metrics: Dict[str, Any]) -> None:
+        pass
+    
+    @abstractmethod
+    async def ab_test(self, prompt_id: str, variants: List[str]) -> str:
+        pass
+    
+    async def experiment_variants(self, prompt_id: str) -> List[str]:
+        """Versions under an A/B experiment (none: serve `latest`)"""
+        return []
+    
+    async def log_usage_batch(self, events: List[Dict[str, Any]]) -> None:
+        """Log several usage events (override when the backend can batch)"""
+        for event in events:
+            await self.log_usage(event['prompt_id'], event['metrics'])
+    
+    async def close(self) -> None:
+        """Persist any buffered state on shutdown"""
+
+
+class VariantBandit:
+    """Thompson-sampling allocator over prompt variants
+    
+    Each (prompt, variant) arm keeps a Beta(alpha, beta) posterior over a
+    reward in [0, 1]; a reward r adds r to alpha and 1 - r to beta. Both
+    allocation and update are constant work per arm, independent of history.
+    """
+    
+    def __init__(self, state_path: Optional[Path] = None, quality_weight: float = 0.7,
+                 latency_target_ms: float = 2000.0, save_every: int = 50):
+        self.state_path = state_path
+        self.quality_weight = quality_weight
+        self.latency_target_ms = latency_target_ms
+        self.save_every = save_every
+        self.arms: Dict[str, Dict[str, List[float]]] = {}
+        self.unsaved = 0
+        
+        if state_path is not None and Path(state_path).exists():
+            with open(state_path) as f:
+                self.arms = json.load(f)
+    
+    def choose(self, prompt_id: str, variants: List[str]) -> str:
+        """Sample each variant's posterior and pick the best draw"""
+        arms = self.arms.setdefault(prompt_id, {})
+        best_variant, best_draw = variants[0], -1.0
+        for variant in variants:
+            alpha, beta = arms.setdefault(variant, [1.0, 1.0])
+            draw = random.betavariate(alpha, beta)
+            if draw > best_draw:
+                best_variant, best_draw = variant, draw
+        return best_variant
+    
+    def reward(self, metrics: Dict[str, Any]) -> float:
+        """Blend quality (0-1) with a latency score that halves at the target
+        
+        Without a reported quality score the reward is the latency score alone.
+        """
+        latency_ms = max(float(metrics.get('latency_ms') or 0.0), 0.0)
+        latency_score = self.latency_target_ms / (self.latency_target_ms + latency_ms)
+        quality = metrics.get('quality_score', metrics.get('effectiveness_score'))
+        if quality is None:
+            return latency_score
+        quality = min(max(float(quality), 0.0), 1.0)
+        return self.quality_weight * quality + (1 - self.quality_weight) * latency_score
+    
+    def update(self, prompt_id: str, variant: str, metrics: Dict[str, Any]):
+        r = self.reward(metrics)
+        arm = self.arms.setdefault(prompt_id, {}).setdefault(variant, [1.0, 1.0])
+        arm[0] += r
+        arm[1] += 1 - r
+        self.unsaved += 1
+    
+    @property
+    def save_due(self) -> bool:
+        """Enough updates since the last save to persist again"""
+        return self.unsaved >= self.save_every
+    
+    def allocation(self, prompt_id: str) -> Dict[str, float]:
+        """Posterior mean reward per variant"""
+        return {variant: alpha / (alpha + beta)
+                for variant, (alpha, beta) in self.arms.get(prompt_id, {}).items()}
+    
+    def snapshot(self) -> bytes:
+        """Serialized state; taken on the event loop, written anywhere"""
+        self.unsaved = 0
+        return json.dumps(self.arms, sort_keys=True).encode('utf-8')
+    
+    def write(self, data: bytes):
+        if self.state_path is not None:
+            LocalPromptManager._atomic_write(Path(self.state_path), data)
+    
+    def save(self):
+        self.write(self.snapshot())
+
+
+class LocalPromptManager(PromptManager):
+    """Content-addressed on-disk prompt store with an in-memory LRU"""
+    
+    def __init__(self, base_path: Path, cache_size: int = 256,
+                 index_check_interval: float = 1.0):
+        self.base_path = Path(base_path)
+        self.objects_path = self.base_path / 'objects'
+        self.index_path = self.base_path / 'index.json'
+        self.usage_path = self.base_path / 'usage.jsonl'
+        self.bandit = VariantBandit(self.base_path / 'bandit.json')
+        self.cache_size = cache_size
+        self.index_check_interval = index_check_interval
+        
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {'cache_hits': 0, 'cache_misses': 0, 'index_reloads': 0}
+        self._index_mtime: Optional[int] = None
+        self._index_checked_at = float('-inf')
+        
+        self.objects_path.mkdir(parents=True, exist_ok=True)
+        self._refresh_index(force=True)
+    
+    async def get_prompt_version(self, prompt_id: str, version: str = 'latest') -> str:
+        """Return prompt content for a version ('latest' resolves via the index)"""
+        return self.read_prompt(prompt_id, version)
+    
+    def read_prompt(self, prompt_id: str, version: str = 'latest') -> str:
+        """Synchronous read path shared by the async interface"""
+        sha256_hash = self.resolve(prompt_id, version)
+        
+        content = self.cache.get(sha256_hash)
+        if content is not None:
+            self.cache.move_to_end(sha256_hash)
+            self.stats['cache_hits'] += 1
+            return content
+        
+        self.stats['cache_misses'] += 1
+        content = self._read_object(sha256_hash)
+        self.cache[sha256_hash] = content
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return content
+    
+    def resolve(self, prompt_id: str, version: str = 'latest') -> str:
+        """Resolve a prompt version to its content hash"""
+        self._refresh_index()
+        
+        entry = self.index.get(prompt_id)
+        if entry is None:
+            raise KeyError(f"Unknown prompt: {prompt_id}")
+        if version == 'latest':
+            version = entry['latest']
+        
+        sha256_hash = entry['versions'].get(version)
+        if sha256_hash is None:
+            raise KeyError(f"Unknown version {version} for prompt {prompt_id}")
+        return sha256_hash
+    
+    def put_prompt(self, prompt_id: str, content: str, version: Optional[str] = None,
+                   make_latest: bool = True) -> str:
+        """Store a prompt version; identical content is stored only once"""
+        data = content.encode('utf-8')
+        sha256_hash = hashlib.sha256(data).hexdigest()
+        
+        object_path = self._object_path(sha256_hash)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(object_path, data)
+        
+        self._refresh_index(force=True)
+        entry = self.index.setdefault(prompt_id, {'latest': None, 'versions': {}})
+        if version is None:
+            version = f"v{len(entry['versions']) + 1}"
+        entry['versions'][version] = sha256_hash
+        if make_latest or entry['latest'] is None:
+            entry['latest'] = version
+        
+        self._write_index()
+        return version
+    
+    def _write_index(self):
+        self._atomic_write(self.index_path, json.dumps(self.index, indent=2, sort_keys=True).encode('utf-8'))
+        self._index_mtime = self.index_path.stat().st_mtime_ns
+    
+    async def log_usage(self, prompt_id: str, metrics: Dict[str, Any]) -> None:
+        """Append a usage event to the local usage log"""
+        await self.log_usage_batch([{'prompt_id': prompt_id, 'metrics': metrics}])
+    
+    async def log_usage_batch(self, events: List[Dict[str, Any]]) -> None:
+        """Append usage events with a single write, off the event loop
+        
+        Events whose metrics name a `variant` also update the A/B bandit,
+        whose state is saved (also off the loop) every `save_every` updates.
+        """
+        for event in events:
+            variant = event['metrics'].get('variant')
+            if variant is not None:
+                self.bandit.update(event['prompt_id'], variant, event['metrics'])
+        if self.bandit.save_due:
+            await asyncio.to_thread(self.bandit.write, self.bandit.snapshot())
+        
+        lines = ''.join(
+            json.dumps({
+                'prompt_id': event['prompt_id'],
+                'timestamp': event.get('timestamp') or datetime.utcnow().isoformat(),
+                'metrics': event['metrics']
+            }, default=str) + '\n'
+            for event in events
+        )
+        await asyncio.to_thread(self._append_usage, lines)
+    
+    def _append_usage(self, lines: str):
+        with open(self.usage_path, 'a') as f:
+            f.write(lines)
+    
+    async def list_versions(self, prompt_id: str) -> List[str]:
+        """Stored versions of a prompt, in version-name order"""
+        self._refresh_index()
+        return sorted(self.index.get(prompt_id, {}).get('versions', {}))
+    
+    async def experiment_variants(self, prompt_id: str) -> List[str]:
+        """Versions configured as A/B arms with `set_experiment`"""
+        self._refresh_index()
+        entry = self.index.get(prompt_id, {})
+        return [version for version in entry.get('experiment', []) if version in entry.get('versions', {})]
+    
+    def set_experiment(self, prompt_id: str, versions: Optional[List[str]]):
+        """Run an A/B experiment over stored versions; None or [] ends it
+        
+        Loaded modules pick up a changed experiment when they are next loaded.
+        """
+        self._refresh_index(force=True)
+        entry = self.index.get(prompt_id)
+        if entry is None:
+            raise KeyError(f"Unknown prompt: {prompt_id}")
+        versions = list(versions or [])
+        unknown = [version for version in versions if version not in entry['versions']]
+        if unknown:
+            raise KeyError(f"Unknown versions {unknown} for prompt {prompt_id}")
+        if len(versions) == 1:
+            raise ValueError("An experiment needs at least two variants")
+        
+        if versions:
+            entry['experiment'] = versions
+        else:
+            entry.pop('experiment', None)
+        self._write_index()
+    
+    async def ab_test(self, prompt_id: str, variants: List[str]) -> str:
+        """Pick a variant for this request (Thompson sampling)
+        
+        Report the outcome with `log_usage(prompt_id, {'variant': ..., ...})`.
+        """
+        return self.bandit.choose(prompt_id, variants)
+    
+    async def close(self) -> None:
+        await asyncio.to_thread(self.bandit.write, self.bandit.snapshot())
+    
+    def _refresh_index(self, force: bool = False):
+        """Reload the index when the file changed, checking at most once per interval"""
+        now = time.monotonic()
+        if not force and now - self._index_checked_at < self.index_check_interval:
+            return
+        self._index_checked_at = now
+        
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._index_mtime:
+            return
+        
+        with open(self.index_path) as f:
+            self.index = json.load(f)
+        self._index_mtime = mtime
+        self.stats['index_reloads'] += 1
+    
+    def _read_object(self, sha256_hash: str) -> str:
+        """mmap an object file and verify it against its address"""
+        with open(self._object_path(sha256_hash), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                data = b''
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    data = mapped[:]
+        
+        if hashlib.sha256(data).hexdigest() != sha256_hash:
+            raise ValueError(f"Corrupt prompt object {sha256_hash}")
+        return data.decode('utf-8')
+    
+    def _object_path(self, sha256_hash: str) -> Path:
+        return self.objects_path / sha256_hash[:2] / sha256_hash
+    
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class BufferedUsageLogger:
+    """Queue usage events and flush them to a prompt manager in batches
+    
+    `log()` never awaits: it enqueues and returns, or drops the event (and
+    counts it) when the queue is full. A background task flushes whenever
+    `batch_size` events are waiting or `flush_interval` seconds have passed.
+    Call `close()` on shutdown to flush what is left.
+    """
+    
+    def __init__(self, prompt_manager: PromptManager, max_queue: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        self.prompt_manager = prompt_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {'enqueued': 0, 'dropped': 0, 'flushed': 0, 'batches': 0, 'failed': 0}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+    
+    def log(self, prompt_id: str, metrics: Dict[str, Any]) -> bool:
+        """Enqueue a usage event; returns False if it was dropped"""
+        if self._closed:
+            self.stats['dropped'] += 1
+            return False
+        
+        try:
+            self._queue.put_nowait({
+                'prompt_id': prompt_id,
+                'timestamp': datetime.utcnow().isoformat(),
+                'metrics': metrics
+            })
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            return False
+        
+        self.stats['enqueued'] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return True
+    
+    async def flush(self):
+        """Write everything queued so far"""
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+    
+    async def close(self):
+        """Stop accepting events, flush the queue and stop the background task"""
+        self._closed = True
+        self._batch_ready.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+    
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+    
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            await self.prompt_manager.log_usage_batch(batch)
+        except Exception:
+            self.stats['failed'] += len(batch)
+        else:
+            self.stats['flushed'] += len(batch)
+            self.stats['batches'] += 1
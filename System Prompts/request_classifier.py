@@ -0,0 +1,231 @@
+"""
+Learned Request Classifier
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Hashed word n-grams + multinomial logistic regression, NumPy inference
+
+The keyword heuristics in personal_ai_architect.py are hand-tuned. This
+module learns the same decisions from recorded outcomes: a finished
+session whose labels the user corrected or confirmed appends the request
+and those labels to a JSONL examples file, and an offline training pass
+fits one softmax head per decision (`project_complexity`, `user_expertise`)
+over hashed word unigrams and bigrams. The system's own predictions are
+never used as labels, so examples that were neither corrected nor
+confirmed are left out.
+
+Inference is a hash per n-gram, a row gather and a softmax, a few tens of
+microseconds per request. Models are versioned `.npz` files written
+atomically, so a running process can swap to a new one at any time.
+
+Usage:
+    python request_classifier.py data/classifier_examples.jsonl --out data/models/request_classifier.npz
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+
+
+MODEL_FORMAT = 1
+N_FEATURES = 1 << 14
+_WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+
+
+def hashed_ngrams(text: str, n_features: int = N_FEATURES) -> np.ndarray:
+    """Feature indices of a request's word unigrams and bigrams"""
+    words = _WORD_PATTERN.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) % n_features for gram in grams),
+                       dtype=np.int64, count=len(grams))
+
+
+def load_examples(path: Path) -> List[Dict[str, Any]]:
+    """Labelled examples from a JSONL file, skipping unreadable lines"""
+    examples = []
+    with open(path) as f:
+        for line in f:
+            try:
+                examples.append(json.loads(line))
+            except ValueError:
+                continue
+    return examples
+
+
+def append_example(path: Path, request: str, labels: Dict[str, str], success: bool,
+                   corrected: bool = False, confirmed: bool = False, user_id: Optional[str] = None):
+    """Record one outcome as a training example"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    example = {'request': request, 'labels': labels, 'success': success, 'corrected': corrected,
+               'confirmed': confirmed, 'timestamp': datetime.now().isoformat()}
+    if user_id is not None:
+        example['user_id'] = user_id
+    with open(path, 'a') as f:
+        f.write(json.dumps(example) + '\n')
+
+
+class RequestClassifier:
+    """Softmax heads over hashed n-gram features"""
+    
+    def __init__(self, heads: Dict[str, Tuple[List[str], np.ndarray, np.ndarray]],
+                 version: str = '1', n_features: int = N_FEATURES, metadata: Optional[Dict[str, Any]] = None):
+        # head -> (classes, weights (n_features, n_classes), bias (n_classes,))
+        self.heads = heads
+        self.version = version
+        self.n_features = n_features
+        self.metadata = metadata or {}
+    
+    def predict(self, request: str) -> Dict[str, Tuple[str, float]]:
+        """(label, probability) per head for one request"""
+        indices = hashed_ngrams(request, self.n_features)
+        predictions = {}
+        for head, (classes, weights, bias) in self.heads.items():
+            logits = weights[indices].sum(axis=0) + bias
+            probabilities = np.exp(logits - logits.max())
+            best = int(probabilities.argmax())
+            predictions[head] = (classes[best], float(probabilities[best] / probabilities.sum()))
+        return predictions
+    
+    def predict_proba_batch(self, requests: List[str]) -> Dict[str, np.ndarray]:
+        """Class probabilities per head, shape (len(requests), n_classes)"""
+        per_request = [hashed_ngrams(request, self.n_features) for request in requests]
+        # Every request also hits a zero padding row, so reduceat never sees an empty segment
+        indices = np.concatenate([np.append(ids, self.n_features) for ids in per_request] or [np.zeros(0, np.int64)])
+        starts = np.cumsum([0] + [len(ids) + 1 for ids in per_request[:-1]])
+        
+        probabilities = {}
+        for head, (classes, weights, bias) in self.heads.items():
+            if not requests:
+                probabilities[head] = np.zeros((0, len(classes)))
+                continue
+            padded = np.vstack([weights, np.zeros((1, len(classes)), dtype=weights.dtype)])
+            logits = np.add.reduceat(padded[indices], starts, axis=0) + bias
+            logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities[head] = logits / logits.sum(axis=1, keepdims=True)
+        return probabilities
+    
+    def save(self, path: Path):
+        """Write the model atomically (safe to swap under a running process)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        metadata = dict(self.metadata, format=MODEL_FORMAT, version=self.version, n_features=self.n_features,
+                        heads={head: classes for head, (classes, _, _) in self.heads.items()})
+        arrays = {'metadata': np.array(json.dumps(metadata))}
+        for head, (_, weights, bias) in self.heads.items():
+            arrays[f'weights/{head}'] = weights
+            arrays[f'bias/{head}'] = bias
+        
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: Path) -> 'RequestClassifier':
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data['metadata']))
+            if metadata.get('format') != MODEL_FORMAT:
+                raise ValueError(f"Unsupported classifier format {metadata.get('format')!r} in {path}")
+            heads = {head: (classes, data[f'weights/{head}'], data[f'bias/{head}'])
+                     for head, classes in metadata['heads'].items()}
+        return cls(heads, version=metadata['version'], n_features=metadata['n_features'], metadata=metadata)
+
+
+def _training_rows(examples: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Examples worth learning from: labels the user corrected or confirmed"""
+    return [example for example in examples
+            if example.get('request') and (example.get('corrected') or example.get('confirmed'))]
+
+
+def train(examples: List[Dict[str, Any]], version: str = '1', n_features: int = N_FEATURES,
+          epochs: int = 30, learning_rate: float = 0.5, l2: float = 1e-4, batch_size: int = 256,
+          seed: int = 0) -> RequestClassifier:
+    """Fit one softmax head per label name with mini-batch gradient descent"""
+    rows = _training_rows(examples)
+    if not rows:
+        raise ValueError("No usable training examples (need corrected or confirmed labels)")
+    rng = np.random.default_rng(seed)
+    features = [hashed_ngrams(row['request'], n_features) for row in rows]
+    
+    heads = {}
+    for head in sorted({head for row in rows for head in row['labels']}):
+        labelled = [i for i, row in enumerate(rows) if row['labels'].get(head)]
+        classes = sorted({rows[i]['labels'][head] for i in labelled})
+        class_index = {label: c for c, label in enumerate(classes)}
+        targets = np.array([class_index[rows[i]['labels'][head]] for i in labelled])
+        
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        for _ in range(epochs):
+            order = rng.permutation(len(labelled))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                x = np.zeros((len(batch), n_features), dtype=np.float32)
+                for r, i in enumerate(batch):
+                    np.add.at(x[r], features[labelled[i]], 1.0)
+                
+                logits = x @ weights + bias
+                logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+                error = logits / logits.sum(axis=1, keepdims=True)
+                error[np.arange(len(batch)), targets[batch]] -= 1.0
+                
+                weights -= learning_rate * (x.T @ error / len(batch) + l2 * weights)
+                bias -= learning_rate * error.mean(axis=0)
+        heads[head] = (classes, weights, bias)
+    
+    return RequestClassifier(heads, version=version, n_features=n_features,
+                             metadata={'trained_at': datetime.now().isoformat(), 'examples': len(rows)})
+
+
+def accuracy(classifier: RequestClassifier, examples: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Per-head accuracy over the usable examples"""
+    rows = _training_rows(examples)
+    scores = {}
+    for head in classifier.heads:
+        labelled = [row for row in rows if row['labels'].get(head)]
+        if labelled:
+            correct = sum(classifier.predict(row['request'])[head][0] == row['labels'][head] for row in labelled)
+            scores[head] = correct / len(labelled)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the request classifier from recorded outcomes")
+    parser.add_argument('examples', type=Path, help="JSONL examples written by record_outcome")
+    parser.add_argument('--out', type=Path, required=True, help="model file to write (.npz)")
+    parser.add_argument('--version', default=datetime.now().strftime('%Y%m%d%H%M%S'), help="model version tag")
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--holdout', type=float, default=0.2, help="fraction held out for evaluation")
+    args = parser.parse_args()
+    
+    examples = load_examples(args.examples)
+    order = np.random.default_rng(0).permutation(len(examples))
+    split = int(len(examples) * (1 - args.holdout))
+    training = [examples[i] for i in order[:split]]
+    holdout = [examples[i] for i in order[split:]]
+    
+    classifier = train(training, version=args.version, epochs=args.epochs)
+    print(f"Trained on {classifier.metadata['examples']} examples")
+    for head, score in accuracy(classifier, training).items():
+        print(f"  {head:<20} train {score:.3f}  holdout {accuracy(classifier, holdout).get(head, float('nan')):.3f}")
+    
+    sample = [example['request'] for example in examples[:200]] or ['']
+    started = time.perf_counter()
+    for request in sample:
+        classifier.predict(request)
+    print(f"Inference: {(time.perf_counter() - started) / len(sample) * 1e6:.1f} us/request")
+    
+    classifier.save(args.out)
+    print(f"Wrote {args.out} (version {classifier.version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Streaming Behavior Statistics
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Constant-time online estimators with dict snapshots
+
+Time-based behavior patterns are summarized as they arrive instead of being
+kept as raw samples and re-aggregated on every query:
+
+- `RunningStats`: Welford's online count/mean/variance over all samples
+- `EWMA`: exponentially weighted mean and variance (recent behavior)
+- `HourHistogram`: 24 hour-of-day buckets whose older observations decay
+
+Every update is O(1) and queries touch at most the 24 hour buckets; each
+estimator round-trips through a small JSON-safe dict for behavior
+snapshots.
+"""
+
+from typing import Any, Dict, List, Optional
+import math
+
+
+class RunningStats:
+    """Welford's online mean and variance"""
+    
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+    
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 until there are two samples)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RunningStats':
+        return cls(**data)
+
+
+class EWMA:
+    """Exponentially weighted moving mean and variance
+    
+    `alpha` is the weight of each new sample; 2 / (N + 1) tracks roughly the
+    last N samples.
+    """
+    
+    def __init__(self, alpha: float = 2 / 21, mean: Optional[float] = None, variance: float = 0.0):
+        self.alpha = alpha
+        self.mean = mean
+        self.variance = variance
+    
+    def update(self, value: float):
+        if self.mean is None:
+            self.mean = value
+            return
+        delta = value - self.mean
+        increment = self.alpha * delta
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + delta * increment)
+    
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'alpha': self.alpha, 'mean': self.mean, 'variance': self.variance}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EWMA':
+        return cls(**data)
+
+
+class HourHistogram:
+    """Hour-of-day activity histogram with exponential decay per observation
+    
+    Instead of scaling all 24 buckets on each update, new observations are
+    added with a weight that grows by 1 / decay; buckets are renormalized
+    only when that weight gets large.
+    """
+    
+    _RESCALE_AT = 1e12
+    
+    def __init__(self, decay: float = 0.99, buckets: Optional[List[float]] = None, weight: float = 1.0):
+        self.decay = decay
+        self.buckets = list(buckets) if buckets is not None else [0.0] * 24
+        self.weight = weight
+    
+    def update(self, hour: int, amount: float = 1.0):
+        self.buckets[hour] += amount * self.weight
+        self.weight /= self.decay
+        if self.weight > self._RESCALE_AT:
+            self.buckets = [value / self.weight for value in self.buckets]
+            self.weight = 1.0
+    
+    def value(self, hour: int) -> float:
+        """Decayed activity count for an hour, as of the latest observation"""
+        return self.buckets[hour] / (self.weight * self.decay)
+    
+    def share(self, hour: int) -> float:
+        """Fraction of decayed activity that falls in an hour"""
+        total = sum(self.buckets)
+        return self.buckets[hour] / total if total else 0.0
+    
+    def peak_hours(self, k: int = 3) -> List[int]:
+        """The k most active hours, busiest first (hours with no activity omitted)"""
+        ranked = sorted(range(24), key=lambda hour: self.buckets[hour], reverse=True)
+        return [hour for hour in ranked[:k] if self.buckets[hour] > 0]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'decay': self.decay, 'buckets': self.buckets, 'weight': self.weight}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HourHistogram':
+        return cls(**data)
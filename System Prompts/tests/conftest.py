@@ -0,0 +1,116 @@
+"""Test configuration and fixtures."""
+
+import asyncio
+import hashlib
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+# The modular system is a directory of sibling modules, not a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dynamic_modular_implementation import (  # noqa: E402
+    AdaptiveAgent, AgentType, ModuleMetadata, ModuleRegistry
+)
+
+
+class GatedModule:
+    """Module that appends its id to the prompt fragments, optionally
+    waiting on a gate (or sleeping) so a test can hold requests in flight"""
+
+    def __init__(self, module_id: str, gate: Optional[asyncio.Event] = None, delay: float = 0.0):
+        self.module_id = module_id
+        self.gate = gate
+        self.delay = delay
+        self.entered = asyncio.Event()
+        self.cleaned = False
+
+    async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        self.entered.set()
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {'prompt_fragments': [*context.get('prompt_fragments', []), self.module_id]}
+
+    def validate_input(self, context: Dict[str, Any]) -> bool:
+        return True
+
+    def validate_output(self, result: Dict[str, Any]) -> bool:
+        return True
+
+    async def cleanup(self):
+        self.cleaned = True
+
+
+class StubAgent(AdaptiveAgent):
+    """AdaptiveAgent whose modules are GatedModules, recorded in load order"""
+
+    def __init__(self, registry: ModuleRegistry, gates: Optional[Dict[str, asyncio.Event]] = None,
+                 delays: Optional[Dict[str, float]] = None, **kwargs):
+        super().__init__(registry, {'agent_type': AgentType.ORCHESTRATOR}, **kwargs)
+        self.gates = gates or {}
+        self.delays = delays or {}
+        self.loaded: List[GatedModule] = []
+
+    async def _instantiate_module(self, metadata: ModuleMetadata) -> GatedModule:
+        module = GatedModule(metadata.id, self.gates.get(metadata.id), self.delays.get(metadata.id, 0.0))
+        self.loaded.append(module)
+        return module
+
+    def instances(self, module_id: str) -> List[GatedModule]:
+        return [module for module in self.loaded if module.module_id == module_id]
+
+    async def wait_entered(self, module_id: str, timeout: float = 1.0):
+        """Wait until a request is executing the module"""
+        async def entered():
+            while not any(module.entered.is_set() for module in self.instances(module_id)):
+                await asyncio.sleep(0)
+        await asyncio.wait_for(entered(), timeout)
+
+
+async def overlapping_requests(agent: AdaptiveAgent, request: Dict[str, Any], count: int,
+                               interval: float = 0.001) -> List[Dict[str, Any]]:
+    """Start `count` requests `interval` apart, so they overlap when modules are slow"""
+    tasks = []
+    for i in range(count):
+        tasks.append(asyncio.create_task(agent.process_request(dict(request, session_id=f'overlap_{i}'))))
+        await asyncio.sleep(interval)
+    return await asyncio.gather(*tasks)
+
+
+def make_metadata(module_id: str, user_roles: List[str], orchestration_modes: Optional[List[str]] = None,
+                  **overrides) -> ModuleMetadata:
+    fields = dict(
+        id=module_id,
+        name=module_id,
+        version='1.0.0',
+        description='Test module',
+        file_path=Path(f'{module_id}.md'),
+        sha256_hash=hashlib.sha256(module_id.encode('utf-8')).hexdigest(),
+        size_bytes=100,
+        token_estimate=25,
+        supported_agent_types=[AgentType.ORCHESTRATOR],
+        required_context=[],
+        optional_context=[],
+        orchestration_modes=orchestration_modes or ['STANDARD'],
+        user_roles=user_roles,
+        effectiveness_score=0.9
+    )
+    fields.update(overrides)
+    return ModuleMetadata(**fields)
+
+
+@pytest.fixture
+def registry(tmp_path: Path) -> ModuleRegistry:
+    """A shared core module plus one module per role (NOVICE, EXPERT)"""
+    registry = ModuleRegistry(tmp_path / 'module_registry.yaml')
+    for metadata in (
+        make_metadata('core', ['NOVICE', 'EXPERT'], effectiveness_score=0.95),
+        make_metadata('novice_only', ['NOVICE']),
+        make_metadata('expert_only', ['EXPERT'])
+    ):
+        registry.modules[metadata.id] = metadata
+    return registry
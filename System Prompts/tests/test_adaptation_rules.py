@@ -0,0 +1,159 @@
+"""Windowed adaptation rules: sliding windows, hysteresis and cooldowns."""
+
+import asyncio
+
+from conftest import StubAgent
+from dynamic_modular_implementation import AdaptationRuleEngine, RequestScope
+
+
+NOVICE = {'user_role': 'NOVICE', 'orchestration_mode': 'STANDARD'}
+
+
+def slow_rule(**overrides):
+    rule = {
+        'name': 'slow',
+        'metric': 'latency_seconds',
+        'operator': '>',
+        'threshold': 10.0,
+        'adaptation': {'type': 'swap_module', 'old_module_id': 'core', 'new_module_id': 'fast_core'}
+    }
+    rule.update(overrides)
+    return rule
+
+
+def fired(engine, latency, now=0.0):
+    return len(engine.evaluate_windowed({'latency_seconds': latency}, now=now))
+
+
+def test_rule_waits_for_a_full_window():
+    engine = AdaptationRuleEngine({'rules': [slow_rule(window=3)]})
+
+    assert [fired(engine, latency) for latency in (30.0, 30.0, 30.0)] == [0, 0, 1]
+
+
+def test_rule_fires_on_the_window_mean():
+    engine = AdaptationRuleEngine({'rules': [slow_rule(window=3)]})
+
+    assert [fired(engine, latency) for latency in (12.0, 6.0, 6.0)] == [0, 0, 0]  # Mean 8
+    assert fired(engine, 12.0) == 0  # 6, 6, 12: mean 8, one slow request is noise
+    assert fired(engine, 18.0) == 1  # 6, 12, 18: mean 12
+
+
+def test_latched_rule_rearms_only_below_clear_threshold():
+    engine = AdaptationRuleEngine({'rules': [slow_rule(clear_threshold=6.0)]})
+
+    assert fired(engine, 20.0) == 1
+    assert fired(engine, 20.0) == 0  # Latched
+    assert fired(engine, 8.0) == 0  # Inside the hysteresis band: still latched
+    assert fired(engine, 20.0) == 0
+    assert fired(engine, 5.0) == 0  # Crosses back below 6.0: re-armed
+    assert fired(engine, 20.0) == 1
+    assert engine.rule_states[0].fired == 2
+
+
+def test_cooldown_suppresses_refiring():
+    engine = AdaptationRuleEngine({'rules': [slow_rule(cooldown_seconds=60.0)]})
+
+    assert fired(engine, 20.0, now=0.0) == 1
+    assert fired(engine, 20.0, now=30.0) == 0
+    assert engine.rule_states[0].suppressed == 1
+    assert fired(engine, 20.0, now=61.0) == 1
+
+
+def test_missing_metric_is_not_an_observation():
+    engine = AdaptationRuleEngine({'rules': [slow_rule(window=2)]})
+
+    assert fired(engine, 20.0) == 0
+    assert engine.evaluate_windowed({'latency_seconds': None}) == []
+    assert len(engine.rule_states[0].window) == 1
+    assert fired(engine, 20.0) == 1
+
+
+def test_swaps_beyond_the_rate_limit_are_not_applied(registry):
+    async def scenario():
+        agent = StubAgent(registry, adaptation_config={'max_swaps_per_minute': 1})
+        await agent.process_request({'user_role': 'NOVICE', 'orchestration_mode': 'STANDARD'})
+        scope = RequestScope(request_id=0, context={})
+        first = await agent._apply_adaptation(
+            {'type': 'swap_module', 'old_module_id': 'core', 'new_module_id': 'expert_only'}, scope)
+        second = await agent._apply_adaptation(
+            {'type': 'swap_module', 'old_module_id': 'novice_only', 'new_module_id': 'core'}, scope)
+        repeated = await agent._apply_adaptation(
+            {'type': 'swap_module', 'old_module_id': 'core', 'new_module_id': 'expert_only'}, scope)
+        await agent.drain()
+        return agent, (first, second, repeated)
+
+    agent, outcomes = asyncio.run(scenario())
+
+    assert outcomes == ('applied', 'rate_limited', 'skipped')
+    assert agent.adaptation_stats['swaps'] == 1
+    assert agent.adaptation_stats['swaps_rate_limited'] == 1
+    assert agent.adaptation_stats['swaps_skipped'] == 1
+
+
+def slow_escalation(**overrides):
+    return slow_rule(name='slow_escalation',
+                     adaptation={'type': 'escalate_mode', 'new_mode': 'CRITICAL', 'reason': 'slow'}, **overrides)
+
+
+def test_escalation_windows_are_kept_per_session():
+    engine = AdaptationRuleEngine({'rules': [slow_escalation(window=2), slow_rule(name='swap', window=2, clear_threshold=6.0)]})
+
+    def fired_names(session_id):
+        return [adaptation['type'] for adaptation in
+                engine.evaluate_windowed({'latency_seconds': 30.0}, now=0.0, session_id=session_id)]
+
+    assert fired_names('a') == []
+    # The module-set rule sees both sessions' traffic; the escalation only b's first request
+    assert fired_names('b') == ['swap_module']
+    assert fired_names('a') == ['escalate_mode']
+    assert fired_names('b') == ['escalate_mode']
+    assert engine.rule_report()['slow_escalation'] == {'fired': 2, 'suppressed': 0, 'latched': 0}
+
+
+def test_session_rule_state_is_bounded():
+    engine = AdaptationRuleEngine({'rules': [slow_escalation(window=2)]}, max_sessions=2)
+
+    for session_id in ('a', 'b', 'c'):
+        engine.evaluate_windowed({'latency_seconds': 30.0}, now=0.0, session_id=session_id)
+
+    assert list(engine.session_states) == ['b', 'c']
+
+
+def test_escalation_applies_only_to_the_slow_session(registry):
+    rules = [slow_escalation(threshold=0.0, window=2, operator='>=')]
+
+    async def scenario():
+        agent = StubAgent(registry, adaptation_config={'rules': rules})
+        await agent.process_request({**NOVICE, 'session_id': 'a'})
+        await agent.process_request({**NOVICE, 'session_id': 'b'})
+        await agent.process_request({**NOVICE, 'session_id': 'a'})
+        await agent.drain()
+        return agent
+
+    agent = asyncio.run(scenario())
+
+    assert agent.session_overlays['a'] == {'orchestration_mode': 'CRITICAL'}
+    assert 'b' not in agent.session_overlays
+
+
+def test_replay_matches_live_windowed_evaluation():
+    rules = [slow_rule(window=3, clear_threshold=6.0, cooldown_seconds=5.0), slow_escalation(window=2)]
+    latencies = [12.0, 14.0, 15.0, 20.0, 4.0, 2.0, 1.0, 30.0, 30.0, 30.0, None, 30.0, 30.0]
+    sessions = ['a', 'b'] * 6 + ['a']
+
+    live = AdaptationRuleEngine({'rules': rules})
+    live_counts = {'slow': 0, 'slow_escalation': 0}
+    for now, (latency, session_id) in enumerate(zip(latencies, sessions)):
+        for adaptation in live.evaluate_windowed({'latency_seconds': latency}, now=float(now), session_id=session_id):
+            live_counts['slow_escalation' if adaptation['type'] == 'escalate_mode' else 'slow'] += 1
+
+    engine = AdaptationRuleEngine({'rules': rules})
+    columns = engine.to_columns([{'latency_seconds': latency} for latency in latencies], fill_defaults=False)
+
+    assert engine.replay(columns, session_ids=sessions) == live_counts
+    assert live_counts['slow'] > 0 and live_counts['slow_escalation'] > 0
+    # The raw scan compares each request on its own
+    assert engine.evaluate_batch(columns)[:, 0].sum() > live_counts['slow']
+    # Replay leaves the engine's live state untouched
+    assert engine.rule_report()['slow']['fired'] == 0 and not engine.session_states
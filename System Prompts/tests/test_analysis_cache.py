@@ -0,0 +1,64 @@
+"""Memoized request analysis: normalized keys, LRU bound and invalidation."""
+
+from collections import OrderedDict
+
+import pytest
+
+from personal_ai_architect import ContextualIntelligence, ProjectComplexity
+from request_classifier import train
+
+
+@pytest.fixture
+def intelligence(tmp_path, monkeypatch):
+    """A single-user instance with an empty shared cache and no classifier"""
+    monkeypatch.chdir(tmp_path)  # The behavior log lives under ./data
+    monkeypatch.setattr(ContextualIntelligence, '_analysis_cache', OrderedDict())
+    monkeypatch.setattr(ContextualIntelligence, '_analysis_cache_stats', {"hits": 0, "misses": 0, "evictions": 0})
+    monkeypatch.setattr(ContextualIntelligence, '_classifier', None)
+    monkeypatch.setattr(ContextualIntelligence, '_classifier_checked', True)
+    instance = ContextualIntelligence()
+    yield instance
+    instance.close()
+
+
+def test_normalized_repeats_hit_the_cache(intelligence):
+    first = intelligence.analyze_text("Build a simple  todo agent")
+    again = intelligence.analyze_text("  build A SIMPLE todo\tagent ")
+
+    assert again is first
+    info = ContextualIntelligence.analysis_cache_info()
+    assert (info['hits'], info['misses'], info['size']) == (1, 1, 1)
+    assert info['hit_rate'] == 0.5
+
+
+def test_cache_hits_still_record_the_session(intelligence):
+    intelligence.analyze_request("Build a simple todo agent", {})
+    seq = intelligence.behavior_store.seq
+    intelligence.analyze_request("build a simple todo agent", {})
+
+    assert ContextualIntelligence.analysis_cache_info()['hits'] == 1
+    assert intelligence.behavior_store.seq == seq + 1
+
+
+def test_least_recently_used_analysis_is_evicted(intelligence, monkeypatch):
+    monkeypatch.setattr(ContextualIntelligence, 'ANALYSIS_CACHE_SIZE', 2)
+
+    for request in ("first request", "second request", "first request", "third request", "second request"):
+        intelligence.analyze_text(request)
+
+    # "second" was least recently used when "third" arrived, so it misses again
+    info = ContextualIntelligence.analysis_cache_info()
+    assert (info['hits'], info['misses'], info['evictions'], info['size']) == (1, 4, 2, 2)
+
+
+def test_swapping_the_classifier_invalidates_cached_analyses(intelligence):
+    request = "Build a simple todo agent"
+    assert intelligence.analyze_text(request).complexity == ProjectComplexity.SIMPLE
+
+    classifier = train([{'request': request, 'labels': {'project_complexity': 'cutting_edge'}, 'confirmed': True},
+                        {'request': "a basic faq bot", 'labels': {'project_complexity': 'simple'}, 'confirmed': True}],
+                       n_features=1 << 8, epochs=50)
+    ContextualIntelligence.use_classifier(classifier)  # The fixture restores the shared classifier
+
+    assert ContextualIntelligence.analysis_cache_info()['size'] == 0
+    assert intelligence.analyze_text(request).complexity == ProjectComplexity.CUTTING_EDGE
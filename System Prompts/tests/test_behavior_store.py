@@ -0,0 +1,114 @@
+"""Event log recovery in the behavior store."""
+
+import json
+import zlib
+
+from behavior_store import BehaviorStore
+
+
+def record(seq, event):
+    payload = json.dumps(event, sort_keys=True)
+    return json.dumps({'seq': seq, 'crc': zlib.crc32(payload.encode('utf-8')), 'event': payload})
+
+
+def write_events(path, count):
+    store = BehaviorStore(path)
+    store.load()
+    for i in range(count):
+        store.append({'n': i})
+    store.close()
+    return store.log_path
+
+
+def reload(path):
+    store = BehaviorStore(path)
+    state, events = store.load()
+    return store, state, events
+
+
+def test_torn_final_line_is_discarded_and_truncated(tmp_path):
+    log_path = write_events(tmp_path, 3)
+    intact_size = log_path.stat().st_size
+    with open(log_path, 'ab') as f:
+        f.write(record(4, {'n': 3}).encode('utf-8')[:20])
+
+    store, state, events = reload(tmp_path)
+
+    assert state is None
+    assert events == [{'n': 0}, {'n': 1}, {'n': 2}]
+    assert store.stats['discarded_lines'] == 1
+    assert log_path.stat().st_size == intact_size
+
+
+def test_appends_after_recovery_continue_the_sequence(tmp_path):
+    log_path = write_events(tmp_path, 3)
+    with open(log_path, 'ab') as f:
+        f.write(b'{"seq": 4, "crc"')
+
+    store, _, _ = reload(tmp_path)
+    assert store.append({'n': 'after'}) == 4
+    store.close()
+
+    store, _, events = reload(tmp_path)
+    assert events == [{'n': 0}, {'n': 1}, {'n': 2}, {'n': 'after'}]
+    assert store.stats['discarded_lines'] == 0
+
+
+def test_unterminated_final_record_is_treated_as_torn(tmp_path):
+    log_path = write_events(tmp_path, 2)
+    with open(log_path, 'ab') as f:
+        f.write(record(3, {'n': 2}).encode('utf-8'))  # Newline never made it to disk
+
+    store, _, events = reload(tmp_path)
+    assert events == [{'n': 0}, {'n': 1}]
+    assert store.append({'n': 'next'}) == 3
+    store.close()
+
+    _, _, events = reload(tmp_path)
+    assert events == [{'n': 0}, {'n': 1}, {'n': 'next'}]
+
+
+def test_everything_after_a_corrupt_record_is_discarded(tmp_path):
+    log_path = write_events(tmp_path, 4)
+    lines = log_path.read_bytes().splitlines(keepends=True)
+    lines[1] = lines[1].replace(b'"crc": ', b'"crc": 1')
+    log_path.write_bytes(b''.join(lines))
+
+    store, _, events = reload(tmp_path)
+
+    assert events == [{'n': 0}]
+    assert store.stats['discarded_lines'] == 3
+    assert log_path.read_bytes() == lines[0]
+
+
+def test_snapshot_plus_later_events_survive_a_torn_tail(tmp_path):
+    store = BehaviorStore(tmp_path)
+    store.load()
+    store.append({'n': 0})
+    store.write_snapshot({'count': 1})
+    store.append({'n': 1})
+    store.close()
+    with open(store.log_path, 'ab') as f:
+        f.write(b'garbage')
+
+    store, state, events = reload(tmp_path)
+
+    assert state == {'count': 1}
+    assert events == [{'n': 1}]
+    assert store.seq == 2
+
+
+def test_architect_close_syncs_the_single_user_log(tmp_path, monkeypatch):
+    from personal_ai_architect import PersonalAIArchitect
+
+    monkeypatch.chdir(tmp_path)
+    architect = PersonalAIArchitect()
+    architect.process_request("Build a simple todo agent")
+    store = architect.intelligence.behavior_store
+    assert store.seq > 0
+    architect.close()
+
+    assert store._log is None and store._unsynced == 0
+    reopened, _, events = reload(tmp_path / 'data' / 'behavior')
+    assert reopened.seq == store.seq
+    assert len(events) == store.events_since_snapshot
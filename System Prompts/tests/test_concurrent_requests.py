@@ -0,0 +1,92 @@
+"""Concurrent requests against one AdaptiveAgent and its pinned module sets."""
+
+import asyncio
+
+from conftest import StubAgent, overlapping_requests
+
+
+NOVICE = {'user_role': 'NOVICE', 'orchestration_mode': 'STANDARD'}
+EXPERT = {'user_role': 'EXPERT', 'orchestration_mode': 'STANDARD'}
+
+
+def test_concurrent_requests_keep_each_others_modules(registry):
+    async def scenario():
+        gates = {'novice_only': asyncio.Event(), 'expert_only': asyncio.Event()}
+        agent = StubAgent(registry, gates)
+
+        novice = asyncio.create_task(agent.process_request(dict(NOVICE, session_id='a')))
+        await agent.wait_entered('novice_only')
+        expert = asyncio.create_task(agent.process_request(dict(EXPERT, session_id='b')))
+        await agent.wait_entered('expert_only')
+
+        # The expert request's selection must not evict the novice's pinned module
+        active = set(agent.active_modules)
+        for gate in gates.values():
+            gate.set()
+        results = await asyncio.gather(novice, expert)
+        await agent.drain()
+        return agent, active, results
+
+    agent, active, (novice, expert) = asyncio.run(scenario())
+
+    assert active == {'core', 'novice_only', 'expert_only'}
+    assert sorted(novice['prompt_fragments']) == ['core', 'novice_only']
+    assert sorted(expert['prompt_fragments']) == ['core', 'expert_only']
+    assert sorted(module.module_id for module in agent.loaded) == ['core', 'expert_only', 'novice_only']
+    assert not any(module.cleaned for module in agent.loaded)
+
+
+def test_many_concurrent_requests_load_each_module_once(registry):
+    async def scenario():
+        agent = StubAgent(registry)
+        requests = [dict(NOVICE if i % 2 else EXPERT, session_id=f's{i}') for i in range(32)]
+        results = await asyncio.gather(*(agent.process_request(request) for request in requests))
+        await agent.drain()
+        return agent, results
+
+    agent, results = asyncio.run(scenario())
+
+    assert all('core' in result['prompt_fragments'] for result in results)
+    assert len(agent.instances('core')) == 1
+    assert not any(module.cleaned for module in agent.instances('core'))
+
+
+def test_idle_modules_are_retired_and_cleaned_up(registry):
+    async def scenario():
+        agent = StubAgent(registry)
+        await agent.process_request(NOVICE)
+        await agent.process_request(EXPERT)
+        await agent.drain()
+        return agent
+
+    agent = asyncio.run(scenario())
+
+    assert set(agent.active_modules) == {'core', 'expert_only'}
+    assert [module.cleaned for module in agent.instances('novice_only')] == [True]
+    assert not agent._draining
+
+
+def test_unselected_module_retires_under_sustained_overlapping_load(registry):
+    async def scenario():
+        agent = StubAgent(registry, delays={'novice_only': 0.005})
+        await agent.process_request(EXPERT)
+
+        # NOVICE traffic never stops: some request is always in flight
+        observed = {}
+
+        async def watch():
+            while not agent.instances('expert_only')[0].cleaned:
+                await asyncio.sleep(0.001)
+            observed['in_flight'] = agent._in_flight_count
+
+        watcher = asyncio.create_task(watch())
+        await overlapping_requests(agent, NOVICE, 100)
+        await asyncio.wait_for(watcher, 1.0)
+        await agent.drain()
+        return agent, observed
+
+    agent, observed = asyncio.run(scenario())
+
+    assert observed['in_flight'] > 0
+    assert 'expert_only' not in agent.active_modules
+    assert len(agent.instances('core')) == 1
@@ -0,0 +1,106 @@
+"""Versioned hot-swaps: retired modules drain before cleanup."""
+
+import asyncio
+
+from conftest import GatedModule, StubAgent, make_metadata, overlapping_requests
+from dynamic_modular_implementation import RequestScope
+
+
+NOVICE = {'user_role': 'NOVICE', 'orchestration_mode': 'STANDARD'}
+SWAP = {'type': 'swap_module', 'old_module_id': 'core', 'new_module_id': 'fast_core'}
+
+
+def test_swapped_module_drains_before_cleanup(registry):
+    # Only reachable through the swap, never selected for STANDARD requests
+    registry.modules['fast_core'] = make_metadata('fast_core', ['NOVICE'], ['EXPLORATORY'])
+
+    async def scenario():
+        gates = {'novice_only': asyncio.Event()}
+        agent = StubAgent(registry, gates)
+        request = asyncio.create_task(agent.process_request(NOVICE))
+        await agent.wait_entered('novice_only')
+
+        version = agent.module_set_version
+        outcome = await agent._apply_adaptation(SWAP, RequestScope(request_id=0, context={}))
+        old_core = agent.instances('core')[0]
+        during = {
+            'outcome': outcome,
+            'version_bumped': agent.module_set_version > version,
+            'active': set(agent.active_modules),
+            'cleaned': old_core.cleaned,
+            'draining': [handle.module_id for handle in agent._draining]
+        }
+
+        gates['novice_only'].set()
+        result = await request
+        await agent.drain()
+        return agent, old_core, during, result
+
+    agent, old_core, during, result = asyncio.run(scenario())
+
+    assert during['outcome'] == 'applied'
+    assert during['version_bumped']
+    assert during['active'] == {'fast_core', 'novice_only'}
+    # The in-flight request still holds the old version: retired, not cleaned
+    assert not during['cleaned']
+    assert during['draining'] == ['core']
+    # ...and finished against the module set it pinned
+    assert sorted(result['prompt_fragments']) == ['core', 'novice_only']
+
+    assert old_core.cleaned
+    assert not agent._draining
+    assert not any(module.cleaned for module in agent.instances('fast_core'))
+
+
+def test_swapped_module_is_cleaned_up_while_traffic_continues(registry):
+    registry.modules['fast_core'] = make_metadata('fast_core', ['NOVICE'], ['EXPLORATORY'])
+
+    async def scenario():
+        agent = StubAgent(registry, delays={'novice_only': 0.005})
+        observed = {}
+
+        async def swap_then_watch():
+            await agent.wait_entered('core')
+            await agent._apply_adaptation(SWAP, RequestScope(request_id=0, context={}))
+            old_core = agent.instances('core')[0]
+            while not old_core.cleaned:
+                await asyncio.sleep(0.001)
+            observed['in_flight'] = agent._in_flight_count
+
+        watcher = asyncio.create_task(swap_then_watch())
+        results = await overlapping_requests(agent, NOVICE, 100)
+        await asyncio.wait_for(watcher, 1.0)
+        await agent.drain()
+        return agent, observed, results
+
+    agent, observed, results = asyncio.run(scenario())
+
+    # The retired core drained while later requests were still running
+    assert observed['in_flight'] > 0
+    assert all('core' in result['prompt_fragments'] for result in results)
+    # Later requests selected core again and got a fresh instance
+    assert [module.cleaned for module in agent.instances('core')] == [True, False]
+
+
+def test_failed_cleanup_is_surfaced(registry, capsys):
+    class FailingCleanup(GatedModule):
+        async def cleanup(self):
+            raise RuntimeError("cleanup exploded")
+
+    class Agent(StubAgent):
+        async def _instantiate_module(self, metadata):
+            module = FailingCleanup(metadata.id)
+            self.loaded.append(module)
+            return module
+
+    async def scenario():
+        agent = Agent(registry)
+        await agent.process_request(NOVICE)
+        await agent.process_request({'user_role': 'EXPERT', 'orchestration_mode': 'STANDARD'})
+        await agent.drain()
+        return agent
+
+    agent = asyncio.run(scenario())
+
+    assert not agent._draining
+    assert "cleanup exploded" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+"""Single-pass keyword matching with word boundaries."""
+
+import pytest
+
+from keyword_matcher import KeywordMatcher
+
+
+MATCHER = KeywordMatcher({
+    'novel': ['new', 'novel', 'from scratch'],
+    'pattern': ['pattern*'],
+    'security': ['auth*', 'pii', 'multi-agent'],
+    'complex': ['multi-agent', 'distributed']
+})
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("A new agent", {'novel'}),
+    ("Renewal of the knew contract", set()),  # `new` only as a whole word
+    ("Newer models", set()),
+    ("Use the patterns we know", {'pattern'}),  # Trailing `*` matches a prefix
+    ("Antipattern detection", set()),  # ...but still starts at a word boundary
+    ("Add OAuth", set()),
+    ("Authentication and authorization", {'security'}),
+    ("Strip PII, then log", {'security'}),
+    ("A multi-agent, distributed system", {'security', 'complex'}),  # One keyword, two labels
+    ("Built from scratch", {'novel'}),
+    ("Built from scratchpads", set()),
+    ("NEW_feature", set()),  # Underscore is a word character
+    ("", set()),
+])
+def test_scan_respects_word_boundaries(text, expected):
+    assert MATCHER.scan(text) == expected
+
+
+def test_overlapping_keywords_are_all_reported():
+    matcher = KeywordMatcher({'short': ['data'], 'long': ['data pipeline*'], 'inner': ['pipeline']})
+
+    matches = sorted((start, end, labels) for start, end, labels in matcher.iter_matches("Data pipelines"))
+
+    # A prefix match spans the keyword, not the rest of the word
+    assert matches == [(0, 4, ('short',)), (0, 13, ('long',))]
+    assert matcher.scan("a data pipeline") == {'short', 'long', 'inner'}
+
+
+def test_keywords_are_normalized():
+    matcher = KeywordMatcher({'a': ['  Secure ', '*', ''], 'b': ['secure']})
+
+    assert matcher.scan("SECURE defaults") == {'a', 'b'}
+    assert matcher.labels == ['a', 'b']
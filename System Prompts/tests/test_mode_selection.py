@@ -0,0 +1,188 @@
+"""Condition parser and priority-ordered mode selection."""
+
+import asyncio
+
+import pytest
+
+from conftest import GatedModule
+from dynamic_modular_implementation import AgentType, ModuleStatus, ProductionOrchestratorAgent
+from mode_selection import ConditionSyntaxError, ModeSelector, compile_condition
+from prompt_management import LocalPromptManager
+
+
+class Settings:
+    level = 'high'
+    _secret = 'hidden'
+
+
+@pytest.mark.parametrize('source, context, expected', [
+    # `not` binds tighter than `and`, which binds tighter than `or`
+    ("not a or b and c", {'a': True, 'b': True, 'c': False}, False),
+    ("not a or b and c", {'a': True, 'b': True, 'c': True}, True),
+    ("not a or b and c", {'a': False, 'b': False, 'c': False}, True),
+    ("a or b and c", {'a': True, 'b': False, 'c': False}, True),
+    ("(a or b) and c", {'a': True, 'b': False, 'c': False}, False),
+    ("not a == 1", {'a': 2}, True),
+    # Comparisons, membership and literals
+    ("x.y >= 0.6", {'x': {'y': 0.7}}, True),
+    ("x.y < 0.6", {'x': {}}, False),  # Missing names are None; ordering against None is False
+    ("x.y == none", {}, True),
+    ("mode not in ['A', 'B']", {'mode': 'C'}, True),
+    ("'test_failed' in past", {'past': ['test_failed']}, True),
+    ("x in n", {'x': 1, 'n': 5}, False),  # Not a container: False, like ordering
+    ("x not in n", {'x': 1, 'n': 5}, False),
+    ("flag == true", {'flag': True}, True),
+    ("settings.level == 'high'", {'settings': Settings()}, True),
+    # Quantifiers
+    ("any(f in past for f in ['test_failed', 'security_issue'])", {'past': ['security_issue']}, True),
+    ("any(f in past for f in ['test_failed', 'security_issue'])", {'past': ['ok']}, False),
+    ("all(n > 1 for n in values)", {'values': [2, 3]}, True),
+    ("all(n > 1 for n in values)", {'values': [2, 1]}, False),
+    ("default_case", {}, True),
+])
+def test_condition_semantics(source, context, expected):
+    assert compile_condition(source)(context) is expected
+
+
+@pytest.mark.parametrize('source', [
+    "settings._secret == 'hidden'",
+    "task_context.__class__",
+    "__import__",
+    "_private",
+    "any(x for _x in items)",
+    "a.__dict__.b",
+])
+def test_private_names_are_rejected_at_compile_time(source):
+    with pytest.raises(ConditionSyntaxError):
+        compile_condition(source)
+
+
+@pytest.mark.parametrize('source', [
+    "user_request contains experimental keywords",
+    "proven framework with documented patterns",
+    "a ==",
+    "(a or b",
+    "a; b",
+])
+def test_unsupported_conditions_do_not_compile(source):
+    with pytest.raises(ConditionSyntaxError):
+        compile_condition(source)
+
+
+def test_selector_skips_unsupported_rules_and_triggers():
+    selector = ModeSelector({
+        'mode_selection': {'priority_rules': [
+            {'condition': "production deployment context", 'mode': 'CRITICAL'},
+            {'condition': "task_context.__class__", 'mode': 'CRITICAL'},
+            {'condition': "task_context.complexity == 'novel'", 'mode': 'EXPLORATORY', 'reason': 'novel'},
+        ]},
+        'orchestration_modes': {
+            'EXPLORATORY': {'triggers': ["task_context.complexity == 'novel'", "unfamiliar territory"]}
+        }
+    })
+
+    assert [where for where, _, _ in selector.unsupported] == [
+        'priority_rules:CRITICAL', 'priority_rules:CRITICAL', 'EXPLORATORY.triggers'
+    ]
+    assert selector.select({'task_context': {'complexity': 'novel'}}) == ('EXPLORATORY', 'novel')
+    assert selector.select({}) == ('STANDARD', 'No priority rule matched')
+    assert selector.triggered_modes({'task_context': {'complexity': 'novel'}}) == ['EXPLORATORY']
+
+
+def test_shipped_priority_rules_compile_and_take_priority_in_order():
+    selector = ModeSelector.from_file()
+
+    assert not [where for where, _, _ in selector.unsupported if where.startswith('priority_rules')]
+    assert selector.select({'past_outcomes': ['test_failed'],
+                            'task_context': {'security_sensitive': True}})[0] == 'RECOVERY'
+    assert selector.select({'task_context': {'security_sensitive': True, 'complexity': 'novel'}})[0] == 'CRITICAL'
+    assert selector.select({'task_context': {'complexity': 'novel'}})[0] == 'EXPLORATORY'
+    assert selector.select({'task_context': {'pattern_confidence': 0.5}})[0] == 'EXPLORATORY'
+    assert selector.select({'task_context': {'complexity': 'simple'}})[0] == 'STANDARD'
+
+
+def test_orchestrate_build_fills_the_selection_context(registry, tmp_path):
+    class Orchestrator(ProductionOrchestratorAgent):
+        async def _instantiate_module(self, metadata):
+            return GatedModule(metadata.id)
+
+    async def scenario():
+        agent = Orchestrator(registry, LocalPromptManager(tmp_path / 'prompts'),
+                             {'agent_type': AgentType.ORCHESTRATOR}, ModeSelector.from_file())
+        results = [
+            await agent.orchestrate_build("Build a simple todo agent", {'session_id': 's'}),
+            await agent.orchestrate_build("Prototype a novel research agent", {'session_id': 's'}),
+            await agent.orchestrate_build("Add password auth to the support agent", {'session_id': 's'}),
+            await agent.orchestrate_build("Build a simple todo agent",
+                                          {'session_id': 's', 'task_context': {'security_sensitive': True}})
+        ]
+        agent.record_outcome('s', 'test_failed')
+        results.append(await agent.orchestrate_build("Build a simple todo agent", {'session_id': 's'}))
+        await agent.close()
+        return results
+
+    simple, novel, sensitive, overridden, recovering = asyncio.run(scenario())
+
+    assert simple['task_context'] == {'complexity': 'simple', 'security_sensitive': False,
+                                      'quality_requirement': 'standard'}
+    assert simple['orchestration_mode'] == 'STANDARD'
+    assert novel['orchestration_mode'] == 'EXPLORATORY'
+    assert sensitive['orchestration_mode'] == 'CRITICAL'
+    assert sensitive['past_outcomes'] == ['success', 'success']
+    assert overridden['orchestration_mode'] == 'CRITICAL'
+    assert recovering['orchestration_mode'] == 'RECOVERY'
+
+
+class FailingModule(GatedModule):
+    async def process(self, context):
+        raise RuntimeError("build broke")
+
+
+def make_orchestrator(registry, tmp_path, failing=()):
+    class Orchestrator(ProductionOrchestratorAgent):
+        async def _instantiate_module(self, metadata):
+            return FailingModule(metadata.id) if metadata.id in failing else GatedModule(metadata.id)
+
+    return Orchestrator(registry, LocalPromptManager(tmp_path / 'prompts'),
+                        {'agent_type': AgentType.ORCHESTRATOR}, ModeSelector.from_file())
+
+
+def test_failed_build_selects_recovery_next_time(registry, tmp_path):
+    registry.modules['novice_only'].status = ModuleStatus.CRITICAL  # Its failure fails the build
+
+    async def scenario():
+        agent = make_orchestrator(registry, tmp_path, failing={'novice_only'})
+        with pytest.raises(RuntimeError):
+            await agent.orchestrate_build("Build a simple todo agent", {'session_id': 's'})
+        escalated = await agent.orchestrate_build("Build a simple todo agent", {'session_id': 's'})
+        # The recorded outcome alone is enough for the priority rules
+        agent.session_overlays.clear()
+        from_outcomes = await agent.orchestrate_build("Build a simple todo agent", {'session_id': 's'})
+        await agent.close()
+        return escalated, from_outcomes
+
+    escalated, from_outcomes = asyncio.run(scenario())
+
+    assert escalated['past_outcomes'] == ['build_failed']
+    assert escalated['orchestration_mode'] == 'RECOVERY'
+    assert escalated['orchestration_mode_reason'] == 'Escalated by adaptation'
+    assert from_outcomes['orchestration_mode'] == 'RECOVERY'
+    assert from_outcomes['orchestration_mode_reason'] == 'Previous failures detected, need recovery mode'
+
+
+def test_session_escalation_wins_over_the_priority_rules(registry, tmp_path):
+    async def scenario():
+        agent = make_orchestrator(registry, tmp_path)
+        agent.session_overlays['s'] = {'orchestration_mode': 'CRITICAL'}
+        escalated = await agent.orchestrate_build("Build a simple todo agent", {'session_id': 's'})
+        other = await agent.orchestrate_build("Build a simple todo agent", {'session_id': 't'})
+        requested = await agent.orchestrate_build("Build a simple todo agent",
+                                                  {'session_id': 's', 'orchestration_mode': 'STANDARD'})
+        await agent.close()
+        return escalated, other, requested
+
+    escalated, other, requested = asyncio.run(scenario())
+
+    assert escalated['orchestration_mode'] == 'CRITICAL'
+    assert other['orchestration_mode'] == 'STANDARD'
+    assert requested['orchestration_mode'] == 'STANDARD'
@@ -0,0 +1,66 @@
+"""Predictive preloading: warm modules are claimed, discarded or cleaned up."""
+
+import asyncio
+
+from conftest import StubAgent
+
+
+NOVICE = {'user_role': 'NOVICE', 'orchestration_mode': 'STANDARD', 'session_id': 's'}
+EXPERT = {'user_role': 'EXPERT', 'orchestration_mode': 'STANDARD', 'session_id': 's'}
+
+
+async def warm_novice_only(agent):
+    """Alternate roles until the predictor prefetches novice_only after an EXPERT request"""
+    for request in (NOVICE, EXPERT, NOVICE, EXPERT):
+        await agent.process_request(request)
+    await agent._prefetch_task
+    return agent._warm_modules['novice_only'][1]
+
+
+def test_warm_module_is_claimed_by_the_next_request(registry):
+    async def scenario():
+        agent = StubAgent(registry, predictive_loading=True)
+        warm = await warm_novice_only(agent)
+        await agent.process_request(NOVICE)
+        active = agent.active_modules['novice_only']
+        await agent.drain()
+        return agent, warm, active
+
+    agent, warm, active = asyncio.run(scenario())
+
+    assert active is warm
+    assert agent.predictor.stats.warm_hits == 1
+
+
+def test_hash_mismatched_warm_module_is_cleaned_up(registry):
+    async def scenario():
+        agent = StubAgent(registry, predictive_loading=True)
+        warm = await warm_novice_only(agent)
+        registry.modules['novice_only'].sha256_hash = 'changed on disk'
+        await agent.process_request(NOVICE)
+        active = agent.active_modules['novice_only']
+        await agent.drain()
+        return agent, warm, active
+
+    agent, warm, active = asyncio.run(scenario())
+
+    assert active is not warm
+    assert warm.cleaned
+    assert agent.predictor.stats.wasted_loads == 1
+    assert not agent._draining
+
+
+def test_drain_cleans_up_the_warm_pool(registry):
+    async def scenario():
+        agent = StubAgent(registry, predictive_loading=True)
+        warm = await warm_novice_only(agent)
+        await agent.drain()
+        return agent, warm
+
+    agent, warm = asyncio.run(scenario())
+
+    assert warm.cleaned
+    assert not agent._warm_modules
+    assert not agent._draining
+    # The published set is not part of the warm pool
+    assert not agent.active_modules['expert_only'].cleaned
@@ -0,0 +1,74 @@
+"""Content-addressed local prompt store: versions, latest pointer and cache."""
+
+import asyncio
+
+import pytest
+
+from prompt_management import LocalPromptManager
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    prompts = LocalPromptManager(tmp_path)
+    prompts.put_prompt('greeting', 'Hello', version='v1')
+    prompts.put_prompt('greeting', 'Hello', version='v2')
+    prompts.put_prompt('farewell', 'Hello', version='v1')
+
+    objects = [path for path in prompts.objects_path.rglob('*') if path.is_file()]
+    assert len(objects) == 1
+    assert prompts.resolve('greeting', 'v1') == prompts.resolve('farewell', 'v1') == objects[0].name
+
+
+def test_latest_follows_make_latest(tmp_path):
+    prompts = LocalPromptManager(tmp_path)
+    assert prompts.put_prompt('greeting', 'Hello v1') == 'v1'
+    prompts.put_prompt('greeting', 'Hello draft', make_latest=False)
+    assert prompts.read_prompt('greeting') == 'Hello v1'
+    assert prompts.read_prompt('greeting', 'v2') == 'Hello draft'
+
+    prompts.put_prompt('greeting', 'Hello v3', make_latest=True)
+    assert asyncio.run(prompts.get_prompt_version('greeting')) == 'Hello v3'
+    assert asyncio.run(prompts.list_versions('greeting')) == ['v1', 'v2', 'v3']
+
+
+def test_other_managers_serve_the_new_latest(tmp_path):
+    reader = LocalPromptManager(tmp_path, index_check_interval=0.0)
+    writer = LocalPromptManager(tmp_path)
+    writer.put_prompt('greeting', 'Hello v1')
+    assert reader.read_prompt('greeting') == 'Hello v1'
+
+    writer.put_prompt('greeting', 'Hello v2', make_latest=True)
+    assert reader.read_prompt('greeting') == 'Hello v2'
+    assert reader.stats['index_reloads'] >= 2
+
+
+def test_reads_are_served_from_a_bounded_lru(tmp_path):
+    prompts = LocalPromptManager(tmp_path, cache_size=2)
+    for name in ('a', 'b', 'c'):
+        prompts.put_prompt(name, f'Prompt {name}')
+
+    for name in ('a', 'b', 'a', 'c', 'a', 'b'):
+        prompts.read_prompt(name)
+
+    # a, b miss; a hits; c misses and evicts b; a hits; b misses again
+    assert prompts.stats['cache_hits'] == 2
+    assert prompts.stats['cache_misses'] == 4
+    assert len(prompts.cache) == 2
+
+
+def test_corrupt_object_is_rejected(tmp_path):
+    LocalPromptManager(tmp_path).put_prompt('greeting', 'Hello')
+    prompts = LocalPromptManager(tmp_path)  # Cold cache: the read goes to disk
+    prompts._object_path(prompts.resolve('greeting')).write_text('Tampered')
+
+    with pytest.raises(ValueError):
+        prompts.read_prompt('greeting')
+
+
+def test_unknown_prompts_and_versions(tmp_path):
+    prompts = LocalPromptManager(tmp_path)
+    prompts.put_prompt('greeting', 'Hello')
+
+    with pytest.raises(KeyError):
+        prompts.read_prompt('missing')
+    with pytest.raises(KeyError):
+        prompts.read_prompt('greeting', 'v9')
@@ -0,0 +1,123 @@
+"""A/B experiments over managed prompt versions."""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from conftest import GatedModule, make_metadata
+from dynamic_modular_implementation import AgentType, ManagedModularAgent
+from module_loader import PromptVariantsModule
+from prompt_management import LocalPromptManager
+
+
+NOVICE = {'user_role': 'NOVICE', 'orchestration_mode': 'STANDARD'}
+
+
+class Agent(ManagedModularAgent):
+    """Managed prompts come from the prompt manager; other modules are stubs"""
+
+    def __init__(self, registry, prompt_manager):
+        super().__init__(registry, prompt_manager, {'agent_type': AgentType.ORCHESTRATOR})
+        self.loads = 0
+
+    async def _load_module(self, metadata):
+        self.loads += metadata.id == 'managed_greeting'
+        return await super()._load_module(metadata)
+
+    async def _instantiate_module(self, metadata):
+        if metadata.id.startswith('managed_'):
+            return await super()._instantiate_module(metadata)
+        return GatedModule(metadata.id)
+
+
+@pytest.fixture
+def managed_registry(registry):
+    registry.modules['managed_greeting'] = make_metadata('managed_greeting', ['NOVICE'])
+    return registry
+
+
+def served(result):
+    return [fragment for fragment in result['prompt_fragments'] if fragment.startswith('Hello')]
+
+
+def test_each_request_is_allocated_an_arm(managed_registry, tmp_path):
+    random.seed(0)
+    prompts = LocalPromptManager(tmp_path / 'prompts')
+    prompts.put_prompt('managed_greeting', 'Hello v1', version='v1')
+    prompts.put_prompt('managed_greeting', 'Hello v2', version='v2')
+    prompts.set_experiment('managed_greeting', ['v1', 'v2'])
+
+    async def scenario():
+        agent = Agent(managed_registry, prompts)
+        results = [await agent.process_request(dict(NOVICE, session_id=f's{i}')) for i in range(40)]
+        module = agent.active_modules['managed_greeting']
+        await agent.close()
+        return agent, module, results
+
+    agent, module, results = asyncio.run(scenario())
+
+    # One load serves both arms; the choice is made per request
+    assert agent.loads == 1
+    assert isinstance(module, PromptVariantsModule)
+    assert {served(result)[0] for result in results} == {'Hello v1', 'Hello v2'}
+    for result in results:
+        variant = result['prompt_variants']['managed_greeting']
+        assert served(result) == [f'Hello {variant}']
+    assert not hasattr(managed_registry.modules['managed_greeting'], 'managed_content')
+
+    with open(tmp_path / 'prompts' / 'usage.jsonl') as f:
+        logged = [json.loads(line)['metrics'].get('variant') for line in f
+                  if json.loads(line)['prompt_id'] == 'managed_greeting']
+    assert sorted(logged) == sorted(result['prompt_variants']['managed_greeting'] for result in results)
+
+
+def test_without_an_experiment_latest_is_served(managed_registry, tmp_path):
+    prompts = LocalPromptManager(tmp_path / 'prompts')
+    prompts.put_prompt('managed_greeting', 'Hello v1', version='v1')
+    prompts.put_prompt('managed_greeting', 'Hello draft', version='v2', make_latest=False)
+    prompts.put_prompt('managed_greeting', 'Hello v3', version='v3')
+
+    async def scenario():
+        agent = Agent(managed_registry, prompts)
+        results = [await agent.process_request(NOVICE) for _ in range(5)]
+        await agent.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(served(result) == ['Hello v3'] for result in results)
+    assert all('prompt_variants' not in result for result in results)
+
+
+def test_experiments_name_stored_versions(tmp_path):
+    prompts = LocalPromptManager(tmp_path / 'prompts')
+    prompts.put_prompt('greeting', 'Hello v1', version='v1')
+    prompts.put_prompt('greeting', 'Hello v2', version='v2')
+
+    with pytest.raises(KeyError):
+        prompts.set_experiment('greeting', ['v1', 'v9'])
+    with pytest.raises(ValueError):
+        prompts.set_experiment('greeting', ['v1'])
+
+    prompts.set_experiment('greeting', ['v1', 'v2'])
+    assert asyncio.run(prompts.experiment_variants('greeting')) == ['v1', 'v2']
+    # Visible to another manager over the same store
+    assert asyncio.run(LocalPromptManager(tmp_path / 'prompts').experiment_variants('greeting')) == ['v1', 'v2']
+    prompts.set_experiment('greeting', None)
+    assert asyncio.run(prompts.experiment_variants('greeting')) == []
+
+
+def test_bandit_state_is_saved_every_save_every_updates(tmp_path):
+    prompts = LocalPromptManager(tmp_path / 'prompts')
+    prompts.bandit.save_every = 3
+    event = {'prompt_id': 'greeting', 'metrics': {'variant': 'v1', 'latency_ms': 100.0}}
+
+    asyncio.run(prompts.log_usage_batch([event, event]))
+    assert not prompts.bandit.state_path.exists()
+
+    asyncio.run(prompts.log_usage_batch([event]))
+    with open(prompts.bandit.state_path) as f:
+        assert json.load(f)['greeting']['v1'][0] > 1.0
+    assert prompts.bandit.unsaved == 0
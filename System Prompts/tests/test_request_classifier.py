@@ -0,0 +1,80 @@
+"""Request classifier: training rows, train/save/load round-trip."""
+
+import json
+
+import numpy as np
+import pytest
+
+from request_classifier import (
+    RequestClassifier, accuracy, append_example, load_examples, train
+)
+
+
+SIMPLE = ["build a simple todo agent", "a basic faq bot", "simple chatbot for my notes"]
+COMPLEX = ["distributed multi-agent pipeline with vector search",
+           "production rag system with distributed retrieval",
+           "multi-agent orchestration across microservices"]
+
+
+def examples():
+    rows = [{'request': text, 'labels': {'project_complexity': 'simple', 'user_expertise': 'beginner'},
+             'confirmed': True} for text in SIMPLE]
+    rows += [{'request': text, 'labels': {'project_complexity': 'complex', 'user_expertise': 'expert'},
+              'corrected': True} for text in COMPLEX]
+    # The system's own unconfirmed guesses are never training labels
+    rows.append({'request': "simple todo agent", 'labels': {'project_complexity': 'complex'}})
+    return rows
+
+
+def test_training_uses_only_corrected_or_confirmed_examples():
+    classifier = train(examples(), n_features=1 << 10)
+
+    assert classifier.metadata['examples'] == 6
+    assert accuracy(classifier, examples()) == {'project_complexity': 1.0, 'user_expertise': 1.0}
+    assert classifier.predict("a simple todo agent")['project_complexity'][0] == 'simple'
+
+    with pytest.raises(ValueError):
+        train([{'request': "unlabelled guess", 'labels': {'project_complexity': 'simple'}}])
+
+
+def test_saved_model_round_trips(tmp_path):
+    classifier = train(examples(), version='7', n_features=1 << 10)
+    path = tmp_path / 'models' / 'classifier.npz'
+    classifier.save(path)
+
+    restored = RequestClassifier.load(path)
+
+    assert restored.version == '7'
+    assert restored.n_features == 1 << 10
+    requests = SIMPLE + COMPLEX + ["something else entirely", ""]
+    for request in requests:
+        assert restored.predict(request) == pytest.approx(classifier.predict(request))
+    batch = restored.predict_proba_batch(requests)
+    for head, (classes, _, _) in restored.heads.items():
+        assert batch[head].shape == (len(requests), len(classes))
+        best = [classes[i] for i in batch[head].argmax(axis=1)]
+        assert best == [restored.predict(request)[head][0] for request in requests]
+    assert not list(path.parent.glob('.*.tmp'))
+
+
+def test_unknown_model_format_is_rejected(tmp_path):
+    path = tmp_path / 'classifier.npz'
+    np.savez(path, metadata=np.array(json.dumps({'format': 99})))
+
+    with pytest.raises(ValueError):
+        RequestClassifier.load(path)
+
+
+def test_examples_file_round_trips_and_skips_unreadable_lines(tmp_path):
+    path = tmp_path / 'data' / 'examples.jsonl'
+    append_example(path, "simple bot", {'project_complexity': 'simple'}, success=True, confirmed=True)
+    with open(path, 'a') as f:
+        f.write('{"request": "unreadable\n')
+    append_example(path, "rag system", {'project_complexity': 'complex'}, success=False,
+                   corrected=True, user_id='u1')
+
+    loaded = load_examples(path)
+
+    assert [example['request'] for example in loaded] == ["simple bot", "rag system"]
+    assert loaded[1]['user_id'] == 'u1' and 'user_id' not in loaded[0]
+    assert train(loaded, n_features=1 << 8).metadata['examples'] == 2
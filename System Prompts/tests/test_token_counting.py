@@ -0,0 +1,68 @@
+"""Token counting: tokenizer fallback and the content-hash cache."""
+
+import json
+import sys
+
+import pytest
+import yaml
+
+from token_counting import TokenCounter, approximate_token_count
+
+
+@pytest.fixture
+def models_config(tmp_path):
+    path = tmp_path / 'models.yaml'
+    path.write_text(yaml.safe_dump({'models': {
+        'hosted': {'provider': 'openai'},
+        'local': {'provider': 'vllm', 'model_path': 'org/local-model'}
+    }}))
+    return path
+
+
+def test_approximation_splits_long_words_and_punctuation():
+    assert approximate_token_count("hello, world") == 3
+    assert approximate_token_count("internationalization") == 4  # 20 characters: 1 + 19 // 6
+    assert approximate_token_count("") == 0
+
+
+@pytest.mark.parametrize('model, missing', [
+    ('hosted', 'tiktoken'),
+    ('local', 'tokenizers'),
+    ('unlisted', None),
+])
+def test_missing_tokenizers_fall_back_to_the_approximation(models_config, monkeypatch, model, missing):
+    if missing:
+        monkeypatch.setitem(sys.modules, missing, None)  # Import raises ImportError
+
+    counter = TokenCounter(model, models_config=models_config)
+
+    assert counter.tokenizer_name == 'approx:regex'
+    assert counter.count("Build a simple todo agent.") == approximate_token_count("Build a simple todo agent.")
+
+
+def test_missing_models_config_falls_back(tmp_path):
+    assert TokenCounter('gpt-4', models_config=tmp_path / 'absent.yaml').tokenizer_name == 'approx:regex'
+
+
+def test_counts_are_cached_by_content_hash(tmp_path):
+    counter = TokenCounter('unlisted', models_config=tmp_path / 'absent.yaml')
+
+    first = counter.count("some module text")
+    assert counter.count("some module text") == first
+    assert counter.count("other text", sha256_hash='known') == counter.lookup('known')
+    assert counter.count_batch([("some module text", None), ("new text", None)]) == [first, 2]
+    assert counter.stats == {'hits': 2, 'misses': 3}
+
+
+def test_saved_counts_are_reused_only_by_the_same_tokenizer(tmp_path):
+    cache_path = tmp_path / 'counts.json'
+    counter = TokenCounter('unlisted', models_config=tmp_path / 'absent.yaml', cache_path=cache_path)
+    counter.count("text", sha256_hash='abc')
+    counter.save()
+
+    restored = TokenCounter('unlisted', models_config=tmp_path / 'absent.yaml', cache_path=cache_path)
+    assert restored.lookup('abc') == 1
+
+    cache_path.write_text(json.dumps({'tokenizer': 'tiktoken:cl100k_base', 'counts': {'abc': 99}}))
+    other = TokenCounter('unlisted', models_config=tmp_path / 'absent.yaml', cache_path=cache_path)
+    assert other.lookup('abc') is None
@@ -0,0 +1,107 @@
+"""Buffered usage logging: batching, flushing and dropping."""
+
+import asyncio
+
+from prompt_management import BufferedUsageLogger, PromptManager
+
+
+class RecordingManager(PromptManager):
+    """Prompt manager that records each usage batch it is given"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def get_prompt_version(self, prompt_id, version='latest'):
+        return ''
+
+    async def log_usage(self, prompt_id, metrics):
+        await self.log_usage_batch([{'prompt_id': prompt_id, 'metrics': metrics}])
+
+    async def ab_test(self, prompt_id, variants):
+        return variants[0]
+
+    async def log_usage_batch(self, events):
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append([event['metrics']['n'] for event in events])
+
+
+def test_events_are_queued_then_flushed_in_batches():
+    async def scenario():
+        manager = RecordingManager()
+        logger = BufferedUsageLogger(manager, batch_size=4, flush_interval=60.0)
+        accepted = [logger.log('p', {'n': i}) for i in range(3)]
+        queued_only = list(manager.batches)
+        await logger.flush()
+        await logger.close()
+        return manager, logger, accepted, queued_only
+
+    manager, logger, accepted, queued_only = asyncio.run(scenario())
+
+    assert accepted == [True] * 3
+    assert queued_only == []  # log() never writes on the caller's path
+    assert manager.batches == [[0, 1, 2]]
+    assert logger.stats['flushed'] == 3 and logger.stats['batches'] == 1
+
+
+def test_full_batch_wakes_the_background_flush():
+    async def scenario():
+        manager = RecordingManager()
+        logger = BufferedUsageLogger(manager, batch_size=2, flush_interval=60.0)
+        for i in range(5):
+            logger.log('p', {'n': i})
+        for _ in range(10):
+            await asyncio.sleep(0)
+        flushed_in_background = list(manager.batches)
+        await logger.close()
+        return manager, flushed_in_background
+
+    manager, flushed_in_background = asyncio.run(scenario())
+
+    assert flushed_in_background == [[0, 1], [2, 3], [4]]
+    assert manager.batches == [[0, 1], [2, 3], [4]]
+
+
+def test_interval_flushes_a_partial_batch():
+    async def scenario():
+        manager = RecordingManager()
+        logger = BufferedUsageLogger(manager, batch_size=100, flush_interval=0.01)
+        logger.log('p', {'n': 0})
+        await asyncio.sleep(0.05)
+        flushed = list(manager.batches)
+        await logger.close()
+        return flushed
+
+    assert asyncio.run(scenario()) == [[0]]
+
+
+def test_events_beyond_the_queue_bound_are_dropped():
+    async def scenario():
+        manager = RecordingManager()
+        logger = BufferedUsageLogger(manager, max_queue=2, batch_size=10, flush_interval=60.0)
+        accepted = [logger.log('p', {'n': i}) for i in range(4)]
+        await logger.close()
+        after_close = logger.log('p', {'n': 4})
+        return manager, logger, accepted, after_close
+
+    manager, logger, accepted, after_close = asyncio.run(scenario())
+
+    assert accepted == [True, True, False, False]
+    assert not after_close
+    assert manager.batches == [[0, 1]]
+    assert logger.stats['enqueued'] == 2 and logger.stats['dropped'] == 3
+
+
+def test_failed_writes_are_counted_not_raised():
+    async def scenario():
+        logger = BufferedUsageLogger(RecordingManager(fail=True), batch_size=10)
+        logger.log('p', {'n': 0})
+        logger.log('p', {'n': 1})
+        await logger.close()
+        return logger
+
+    logger = asyncio.run(scenario())
+
+    assert logger.stats['failed'] == 2
+    assert logger.stats['flushed'] == 0
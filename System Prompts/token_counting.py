@@ -0,0 +1,139 @@
+"""
+Token Counting Service
+
+Version: 3.1 Personal Edition
+Date: October 2025
+Architecture: Cached, per-model-family token counts
+
+Replaces hand-entered `token_estimate` values with counts from a local
+tokenizer chosen per model family in `config/models.yaml`:
+
+- `openai` models use tiktoken (`encoding_for_model`)
+- `vllm` models with a `model_path` use a locally cached Hugging Face
+  tokenizer (`tokenizers`)
+- anything else, or a missing tokenizer library, falls back to a regex
+  approximation and says so in `tokenizer_name`
+
+Counts are cached by (tokenizer, content SHA-256), so re-counting unchanged
+content at request time is a dictionary lookup.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+
+import yaml
+
+
+DEFAULT_MODELS_CONFIG = Path(__file__).parent.parent / 'agentic-coder' / 'config' / 'models.yaml'
+
+_APPROX_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_token_count(text: str) -> int:
+    """BPE-like approximation: words split every ~6 characters, punctuation separate"""
+    return sum(1 + (len(piece) - 1) // 6 for piece in _APPROX_TOKEN_PATTERN.findall(text))
+
+
+class TokenCounter:
+    """Token counts for one model family, cached by content hash"""
+    
+    def __init__(self, model: str = 'gpt-4', models_config: Path = DEFAULT_MODELS_CONFIG,
+                 cache_path: Optional[Path] = None):
+        self.model = model
+        self.cache_path = cache_path
+        self.cache: Dict[str, int] = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        self.tokenizer_name, self._encode_batch = self._load_tokenizer(model, models_config)
+        
+        if cache_path is not None and Path(cache_path).exists():
+            with open(cache_path) as f:
+                stored = json.load(f)
+            if stored.get('tokenizer') == self.tokenizer_name:
+                self.cache = stored.get('counts', {})
+    
+    def count(self, text: str, sha256_hash: Optional[str] = None) -> int:
+        """Token count for `text`; pass a known content hash to skip rehashing"""
+        key = sha256_hash or hashlib.sha256(text.encode('utf-8')).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return cached
+        
+        self.stats['misses'] += 1
+        count = self._encode_batch([text])[0]
+        self.cache[key] = count
+        return count
+    
+    def lookup(self, sha256_hash: str) -> Optional[int]:
+        """Cached count for content with this hash, without reading the content"""
+        return self.cache.get(sha256_hash)
+    
+    def count_batch(self, texts: Iterable[Tuple[str, Optional[str]]]) -> List[int]:
+        """Count many (text, sha256) pairs, tokenizing only the uncached ones together"""
+        items = [(text, sha256_hash or hashlib.sha256(text.encode('utf-8')).hexdigest())
+                 for text, sha256_hash in texts]
+        
+        missing = {key: text for text, key in items if key not in self.cache}
+        if missing:
+            keys = list(missing)
+            for key, count in zip(keys, self._encode_batch([missing[k] for k in keys])):
+                self.cache[key] = count
+        self.stats['misses'] += len(missing)
+        self.stats['hits'] += len(items) - len(missing)
+        
+        return [self.cache[key] for _, key in items]
+    
+    def save(self):
+        """Persist cached counts (atomically) so restarts skip re-tokenizing"""
+        if self.cache_path is None:
+            return
+        cache_path = Path(self.cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'tokenizer': self.tokenizer_name, 'counts': self.cache}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cache_path)
+    
+    @staticmethod
+    def _load_tokenizer(model: str, models_config: Path) -> Tuple[str, Callable[[List[str]], List[int]]]:
+        """Pick the local tokenizer for a model's family"""
+        model_config: Dict[str, Any] = {}
+        if Path(models_config).exists():
+            with open(models_config) as f:
+                model_config = (yaml.safe_load(f) or {}).get('models', {}).get(model, {})
+        provider = model_config.get('provider')
+        
+        if provider == 'openai':
+            try:
+                import tiktoken
+            except ImportError:
+                pass
+            else:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding('cl100k_base')
+                return (
+                    f"tiktoken:{encoding.name}",
+                    lambda texts: [len(tokens) for tokens in encoding.encode_batch(texts, disallowed_special=())]
+                )
+        
+        elif provider == 'vllm' and model_config.get('model_path'):
+            try:
+                from tokenizers import Tokenizer
+                tokenizer = Tokenizer.from_pretrained(model_config['model_path'])
+            except Exception:
+                pass
+            else:
+                return (
+                    f"hf:{model_config['model_path']}",
+                    lambda texts: [len(encoding.ids) for encoding in tokenizer.encode_batch(texts, add_special_tokens=False)]
+                )
+        
+        return 'approx:regex', lambda texts: [approximate_token_count(text) for text in texts]
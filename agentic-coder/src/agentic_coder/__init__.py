@@ -10,13 +10,56 @@ __version__ = "0.1.0"
 __author__ = "Agentic Coder Team"
 __email__ = "team@agentic-coder.dev"
 
-from .agents import *
-from .cognitive import *
-from .knowledge import *
-from .tools import *
-from .models import *
-from .data import *
-from .utils import *
+from ._lazy import attach
+
+# Subsystems load on first attribute access (PEP 562), so `import agentic_coder`
+# (and `agentic-coder --version`) does not pull in neo4j, chromadb, langchain,
+# tree-sitter or gitpython. Names the subpackages re-export stay reachable here.
+_SUBPACKAGES = ["agents", "cognitive", "knowledge", "tools", "models", "data", "utils"]
+_REEXPORTS = {
+    "agents": [
+        "BaseAgent",
+        "CognitiveAgent",
+        "OrchestratorAgent",
+        "AnalyzerAgent",
+        "PlannerAgent",
+        "CoderAgent",
+        "TesterAgent",
+        "ReviewerAgent",
+        "CoordinatorAgent",
+    ],
+    "cognitive": ["memory", "reasoning", "learning"],
+    "knowledge": ["graph", "vector", "patterns"],
+    "tools": [
+        "BaseTool",
+        "ToolRegistry",
+        "file_ops",
+        "code_analysis",
+        "git",
+        "execution",
+        "web",
+    ],
+    "utils": [
+        "setup_logging",
+        "timer",
+        "performance_monitor",
+        "FileUtils",
+        "StringUtils",
+        "AsyncUtils",
+    ],
+}
+
+__getattr__, __dir__, _ = attach(
+    __name__,
+    {
+        **{name: f".{name}" for name in _SUBPACKAGES},
+        **{
+            name: f".{package}"
+            for package, names in _REEXPORTS.items()
+            for name in names
+        },
+    },
+)
 
 __all__ = [
     # Core modules
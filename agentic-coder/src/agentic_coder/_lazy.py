@@ -0,0 +1,33 @@
+"""Lazy attribute loading for package ``__init__`` modules (PEP 562)."""
+
+import importlib
+import sys
+from collections.abc import Callable  # Not `typing`: it would dominate import time
+
+
+def attach(
+    package: str, exports: dict[str, str]
+) -> tuple[Callable[[str], object], Callable[[], list[str]], list[str]]:
+    """Build ``__getattr__``, ``__dir__`` and ``__all__`` for a package.
+
+    ``exports`` maps each public name to the relative module that provides it.
+    A name mapped to its own submodule (``"graph": ".graph"``) is that
+    submodule; any other name is looked up as an attribute of its module.
+    Nothing is imported until a name is first accessed, after which it is
+    cached on the package like a regular import.
+    """
+
+    def __getattr__(name: str) -> object:
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        module = importlib.import_module(target, package)
+        value = module if target == f".{name}" else getattr(module, name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__, list(exports)
@@ -1,23 +1,18 @@
 """Agent system for agentic-coder."""
 
-from .base import BaseAgent
-from .cognitive_agent import CognitiveAgent
-from .orchestrator import OrchestratorAgent
-from .analyzer import AnalyzerAgent
-from .planner import PlannerAgent
-from .coder import CoderAgent
-from .tester import TesterAgent
-from .reviewer import ReviewerAgent
-from .coordinator import CoordinatorAgent
+from .._lazy import attach
 
-__all__ = [
-    "BaseAgent",
-    "CognitiveAgent", 
-    "OrchestratorAgent",
-    "AnalyzerAgent",
-    "PlannerAgent",
-    "CoderAgent",
-    "TesterAgent",
-    "ReviewerAgent",
-    "CoordinatorAgent",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "BaseAgent": ".base",
+        "CognitiveAgent": ".cognitive_agent",
+        "OrchestratorAgent": ".orchestrator",
+        "AnalyzerAgent": ".analyzer",
+        "PlannerAgent": ".planner",
+        "CoderAgent": ".coder",
+        "TesterAgent": ".tester",
+        "ReviewerAgent": ".reviewer",
+        "CoordinatorAgent": ".coordinator",
+    },
+)
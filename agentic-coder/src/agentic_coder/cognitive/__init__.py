@@ -1,11 +1,12 @@
 """Cognitive architecture for agentic-coder."""
 
-from . import memory
-from . import reasoning
-from . import learning
+from .._lazy import attach
 
-__all__ = [
-    "memory",
-    "reasoning", 
-    "learning",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "memory": ".memory",
+        "reasoning": ".reasoning",
+        "learning": ".learning",
+    },
+)
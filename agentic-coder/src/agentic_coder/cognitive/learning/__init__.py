@@ -1,13 +1,13 @@
 """Learning systems for cognitive architecture."""
 
-from .experience_replay import ExperienceReplay
-from .meta_learning import MetaLearning
-from .curriculum import CurriculumLearning
-from .fine_tuning import FineTuning
+from ..._lazy import attach
 
-__all__ = [
-    "ExperienceReplay",
-    "MetaLearning",
-    "CurriculumLearning",
-    "FineTuning",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "ExperienceReplay": ".experience_replay",
+        "MetaLearning": ".meta_learning",
+        "CurriculumLearning": ".curriculum",
+        "FineTuning": ".fine_tuning",
+    },
+)
@@ -1,15 +1,14 @@
 """Memory systems for cognitive architecture."""
 
-from .working import WorkingMemory
-from .episodic import EpisodicMemory
-from .semantic import SemanticMemory
-from .procedural import ProceduralMemory
-from .manager import MemoryManager
+from ..._lazy import attach
 
-__all__ = [
-    "WorkingMemory",
-    "EpisodicMemory",
-    "SemanticMemory", 
-    "ProceduralMemory",
-    "MemoryManager",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "WorkingMemory": ".working",
+        "EpisodicMemory": ".episodic",
+        "SemanticMemory": ".semantic",
+        "ProceduralMemory": ".procedural",
+        "MemoryManager": ".manager",
+    },
+)
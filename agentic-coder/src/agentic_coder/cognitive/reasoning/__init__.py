@@ -1,13 +1,13 @@
 """Reasoning systems for cognitive architecture."""
 
-from .reactive import ReactiveReasoning
-from .deliberative import DeliberativeReasoning
-from .reflective import ReflectiveReasoning
-from .react import ReActReasoning
+from ..._lazy import attach
 
-__all__ = [
-    "ReactiveReasoning",
-    "DeliberativeReasoning",
-    "ReflectiveReasoning",
-    "ReActReasoning",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "ReactiveReasoning": ".reactive",
+        "DeliberativeReasoning": ".deliberative",
+        "ReflectiveReasoning": ".reflective",
+        "ReActReasoning": ".react",
+    },
+)
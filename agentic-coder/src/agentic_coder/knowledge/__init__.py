@@ -1,11 +1,12 @@
 """Knowledge layer for agentic-coder."""
 
-from . import graph
-from . import vector  
-from . import patterns
+from .._lazy import attach
 
-__all__ = [
-    "graph",
-    "vector",
-    "patterns",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "graph": ".graph",
+        "vector": ".vector",
+        "patterns": ".patterns",
+    },
+)
@@ -1,15 +1,14 @@
 """Graph RAG implementation."""
 
-from .client import Neo4jClient
-from .schema import GraphSchema
-from .queries import GraphQueries
-from .builder import GraphBuilder
-from .analyzer import GraphAnalyzer
+from ..._lazy import attach
 
-__all__ = [
-    "Neo4jClient",
-    "GraphSchema", 
-    "GraphQueries",
-    "GraphBuilder",
-    "GraphAnalyzer",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "Neo4jClient": ".client",
+        "GraphSchema": ".schema",
+        "GraphQueries": ".queries",
+        "GraphBuilder": ".builder",
+        "GraphAnalyzer": ".analyzer",
+    },
+)
@@ -1,13 +1,13 @@
 """Pattern libraries for frameworks."""
 
-from .langgraph import LangGraphPatterns
-from .crewai import CrewAIPatterns
-from .autogen import AutoGenPatterns
-from .custom import CustomPatterns
+from ..._lazy import attach
 
-__all__ = [
-    "LangGraphPatterns",
-    "CrewAIPatterns",
-    "AutoGenPatterns",
-    "CustomPatterns", 
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "LangGraphPatterns": ".langgraph",
+        "CrewAIPatterns": ".crewai",
+        "AutoGenPatterns": ".autogen",
+        "CustomPatterns": ".custom",
+    },
+)
@@ -1,13 +1,13 @@
 """Vector store implementations."""
 
-from .client import ChromaClient
-from .episodic_store import EpisodicStore
-from .semantic_store import SemanticStore
-from .embeddings import EmbeddingUtils
+from ..._lazy import attach
 
-__all__ = [
-    "ChromaClient",
-    "EpisodicStore",
-    "SemanticStore", 
-    "EmbeddingUtils",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "ChromaClient": ".client",
+        "EpisodicStore": ".episodic_store",
+        "SemanticStore": ".semantic_store",
+        "EmbeddingUtils": ".embeddings",
+    },
+)
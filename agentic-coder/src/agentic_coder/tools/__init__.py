@@ -1,19 +1,16 @@
 """Tool system for agentic-coder."""
 
-from .base import BaseTool
-from .registry import ToolRegistry
-from . import file_ops
-from . import code_analysis
-from . import git
-from . import execution
-from . import web
+from .._lazy import attach
 
-__all__ = [
-    "BaseTool",
-    "ToolRegistry",
-    "file_ops",
-    "code_analysis",
-    "git",
-    "execution", 
-    "web",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "BaseTool": ".base",
+        "ToolRegistry": ".registry",
+        "file_ops": ".file_ops",
+        "code_analysis": ".code_analysis",
+        "git": ".git",
+        "execution": ".execution",
+        "web": ".web",
+    },
+)
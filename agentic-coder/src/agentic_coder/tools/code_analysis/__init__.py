@@ -1,13 +1,13 @@
 """Code analysis tools."""
 
-from .parser import ParserTool
-from .linter import LinterTool
-from .formatter import FormatterTool
-from .metrics import MetricsTool
+from ..._lazy import attach
 
-__all__ = [
-    "ParserTool",
-    "LinterTool",
-    "FormatterTool", 
-    "MetricsTool",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "ParserTool": ".parser",
+        "LinterTool": ".linter",
+        "FormatterTool": ".formatter",
+        "MetricsTool": ".metrics",
+    },
+)
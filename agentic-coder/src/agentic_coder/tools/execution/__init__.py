@@ -1,11 +1,12 @@
 """Code execution tools."""
 
-from .runner import RunnerTool
-from .testing import TestingTool
-from .sandbox import SandboxTool
+from ..._lazy import attach
 
-__all__ = [
-    "RunnerTool",
-    "TestingTool",
-    "SandboxTool", 
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "RunnerTool": ".runner",
+        "TestingTool": ".testing",
+        "SandboxTool": ".sandbox",
+    },
+)
@@ -1,13 +1,13 @@
 """File operation tools."""
 
-from .read import ReadTool
-from .write import WriteTool
-from .search import SearchTool
-from .watch import WatchTool
+from ..._lazy import attach
 
-__all__ = [
-    "ReadTool",
-    "WriteTool", 
-    "SearchTool",
-    "WatchTool",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "ReadTool": ".read",
+        "WriteTool": ".write",
+        "SearchTool": ".search",
+        "WatchTool": ".watch",
+    },
+)
@@ -1,11 +1,12 @@
 """Git operation tools."""
 
-from .commit import CommitTool
-from .diff import DiffTool
-from .branch import BranchTool
+from ..._lazy import attach
 
-__all__ = [
-    "CommitTool",
-    "DiffTool",
-    "BranchTool",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "CommitTool": ".commit",
+        "DiffTool": ".diff",
+        "BranchTool": ".branch",
+    },
+)
@@ -1,9 +1,11 @@
 """Web operation tools."""
 
-from .search import SearchTool
-from .fetch import FetchTool
+from ..._lazy import attach
 
-__all__ = [
-    "SearchTool",
-    "FetchTool",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "SearchTool": ".search",
+        "FetchTool": ".fetch",
+    },
+)
@@ -1,9 +1,11 @@
 """User interfaces."""
 
-from . import cli
-from . import api
+from .._lazy import attach
 
-__all__ = [
-    "cli",
-    "api",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "cli": ".cli",
+        "api": ".api",
+    },
+)
@@ -1,13 +1,13 @@
 """CLI interface."""
 
-from .app import app
-from .display import DisplayManager
-from .progress import ProgressTracker
-from .approval import ApprovalSystem
+from ..._lazy import attach
 
-__all__ = [
-    "app",
-    "DisplayManager",
-    "ProgressTracker", 
-    "ApprovalSystem",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "app": ".app",
+        "DisplayManager": ".display",
+        "ProgressTracker": ".progress",
+        "ApprovalSystem": ".approval",
+    },
+)
@@ -1,15 +1,14 @@
 """CLI commands."""
 
-from .init import init_command
-from .chat import chat_command
-from .task import task_command
-from .project import project_command
-from .system import system_command
+from ...._lazy import attach
 
-__all__ = [
-    "init_command",
-    "chat_command",
-    "task_command",
-    "project_command",
-    "system_command",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "init_command": ".init",
+        "chat_command": ".chat",
+        "task_command": ".task",
+        "project_command": ".project",
+        "system_command": ".system",
+    },
+)
@@ -1,16 +1,15 @@
 """Utility functions."""
 
-from .logging import setup_logging
-from .timing import timer, performance_monitor
-from .file_utils import FileUtils
-from .string_utils import StringUtils
-from .async_utils import AsyncUtils
+from .._lazy import attach
 
-__all__ = [
-    "setup_logging",
-    "timer",
-    "performance_monitor",
-    "FileUtils",
-    "StringUtils",
-    "AsyncUtils",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "setup_logging": ".logging",
+        "timer": ".timing",
+        "performance_monitor": ".timing",
+        "FileUtils": ".file_utils",
+        "StringUtils": ".string_utils",
+        "AsyncUtils": ".async_utils",
+    },
+)
@@ -1,13 +1,13 @@
 """Predefined workflows."""
 
-from .create_agent import CreateAgentWorkflow
-from .debug_code import DebugCodeWorkflow
-from .refactor import RefactorWorkflow
-from .test_generation import TestGenerationWorkflow
+from .._lazy import attach
 
-__all__ = [
-    "CreateAgentWorkflow",
-    "DebugCodeWorkflow",
-    "RefactorWorkflow",
-    "TestGenerationWorkflow",
-]
\ No newline at end of file
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "CreateAgentWorkflow": ".create_agent",
+        "DebugCodeWorkflow": ".debug_code",
+        "RefactorWorkflow": ".refactor",
+        "TestGenerationWorkflow": ".test_generation",
+    },
+)
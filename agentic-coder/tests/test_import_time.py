@@ -0,0 +1,63 @@
+"""
+Import-time budget tests.
+
+Each check runs a fresh interpreter with ``-X importtime`` so that modules
+already imported by the test session cannot hide the real cost.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Cumulative microseconds for `import agentic_coder` (generous for slow CI)
+PACKAGE_IMPORT_BUDGET_US = 50_000
+
+HEAVY_DEPENDENCIES = ["neo4j", "chromadb", "langchain", "tree_sitter", "git"]
+
+
+def import_times(code: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module imported by `code`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_package_import_within_budget():
+    times = import_times("import agentic_coder")
+    assert times["agentic_coder"] < PACKAGE_IMPORT_BUDGET_US
+
+
+def test_version_does_not_load_subsystems():
+    times = import_times("import agentic_coder; agentic_coder.__version__")
+    loaded = [module for module in times if module.startswith("agentic_coder.")]
+    assert loaded == ["agentic_coder._lazy"]
+
+
+@pytest.mark.parametrize("dependency", HEAVY_DEPENDENCIES)
+def test_package_import_skips_heavy_dependencies(dependency):
+    times = import_times("import agentic_coder")
+    assert not any(
+        module == dependency or module.startswith(dependency + ".") for module in times
+    )
+
+
+def test_subsystem_import_loads_only_that_subsystem():
+    times = import_times("import agentic_coder.cognitive")
+    loaded = {module for module in times if module.startswith("agentic_coder.")}
+    assert loaded == {"agentic_coder._lazy", "agentic_coder.cognitive"}